@@ -1,10 +1,37 @@
-from .core.geometry.segment import Segment
-from .core.geometry.quadratic_curve import QuadraticCurve
-from .core.geometry.cubic_curve import CubicCurve
+import logging
+from importlib import import_module
 
-from .core.vehicle import Vehicle
-from .core.vehicle_generator import VehicleGenerator
+# Library logging stays silent unless the application configures it
+# (see trafficSimulator.tracing.configure_logging).
+logging.getLogger(__name__).addHandler(logging.NullHandler())
 
-from .core.simulation import Simulation
-from .visualizer.window import Window
-from .config import load_config, build_simulation, load_simulation_from_json
\ No newline at end of file
+# Public names and the submodule defining each. They are imported on first
+# access, so `import trafficSimulator` stays cheap for worker processes and
+# CLI tools, and headless runs never load the GUI (Window pulls in dearpygui).
+_LAZY = {
+    "Segment": ".core.geometry.segment",
+    "QuadraticCurve": ".core.geometry.quadratic_curve",
+    "CubicCurve": ".core.geometry.cubic_curve",
+    "Vehicle": ".core.vehicle",
+    "VehicleGenerator": ".core.vehicle_generator",
+    "Simulation": ".core.simulation",
+    "load_config": ".config",
+    "build_simulation": ".config",
+    "load_simulation_from_json": ".config",
+    "Window": ".visualizer.window",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
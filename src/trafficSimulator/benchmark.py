@@ -0,0 +1,272 @@
+"""Benchmark suite over synthetic networks.
+
+For every scale (number of vehicles on the network at the first tick) a
+scenario from `trafficSimulator.scenarios` is generated and written to
+JSON, then loaded and run in a fresh interpreter so that timings and peak
+memory are not skewed by earlier scales. Each scale reports:
+
+- load:    seconds spent in `load_simulation_from_json`, building the
+           network without the cache and then again from a warm cache;
+- routing: time to build the routing graph, and mean time of cold
+           (uncached) and warm (cached) shortest-path queries between
+           random segment pairs;
+- ticks:   mean/median/p95/max wall time of `Simulation.update` after a
+           warm-up, vehicle-steps per second and simulated seconds per
+           wall second;
+- memory:  peak resident set size of the process after loading and after
+           the ticks (Unix only, None elsewhere).
+
+The report also records the import time of the headless entry points in a
+fresh interpreter against `STARTUP_BUDGET_SECONDS` (see `measure_startup`).
+
+The report is a JSON document (see `run_benchmark`) meant to be kept
+across releases to track throughput.
+"""
+
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .config import load_simulation_from_json
+from .scenarios import generate_scenario
+
+
+BENCH_SCALES = (1000, 10000, 100000)
+BENCH_FORMAT = 2  # bumped when the report layout changes
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB, or None where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024*1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _distribution_version(name):
+    """Installed version of a distribution, read from its metadata without importing it."""
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
+        return None
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+def environment_info():
+    """Interpreter, platform and dependency versions for the report header."""
+    return {
+        "trafficSimulator": _distribution_version("trafficSimulator"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "dearpygui": _distribution_version("dearpygui"),
+    }
+
+
+# What a headless run imports before loading its config, and modules it
+# must not pull in: the GUI and optional heavy dependencies are loaded only
+# on first use.
+STARTUP_MODULES = ("trafficSimulator.cli", "trafficSimulator.config")
+STARTUP_FORBIDDEN = ("dearpygui", "scipy", "pyarrow", "matplotlib", "pandas")
+# Import time budget of STARTUP_MODULES in a fresh interpreter (numpy is
+# most of it; about 0.12 s on a laptop).
+STARTUP_BUDGET_SECONDS = 0.3
+
+_STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in sys.argv[1].split(","):
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in sys.argv[2].split(",") if m in sys.modules]}))
+"""
+
+
+def measure_startup(repeat=5, modules=STARTUP_MODULES, forbidden=STARTUP_FORBIDDEN, budget=None):
+    """Time importing `modules` in `repeat` fresh interpreters.
+
+    Returns the median/min/max seconds, the `forbidden` modules that got
+    imported along the way and whether the run is within `budget`
+    (STARTUP_BUDGET_SECONDS when None).
+    """
+    import subprocess
+    if budget is None:
+        budget = STARTUP_BUDGET_SECONDS
+    src = str(Path(__file__).resolve().parent.parent)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (src, os.environ.get("PYTHONPATH")))))
+    command = [sys.executable, "-c", _STARTUP_PROBE, ",".join(modules), ",".join(forbidden)]
+    samples = []
+    loaded = set()
+    for _ in range(repeat):
+        out = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+        probe = json.loads(out)
+        samples.append(probe["seconds"])
+        loaded.update(probe["loaded"])
+    median = float(np.median(samples))
+    return {
+        "modules": list(modules),
+        "repeat": repeat,
+        "import_seconds": median,
+        "import_min_seconds": min(samples),
+        "import_max_seconds": max(samples),
+        "budget_seconds": budget,
+        "forbidden_loaded": sorted(loaded),
+        "within_budget": median <= budget and not loaded,
+    }
+
+
+def _percentile_ms(samples, q):
+    return 1e3 * float(np.percentile(samples, q)) if len(samples) else None
+
+
+def bench_config(path, ticks=100, warmup=10, routes=100, engine="python", seed=0):
+    """Load the config at `path` and measure loading, routing and ticking; return the figures."""
+    result = {"baseline_rss_mb": peak_rss_mb()}
+
+    start = time.perf_counter()
+    sim, _ = load_simulation_from_json(path, seed=seed, cache=False)
+    result["load_seconds"] = time.perf_counter() - start
+    result["loaded_rss_mb"] = peak_rss_mb()
+    result["segments"] = len(sim.segments)
+    result["initial_vehicles"] = len(sim.vehicles)
+
+    # An uncached load leaves the routing graph to be built on first use.
+    start = time.perf_counter()
+    sim.routing_graph()
+    result["routing_graph_seconds"] = time.perf_counter() - start
+
+    # In a private cache: the first load compiles the network cache, the
+    # second one reads it.
+    with tempfile.TemporaryDirectory() as cache_dir:
+        load_simulation_from_json(path, seed=seed, cache=cache_dir)
+        start = time.perf_counter()
+        load_simulation_from_json(path, seed=seed, cache=cache_dir)
+        result["cached_load_seconds"] = time.perf_counter() - start
+
+    # Routing between random segment pairs: cold queries run Dijkstra, the
+    # repeated ones are served by the route cache.
+    ids = list(sim.segment_by_id)
+    rng = np.random.default_rng(seed)
+    pairs = [(ids[a], ids[b]) for a, b in rng.integers(len(ids), size=(routes, 2))]
+    failed = 0
+    for label in ("cold", "warm"):
+        start = time.perf_counter()
+        for a, b in pairs:
+            try:
+                sim.shortest_path(a, b)
+            except ValueError:
+                if label == "cold":
+                    failed += 1
+        elapsed = time.perf_counter() - start
+        result[f"route_{label}_ms"] = 1e3 * elapsed / len(pairs) if pairs else None
+    result["routes"] = len(pairs)
+    result["routes_failed"] = failed
+    sim.route_cache.clear()
+
+    if engine == "vectorized":
+        sim.enable_vectorized_engine()
+    for _ in range(warmup):
+        sim.update()
+    samples = np.empty(ticks)
+    vehicle_steps = 0
+    clock = time.perf_counter
+    for i in range(ticks):
+        vehicle_steps += len(sim.vehicles)
+        start = clock()
+        sim.update()
+        samples[i] = clock() - start
+    wall = float(samples.sum())
+    result.update({
+        "engine": engine,
+        "ticks": ticks,
+        "warmup_ticks": warmup,
+        "tick_mean_ms": 1e3 * wall / ticks if ticks else None,
+        "tick_p50_ms": _percentile_ms(samples, 50),
+        "tick_p95_ms": _percentile_ms(samples, 95),
+        "tick_max_ms": 1e3 * float(samples.max()) if ticks else None,
+        "vehicle_steps_per_second": vehicle_steps / wall if wall > 0 else None,
+        "sim_seconds_per_wall_second": ticks * sim.dt / wall if wall > 0 else None,
+        "final_vehicles": len(sim.vehicles),
+        "completed_trips": sim.completed_trips,
+        "peak_rss_mb": peak_rss_mb(),
+    })
+    return result
+
+
+def bench_scale(vehicles, kind="grid", segments_per_vehicle=0.5, ticks=100, warmup=10, routes=100,
+                engine="python", seed=0, workdir=None, isolate=True, **options):
+    """Generate a `kind` scenario with `vehicles` vehicles and benchmark it.
+
+    The scenario is written to `workdir` (a temporary directory when None).
+    With `isolate`, the measurements run in a freshly spawned process.
+    """
+    segments = max(200, int(vehicles * segments_per_vehicle))
+    start = time.perf_counter()
+    config = generate_scenario(kind, segments=segments, vehicles=vehicles, seed=seed, **options)
+    generate_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(workdir or tmp) / f"bench_{kind}_{vehicles}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(config, f)
+        del config
+
+        args = (str(path), ticks, warmup, routes, engine, seed)
+        if isolate:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                measured = pool.submit(bench_config, *args).result()
+        else:
+            measured = bench_config(*args)
+        config_bytes = path.stat().st_size
+
+    row = {
+        "kind": kind,
+        "vehicles": vehicles,
+        "seed": seed,
+        "generate_seconds": generate_seconds,
+        "config_bytes": config_bytes,
+    }
+    row.update(measured)
+    return row
+
+
+def run_benchmark(scales=BENCH_SCALES, kind="grid", on_result=None, **kwargs):
+    """Benchmark every scale in turn and return the report dict.
+
+    Keyword arguments go to `bench_scale`; `on_result(row)` is called after
+    each scale.
+    """
+    report = {
+        "format": BENCH_FORMAT,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment_info(),
+        "startup": measure_startup(),
+        "parameters": dict(kwargs, kind=kind, scales=list(scales)),
+        "results": [],
+    }
+    report["parameters"].pop("workdir", None)
+    for vehicles in scales:
+        row = bench_scale(vehicles, kind=kind, **kwargs)
+        if on_result is not None:
+            on_result(row)
+        report["results"].append(row)
+    return report
@@ -0,0 +1,266 @@
+"""Command line entry point for headless simulation runs.
+
+Usage::
+
+    trafficsim run config.json --duration 3600 --dt 0.1
+    trafficsim sweep config.json --set vehicle_generators.0.vehicle_rate=10,20 --seeds 8 -o out.csv
+    trafficsim scenario grid --segments 2000 --vehicles 1000 -o grid.json
+    trafficsim bench --scales 1000,10000,100000 -o bench.json
+    trafficsim startup --budget 0.3
+"""
+
+import argparse
+import json
+import sys
+
+from .config import load_simulation_from_json
+from .core.simulation import Simulation
+from .core.snapshot import is_state_file
+from .runner import run_headless
+from .tracing import configure_logging
+
+
+def _print_report(report, out):
+    print(f"steps:                 {report['steps']}", file=out)
+    print(f"simulated time:        {report['simulated_seconds']:.2f} s", file=out)
+    print(f"wall time:             {report['wall_seconds']:.3f} s", file=out)
+    print(f"sim-s per wall-s:      {report['sim_seconds_per_wall_second']:.2f}", file=out)
+    print(f"vehicle-steps per s:   {report['vehicle_steps_per_second']:.0f}", file=out)
+    print("summary:", file=out)
+    for key, value in report["summary"].items():
+        if isinstance(value, float):
+            value = f"{value:.3f}"
+        print(f"  {key}: {value}", file=out)
+    profile = report.get("profile")
+    if profile:
+        print(f"profile (mean tick {profile['mean_tick_ms']:.3f} ms):", file=out)
+        for phase, values in profile["phases"].items():
+            print(f"  {phase:<12} {values['mean_ms']:8.3f} ms  {100*values['share']:5.1f}%  max {values['max_ms']:.3f} ms", file=out)
+        for counter, values in profile["counters"].items():
+            print(f"  {counter:<17} {values['per_tick']:.3f}/tick", file=out)
+
+
+def cmd_run(args):
+    if is_state_file(args.config):
+        if args.seed is not None:
+            # The generators resume from their saved RNG state.
+            print("--seed cannot be used when resuming from a state file", file=sys.stderr)
+            return 2
+        sim = Simulation.load_state(args.config)
+    else:
+        sim, _ = load_simulation_from_json(args.config, seed=args.seed, cache=args.cache)
+    if args.engine == "vectorized" and sim.engine is None:
+        sim.enable_vectorized_engine()
+    sim.recycle_vehicles = args.recycle
+
+    if args.profile:
+        sim.enable_profiling()
+    if args.record:
+        if args.regions > 1:
+            print("--record cannot be combined with --regions", file=sys.stderr)
+            return 2
+        sim.record_trajectories(args.record, args.record_interval, args.record_fields, format=args.record_format)
+
+    if args.regions > 1:
+        from .core.parallel import PartitionedSimulation
+        with PartitionedSimulation(sim, args.regions) as runner:
+            report = run_headless(runner, args.duration, args.dt)
+    else:
+        report = run_headless(sim, args.duration, args.dt)
+    sim.stop_recording()
+    if args.save_state:
+        sim.save_state(args.save_state)
+    if args.profile:
+        report["profile"] = sim.stats()
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        _print_report(report, sys.stdout)
+    return 0
+
+
+def _parse_override(text):
+    """Parse 'path=v1,v2,...' into (path, [values]); values are read as JSON when possible."""
+    path, sep, values = text.partition("=")
+    if not sep or not path:
+        raise argparse.ArgumentTypeError(f"expected PATH=VALUE[,VALUE...], got '{text}'")
+    try:
+        parsed = json.loads(f"[{values}]")
+    except ValueError:
+        parsed = values.split(",")
+    return path, parsed
+
+
+def _parse_seeds(text):
+    """'8' -> seeds 0..7, '3-6' -> 3..6, '1,5,9' -> those seeds."""
+    if "," in text:
+        return [int(s) for s in text.split(",")]
+    if "-" in text:
+        lo, hi = text.split("-", 1)
+        return list(range(int(lo), int(hi) + 1))
+    return list(range(int(text)))
+
+
+def cmd_sweep(args):
+    from .sweep import expand_jobs, run_sweep, write_csv
+
+    grid = dict(args.overrides or ())
+    seeds = args.seeds if args.seeds is not None else [None]
+    jobs = expand_jobs(args.configs, grid, seeds)
+    total = len(jobs)
+    done = 0
+
+    def progress(row):
+        nonlocal done
+        done += 1
+        detail = f" ({row['error']})" if row["status"] != "ok" else ""
+        print(f"[{done}/{total}] job {row['job']}: {row['status']}{detail}", file=sys.stderr)
+
+    rows = run_sweep(
+        jobs, args.duration, args.dt, args.engine,
+        workers=args.workers, retries=args.retries, on_result=progress,
+    )
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            write_csv(rows, f, jobs)
+    else:
+        write_csv(rows, sys.stdout, jobs)
+    return 0 if all(row["status"] == "ok" for row in rows) else 1
+
+
+def cmd_scenario(args):
+    from .scenarios import generate_scenario
+
+    config = generate_scenario(args.kind, segments=args.segments, vehicles=args.vehicles, seed=args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(config, f)
+    else:
+        json.dump(config, sys.stdout)
+        print()
+    return 0
+
+
+def cmd_bench(args):
+    from .benchmark import run_benchmark
+
+    def progress(row):
+        print(
+            f"{row['kind']} {row['vehicles']} vehicles / {row['segments']} segments: "
+            f"load {row['load_seconds']:.2f} s (cached {row['cached_load_seconds']:.2f} s), route {row['route_cold_ms']:.2f} ms, "
+            f"tick {row['tick_mean_ms']:.2f} ms, peak {row['peak_rss_mb'] or 0:.0f} MiB",
+            file=sys.stderr,
+        )
+
+    report = run_benchmark(
+        args.scales, kind=args.kind, on_result=progress,
+        segments_per_vehicle=args.segments_per_vehicle, ticks=args.ticks, warmup=args.warmup,
+        routes=args.routes, engine=args.engine, seed=args.seed, workdir=args.keep,
+        isolate=not args.in_process,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+def cmd_startup(args):
+    from .benchmark import measure_startup
+
+    result = measure_startup(repeat=args.repeat, budget=args.budget)
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"import {', '.join(result['modules'])}: {result['import_seconds']*1e3:.1f} ms median "
+              f"({result['import_min_seconds']*1e3:.1f}-{result['import_max_seconds']*1e3:.1f} ms over {result['repeat']} runs), "
+              f"budget {result['budget_seconds']*1e3:.0f} ms")
+        if result["forbidden_loaded"]:
+            print(f"headless import loaded: {', '.join(result['forbidden_loaded'])}")
+    return 0 if result["within_budget"] else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="trafficsim", description="Headless traffic simulation tools")
+    parser.add_argument("--log-level", default="WARNING", help="diagnostics level: DEBUG, INFO, WARNING (default)")
+    parser.add_argument("--log-json", default=None, metavar="PATH", help="also append diagnostics to PATH as JSON lines")
+    sub = parser.add_subparsers(dest="command")
+    sub.required = True
+
+    run = sub.add_parser("run", help="run a JSON configuration without the GUI")
+    run.add_argument("config", help="path to the JSON configuration, or a trusted state file to resume (state files are pickles)")
+    run.add_argument("--duration", type=float, default=3600.0, help="simulated seconds (default: 3600)")
+    run.add_argument("--dt", type=float, default=None, help="time step in seconds (default: simulation default)")
+    run.add_argument("--engine", choices=["python", "vectorized"], default="python", help="car-following engine")
+    run.add_argument("--seed", type=int, default=None, help="seed for the random vehicle generators")
+    run.add_argument("--cache", action="store_true",
+                     help="reuse the compiled network from the per-user cache ($TRAFFICSIM_CACHE_DIR, else ~/.cache/trafficsim)")
+    run.add_argument("--recycle", action="store_true", help="reuse retired vehicle objects")
+    run.add_argument("--regions", type=int, default=1, help="split the network over N worker processes")
+    run.add_argument("--profile", action="store_true", help="report the time spent in each update phase")
+    run.add_argument("--record", default=None, metavar="DIR", help="write vehicle trajectories to chunk files in DIR")
+    run.add_argument("--record-interval", type=float, default=None, help="seconds between trajectory samples (default: every tick)")
+    run.add_argument("--record-fields", type=lambda text: text.split(","), default=None,
+                     help="comma list of t,id,segment,x,v,a,px,py (default: all)")
+    run.add_argument("--record-format", choices=["npz", "parquet"], default="npz", help="chunk file format")
+    run.add_argument("--save-state", default=None, metavar="PATH", help="write the final simulation state to PATH")
+    run.add_argument("--json", action="store_true", help="print the report as JSON")
+    run.set_defaults(func=cmd_run)
+
+    sweep = sub.add_parser("sweep", help="run configs x parameter overrides x seeds on a process pool")
+    sweep.add_argument("configs", nargs="+", help="paths to JSON configurations")
+    sweep.add_argument("--set", dest="overrides", action="append", type=_parse_override, metavar="PATH=V1,V2",
+                       help="override a config value, e.g. vehicle_generators.0.vehicle_rate=10,20 (repeatable)")
+    sweep.add_argument("--seeds", type=_parse_seeds, default=None, help="N (seeds 0..N-1), A-B or a comma list")
+    sweep.add_argument("--duration", type=float, default=3600.0, help="simulated seconds per job (default: 3600)")
+    sweep.add_argument("--dt", type=float, default=None, help="time step in seconds (default: simulation default)")
+    sweep.add_argument("--engine", choices=["python", "vectorized"], default="python", help="car-following engine")
+    sweep.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    sweep.add_argument("--retries", type=int, default=1, help="retries for jobs lost to a crashed worker")
+    sweep.add_argument("-o", "--output", default=None, help="CSV output path (default: stdout)")
+    sweep.set_defaults(func=cmd_sweep)
+
+    scenario = sub.add_parser("scenario", help="write a synthetic grid/radial/arterial network as JSON")
+    scenario.add_argument("kind", choices=["grid", "radial", "arterial"], help="network layout")
+    scenario.add_argument("--segments", type=int, default=400, help="approximate number of segments (default: 400)")
+    scenario.add_argument("--vehicles", type=int, default=0, help="vehicles placed on the network at t=0")
+    scenario.add_argument("--seed", type=int, default=0, help="seed for the layout and the vehicle generators")
+    scenario.add_argument("-o", "--output", default=None, help="JSON output path (default: stdout)")
+    scenario.set_defaults(func=cmd_scenario)
+
+    bench = sub.add_parser("bench", help="benchmark load, routing, tick time and memory on synthetic networks")
+    bench.add_argument("--scales", type=lambda text: [int(v) for v in text.split(",")], default=[1000, 10000, 100000],
+                       help="comma list of vehicle counts (default: 1000,10000,100000)")
+    bench.add_argument("--kind", choices=["grid", "radial", "arterial"], default="grid", help="network layout")
+    bench.add_argument("--segments-per-vehicle", type=float, default=0.5, help="network size relative to the fleet")
+    bench.add_argument("--ticks", type=int, default=100, help="measured ticks per scale (default: 100)")
+    bench.add_argument("--warmup", type=int, default=10, help="ticks run before measuring (default: 10)")
+    bench.add_argument("--routes", type=int, default=100, help="random routing queries per scale (default: 100)")
+    bench.add_argument("--engine", choices=["python", "vectorized"], default="python", help="car-following engine")
+    bench.add_argument("--seed", type=int, default=0, help="scenario and generator seed")
+    bench.add_argument("--keep", default=None, metavar="DIR", help="keep the generated scenario files in DIR")
+    bench.add_argument("--in-process", action="store_true", help="measure in this process instead of a fresh one")
+    bench.add_argument("-o", "--output", default=None, help="JSON report path (default: stdout)")
+    bench.set_defaults(func=cmd_bench)
+
+    startup = sub.add_parser("startup", help="check the headless import time against its budget (exit 1 if over)")
+    startup.add_argument("--repeat", type=int, default=5, help="fresh interpreters to time (default: 5)")
+    startup.add_argument("--budget", type=float, default=None, help="budget in seconds (default: STARTUP_BUDGET_SECONDS)")
+    startup.add_argument("--json", action="store_true", help="print the figures as JSON")
+    startup.set_defaults(func=cmd_startup)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    configure_logging(args.log_level, args.log_json)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
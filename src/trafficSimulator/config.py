@@ -1,16 +1,25 @@
 """JSON configuration loader for simulations and GUI settings."""
 
+import copy
 import json
+from collections import deque
 from pathlib import Path
-from typing import Tuple, Dict, Any, List
+from typing import Tuple, Dict, Any, List, Optional, Union
 import math
 
+import numpy as np
+
 from .core.simulation import Simulation
 from .core.vehicle import Vehicle
 from .core.vehicle_generator import VehicleGenerator
 from .core.geometry.segment import Segment
 from .core.geometry.quadratic_curve import QuadraticCurve
 from .core.geometry.cubic_curve import CubicCurve
+from .network_cache import default_cache_dir, load_network, network_key, store_network
+
+
+# Default radius (meters) used by the per-segment "snap" option.
+DEFAULT_SNAP_RADIUS = 1.0
 
 
 def load_config(path: str) -> Dict[str, Any]:
@@ -32,8 +41,31 @@ def _clean_metadata(cfg: Dict[str, Any]) -> Dict[str, Any]:
     return md
 
 
-def build_simulation(config: Dict[str, Any]) -> Simulation:
-    """Build a Simulation object from a configuration dictionary."""
+def copy_network(segments: List[Segment]) -> List[Segment]:
+    """Return copies of segments that share geometry but carry no vehicles."""
+    network = []
+    for seg in segments:
+        clone = copy.copy(seg)
+        clone.vehicles = deque()
+        network.append(clone)
+    return network
+
+
+def build_simulation(
+    config: Dict[str, Any],
+    segments: Optional[List[Segment]] = None,
+    seed: Optional[int] = None,
+) -> Simulation:
+    """Build a Simulation object from a configuration dictionary.
+
+    When `segments` is given (e.g. from `copy_network` of a previous build of
+    the same config), those segments are used instead of rebuilding the
+    "segments" section, which skips the curve reparametrization.
+
+    `seed` (default: the config's top-level "seed") seeds the vehicle
+    generators: each one gets an independent stream spawned from it, unless
+    its own config sets "seed".
+    """
     sim = Simulation()
 
     def _endpoint(seg_id: str, at_end: bool) -> Tuple[float, float]:
@@ -42,6 +74,17 @@ def build_simulation(config: Dict[str, Any]) -> Simulation:
         seg = sim.segments[sim.segment_by_id[seg_id]]
         return seg.points[-1] if at_end else seg.points[0]
 
+    def _snap(pt: Tuple[float, float], radius: float) -> Tuple[float, float]:
+        """Move pt onto the closest existing segment endpoint within radius."""
+        if pt is None:
+            return pt
+        hit = sim.spatial_index.nearest_endpoint(pt, radius)
+        if hit is None:
+            return pt
+        (seg_idx, end), _ = hit
+        seg = sim.segments[seg_idx]
+        return seg.points[-1] if end else seg.points[0]
+
     def _heading(seg_id: str, at_end: bool) -> float:
         if seg_id not in sim.segment_by_id:
             raise ValueError(f"Cannot get heading: segment id '{seg_id}' not found")
@@ -78,9 +121,13 @@ def build_simulation(config: Dict[str, Any]) -> Simulation:
         return ctrl
 
     # Segments
-    for seg in config.get("segments", []):
+    for seg in segments or ():
+        sim.add_segment(seg)
+    for seg in config.get("segments", []) if segments is None else ():
         seg_type = seg.get("type", "segment").lower()
         md = _clean_metadata(seg)
+        snap = seg.get("snap", False)
+        snap_radius = DEFAULT_SNAP_RADIUS if snap is True else float(snap or 0)
 
         if seg_type == "quadratic":
             start = _tuple_point(seg.get("start"))
@@ -94,6 +141,11 @@ def build_simulation(config: Dict[str, Any]) -> Simulation:
                 start = _endpoint(connect_from, at_end=True)
             if connect_to:
                 end = _endpoint(connect_to, at_end=bool(connect_to_end))
+            if snap_radius > 0:
+                if not connect_from:
+                    start = _snap(start, snap_radius)
+                if not connect_to:
+                    end = _snap(end, snap_radius)
 
             if start is None or end is None:
                 raise ValueError(f"Quadratic segment '{seg.get('id')}' requires start/end or connect_from/connect_to")
@@ -106,11 +158,16 @@ def build_simulation(config: Dict[str, Any]) -> Simulation:
 
             sim.create_quadratic_bezier_curve(start, control, end, **md)
         elif seg_type == "cubic":
+            start = _tuple_point(seg.get("start"))
+            end = _tuple_point(seg.get("end"))
+            if snap_radius > 0:
+                start = _snap(start, snap_radius)
+                end = _snap(end, snap_radius)
             sim.create_cubic_bezier_curve(
-                _tuple_point(seg.get("start")),
+                start,
                 _tuple_point(seg.get("control_1")),
                 _tuple_point(seg.get("control_2")),
-                _tuple_point(seg.get("end")),
+                end,
                 **md,
             )
         else:
@@ -121,6 +178,9 @@ def build_simulation(config: Dict[str, Any]) -> Simulation:
             points = [_tuple_point(p) for p in points]
             if not points:
                 raise ValueError(f"Segment '{seg.get('id', '<unnamed>')}' has no points/start/end defined")
+            if snap_radius > 0:
+                points[0] = _snap(points[0], snap_radius)
+                points[-1] = _snap(points[-1], snap_radius)
             sim.create_segment(*points, **md)
 
     # Vehicles
@@ -128,11 +188,18 @@ def build_simulation(config: Dict[str, Any]) -> Simulation:
         sim.create_vehicle(**veh)
 
     # Vehicle generators
-    for gen in config.get("vehicle_generators", []):
+    generators = config.get("vehicle_generators", [])
+    if seed is None:
+        seed = config.get("seed")
+    streams = np.random.SeedSequence(seed).spawn(len(generators))
+    for gen, stream in zip(generators, streams):
         vehicles = gen.get("vehicles", [])
         # Ensure tuples for weights/config pairs if provided as lists.
         gen["vehicles"] = [(v[0], v[1]) for v in vehicles]
-        sim.create_vehicle_generator(**gen)
+        if gen.get("seed") is None:
+            sim.create_vehicle_generator(rng=np.random.default_rng(stream), **gen)
+        else:
+            sim.create_vehicle_generator(**gen)
 
     # Environment objects
     for obj in config.get("environment", []):
@@ -154,13 +221,37 @@ def build_simulation(config: Dict[str, Any]) -> Simulation:
     return sim
 
 
-def load_simulation_from_json(path: str) -> Tuple[Simulation, Dict[str, Any]]:
+def load_simulation_from_json(
+    path: str,
+    seed: Optional[int] = None,
+    cache: Union[bool, str] = False,
+) -> Tuple[Simulation, Dict[str, Any]]:
     """
     Convenience helper: load JSON config, build Simulation, and return UI config.
 
+    With `cache`, the built network (segment geometry, id map and routing
+    graph) is kept in a cache keyed by the content of the "segments"
+    section, so later loads of an unchanged network skip the curve
+    construction (see `trafficSimulator.network_cache`). `cache` is False
+    (the default) to always build, True for the per-user cache directory
+    ($TRAFFICSIM_CACHE_DIR, else ~/.cache/trafficsim), or a directory path.
+    Cache entries are unpickled: only point it at a trusted directory.
+
     Returns (simulation, ui_config_dict).
     """
     cfg = load_config(path)
-    sim = build_simulation(cfg)
+    if cache is False:
+        return build_simulation(cfg, seed=seed), cfg.get("ui", {})
+
+    cache_dir = default_cache_dir() if cache is True else Path(cache)
+    key = network_key(cfg)
+    cached = load_network(cache_dir, key)
+    if cached is None:
+        sim = build_simulation(cfg, seed=seed)
+        store_network(cache_dir, key, sim.segments, sim.routing_graph())
+    else:
+        segments, graph = cached
+        sim = build_simulation(cfg, segments=segments, seed=seed)
+        sim.set_routing_graph(graph)
     ui_cfg = cfg.get("ui", {})
     return sim, ui_cfg
@@ -0,0 +1,56 @@
+import heapq
+
+
+def event_window(ev):
+    """Return (start, end) of an event; end is None for open-ended events."""
+    start = ev.get("start_time", 0)
+    duration = ev.get("duration")
+    end_time = ev.get("end_time", None)
+    if end_time is None and duration is not None:
+        end_time = start + duration
+    return start, end_time
+
+
+class EventScheduler:
+    """Time-indexed activation queue for simulation events.
+
+    Events are compiled once into a start-sorted list and an end-time heap,
+    so `advance` only touches the events whose state changes. An event is
+    active while start <= t < end, as before.
+    """
+    def __init__(self):
+        self.compile([])
+
+    def compile(self, events):
+        self._starts = sorted(
+            (event_window(ev)[0], seq, ev) for seq, ev in enumerate(events)
+        )
+        self._next_start = 0
+        self._ends = []
+        self.count = len(events)
+        self.time = None
+        for ev in events:
+            ev["active"] = False
+
+    def advance(self, t):
+        """Move the schedule to time t; return (activated, deactivated) events."""
+        activated = []
+        deactivated = []
+        starts = self._starts
+        while self._next_start < len(starts) and starts[self._next_start][0] <= t:
+            _, seq, ev = starts[self._next_start]
+            self._next_start += 1
+            ev["active"] = True
+            activated.append(ev)
+            end = event_window(ev)[1]
+            if end is not None:
+                heapq.heappush(self._ends, (end, seq, ev))
+
+        ends = self._ends
+        while ends and ends[0][0] <= t:
+            _, _, ev = heapq.heappop(ends)
+            ev["active"] = False
+            deactivated.append(ev)
+
+        self.time = t
+        return activated, deactivated
@@ -0,0 +1,63 @@
+import numpy as np
+
+
+# Defaults of the arc-length reparametrization: the parameter range is cut
+# into ARC_LENGTH_SAMPLES intervals integrated with GAUSS_ORDER-point
+# Gauss-Legendre, and each output parameter is polished with NEWTON_STEPS
+# Newton iterations on the exact length integral.
+ARC_LENGTH_SAMPLES = 256
+GAUSS_ORDER = 5
+NEWTON_STEPS = 2
+
+_GAUSS = {}
+
+
+def gauss_legendre(order):
+    """Nodes and weights of the Gauss-Legendre rule on [-1, 1] (cached per order)."""
+    rule = _GAUSS.get(order)
+    if rule is None:
+        rule = _GAUSS[order] = np.polynomial.legendre.leggauss(order)
+    return rule
+
+
+def _integrate(speed, a, b, order):
+    """Gauss-Legendre integral of speed over each interval [a[i], b[i]]."""
+    nodes, weights = gauss_legendre(order)
+    half = (b - a) / 2
+    t = (a + b)[:, None] / 2 + half[:, None] * nodes
+    return half * (speed(t) @ weights)
+
+
+def arc_length_table(speed, samples=ARC_LENGTH_SAMPLES, order=GAUSS_ORDER):
+    """Return (t, s): a uniform grid of the curve parameter and the arc length at each node.
+
+    speed(t) must return |r'(t)| for an array of parameters.
+    """
+    t = np.linspace(0.0, 1.0, samples + 1)
+    s = np.concatenate(([0.0], np.cumsum(_integrate(speed, t[:-1], t[1:], order))))
+    return t, s
+
+
+def arc_length_parameters(speed, count, samples=ARC_LENGTH_SAMPLES, order=GAUSS_ORDER, newton_steps=NEWTON_STEPS):
+    """Curve parameters of `count` points equally spaced in arc length, ends included.
+
+    Returns (parameters, total length).
+    """
+    t, s = arc_length_table(speed, samples, order)
+    total = s[-1]
+    targets = np.linspace(0.0, total, count)
+    # Bracketing table interval of every target, then a linear first guess.
+    k = np.clip(np.searchsorted(s, targets, side="right") - 1, 0, samples - 1)
+    t0, t1 = t[k], t[k + 1]
+    span = s[k + 1] - s[k]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frac = np.where(span > 0, (targets - s[k]) / span, 0.0)
+    params = t0 + frac * (t1 - t0)
+    for _ in range(newton_steps):
+        length = s[k] + _integrate(speed, t0, params, order)
+        rate = speed(params)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = np.where(rate > 0, (length - targets) / rate, 0.0)
+        params = np.clip(params - step, t0, t1)
+    params[0], params[-1] = 0.0, 1.0
+    return params, float(total)
@@ -0,0 +1,32 @@
+import numpy as np
+
+
+class PoseTable:
+    """get_point/get_heading over many segments in one np.interp call.
+
+    The offset tables of all segments are laid end to end, segment k
+    occupying [2k, 2k + 1] of a shared axis; the gaps between segments are
+    never queried, so a query (k, offset) is just a lookup at 2k + offset.
+    """
+    def __init__(self, segments):
+        grids, xs, ys, heading_grids, headings = [], [], [], [], []
+        for k, seg in enumerate(segments):
+            grids.append(2*k + seg._offset_grid)
+            xs.append(seg._xs)
+            ys.append(seg._ys)
+            heading_grids.append(2*k + seg._heading_grid)
+            headings.append(seg._headings)
+        empty = np.empty(0)
+        self.count = len(segments)
+        self._grid = np.concatenate(grids) if grids else empty
+        self._xs = np.concatenate(xs) if xs else empty
+        self._ys = np.concatenate(ys) if ys else empty
+        self._heading_grid = np.concatenate(heading_grids) if heading_grids else empty
+        self._headings = np.concatenate(headings) if headings else empty
+
+    def query(self, seg_indices, offsets):
+        """Return (points (n, 2), headings (n,)) at offsets in [0, 1] along the given segments."""
+        offsets = np.clip(np.asarray(offsets, dtype=float), 0.0, 1.0)
+        u = 2*np.asarray(seg_indices, dtype=float) + offsets
+        points = np.stack((np.interp(u, self._grid, self._xs), np.interp(u, self._grid, self._ys)), axis=-1)
+        return points, np.interp(u, self._heading_grid, self._headings)
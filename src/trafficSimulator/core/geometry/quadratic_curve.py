@@ -10,19 +10,8 @@ class QuadraticCurve(Segment):
         self.control = control
         self.end = end
 
-        # Generate path
-        path = []
-        for i in range(CURVE_RESOLUTION):
-            t = i/(CURVE_RESOLUTION-1)
-            x = t**2*self.end[0] + 2*t*(1-t)*self.control[0] + (1-t)**2*self.start[0]
-            y = t**2*self.end[1] + 2*t*(1-t)*self.control[1] + (1-t)**2*self.start[1]
-            path.append((x, y))
-
-        super().__init__(path, **metadata)
-
-        # Arc-length parametrization
-        normalized_path = self.find_normalized_path(CURVE_RESOLUTION)
-        super().__init__(normalized_path, **metadata)
+        # Points equally spaced in arc length
+        super().__init__(self.find_normalized_path(CURVE_RESOLUTION), **metadata)
 
     def compute_x(self, t):
         return t**2*self.end[0] + 2*t*(1-t)*self.control[0] + (1-t)**2*self.start[0]
@@ -34,4 +23,4 @@ class QuadraticCurve(Segment):
         return 2*t*(self.end[0]-2*self.control[0]+self.start[0]) + 2*(self.control[0]-self.start[0])
     
     def compute_dy(self, t):
-        return 2*t*(self.end[1]-2*self.control[1]+self.start[1]) + 2*(self.control[1]-self.start[1])
\ No newline at end of file
+        return 2*t*(self.end[1]-2*self.control[1]+self.start[1]) + 2*(self.control[1]-self.start[1])
@@ -1,10 +1,10 @@
-from scipy.spatial import distance
-from scipy.interpolate import interp1d
 from collections import deque
+import numpy as np
 from numpy import arctan2, unwrap, linspace
 from abc import ABC, abstractmethod
 from math import sqrt
-from scipy.integrate import quad
+
+from .arc_length import ARC_LENGTH_SAMPLES, GAUSS_ORDER, arc_length_parameters
 
 
 # Basic style defaults for road categories and materials.
@@ -28,9 +28,39 @@ MATERIAL_STYLES = {
 
 class Segment(ABC):
     def __init__(self, points, **metadata):
-        self.points = points
+        # Points are frozen: the arc-length tables below are derived from them.
+        self._points = tuple(tuple(pt) for pt in points)
         self.vehicles = deque()
+        self._set_metadata(metadata)
+        self.build_arc_length_table()
+        self.set_functions()
 
+    @classmethod
+    def from_tables(cls, xy, cumulative_length, pieces, params=None, **metadata):
+        """Rebuild a segment from the arrays of `tables()` without redoing its geometry.
+
+        The arrays are used as they are (e.g. views of a memory-mapped
+        network cache); `params` restores the construction parameters of a
+        subclass (start, control, end, ...).
+        """
+        seg = cls.__new__(cls)
+        if params:
+            seg.__dict__.update(params)
+        seg._points = None  # built from _point_array on first access
+        seg.vehicles = deque()
+        seg._set_metadata(metadata)
+        seg._point_array = xy.T
+        seg._xs = xy[0]
+        seg._ys = xy[1]
+        seg._cumulative_length = cumulative_length
+        seg._piece_deltas = pieces[0:2].T
+        seg._piece_lengths = pieces[2]
+        seg._piece_headings = pieces[3]
+        seg.length = float(cumulative_length[-1])
+        seg._set_grids()
+        return seg
+
+    def _set_metadata(self, metadata):
         # Metadata with safe defaults for backward compatibility.
         self.id = metadata.get("id")
         self.category = metadata.get("category", DEFAULT_SEGMENT_CATEGORY)
@@ -45,28 +75,102 @@ class Segment(ABC):
             material_style = MATERIAL_STYLES.get(self.material, {})
             self.color = material_style.get("color", self.color)
 
-        self.set_functions()
-        
+    @property
+    def points(self):
+        if self._points is None:
+            self._points = tuple(map(tuple, self._point_array.tolist()))
+        return self._points
+
+    def endpoints(self):
+        """(first point, last point) of the polyline, or None if it has no points."""
+        pts = self._point_array
+        if not len(pts):
+            return None
+        return tuple(pts[0].tolist()), tuple(pts[-1].tolist())
+
+    def tables(self):
+        """The geometry arrays `from_tables` rebuilds a segment from.
+
+        Returns (xy, cumulative_length, pieces): point coordinates (2, n),
+        arc length at each point (n,) and per-piece dx, dy, length and
+        heading (4, n - 1).
+        """
+        pieces = np.vstack((self._piece_deltas.T, self._piece_lengths, self._piece_headings))
+        return self._point_array.T, self._cumulative_length, pieces
+
+    def build_arc_length_table(self):
+        """Precompute cumulative arc length and per-piece headings of the polyline."""
+        pts = np.asarray(self._points, dtype=float).reshape(-1, 2)
+        deltas = np.diff(pts, axis=0)
+        piece_lengths = np.sqrt(deltas[:, 0]*deltas[:, 0] + deltas[:, 1]*deltas[:, 1])
+        self._point_array = pts
+        self._piece_deltas = deltas
+        self._piece_lengths = piece_lengths
+        self._cumulative_length = np.concatenate(([0.0], np.cumsum(piece_lengths)))
+        self._piece_headings = unwrap(arctan2(deltas[:, 1], deltas[:, 0]))
+        self.length = float(self._cumulative_length[-1])
+
+    def _piece_at_distance(self, distance):
+        # Index of the polyline piece containing each distance (clamped to the ends).
+        idx = np.searchsorted(self._cumulative_length, distance, side="right") - 1
+        return np.clip(idx, 0, len(self._piece_lengths) - 1)
+
+    def get_point_at_distance(self, distance):
+        """Point at the given arc length from the start (scalar or array)."""
+        distance = np.clip(distance, 0.0, self.length)
+        idx = self._piece_at_distance(distance)
+        piece_len = self._piece_lengths[idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.where(piece_len > 0, (distance - self._cumulative_length[idx]) / piece_len, 0.0)
+        return self._point_array[idx] + self._piece_deltas[idx] * np.expand_dims(frac, -1)
+
+    def get_heading_at_distance(self, distance):
+        """Heading (radians) of the polyline piece at the given arc length."""
+        return self._piece_headings[self._piece_at_distance(distance)]
+
+    def bounding_box(self):
+        """Return (xmin, ymin, xmax, ymax) of the polyline."""
+        xmin, ymin = self._point_array.min(axis=0)
+        xmax, ymax = self._point_array.max(axis=0)
+        return (float(xmin), float(ymin), float(xmax), float(ymax))
 
     def set_functions(self):
-        # Point
-        self.get_point = interp1d(linspace(0, 1, len(self.points)), self.points, axis=0)
-        
-        # Heading
-        headings = unwrap([arctan2(
-            self.points[i+1][1] - self.points[i][1],
-            self.points[i+1][0] - self.points[i][0]
-        ) for i in range(len(self.points)-1)])
+        """Precompute the tables behind get_point/get_heading.
+
+        Offsets run from 0 to 1 evenly over the points (for curves, which
+        are equally spaced, this is the fraction of the length); headings
+        are those of the polyline pieces, evenly over the same range.
+        """
+        self._xs = self._point_array[:, 0].copy()
+        self._ys = self._point_array[:, 1].copy()
+        self._set_grids()
+
+    def _set_grids(self):
+        n = len(self._point_array)
+        self._offset_grid = linspace(0, 1, n)
+        headings = self._piece_headings
         if len(headings) == 1:
-            self.get_heading = lambda x: headings[0]
+            # Constant heading over the whole segment.
+            self._heading_grid = np.array([0.0, 1.0])
+            self._headings = np.array([headings[0], headings[0]])
         else:
-            self.get_heading = interp1d(linspace(0, 1, len(self.points)-1), headings, axis=0)
+            self._heading_grid = linspace(0, 1, n - 1)
+            self._headings = headings
+
+    def get_point(self, offset):
+        """Point at offset in [0, 1]; an array of offsets gives an (n, 2) array."""
+        offset = np.asarray(offset, dtype=float)
+        return np.stack((
+            np.interp(offset, self._offset_grid, self._xs),
+            np.interp(offset, self._offset_grid, self._ys),
+        ), axis=-1)
+
+    def get_heading(self, offset):
+        """Heading (radians) at offset in [0, 1] (scalar or array)."""
+        return np.interp(offset, self._heading_grid, self._headings)
 
     def get_length(self):
-        length = 0
-        for i in range(len(self.points) -1):
-            length += distance.euclidean(self.points[i], self.points[i+1])
-        return length
+        return self.length
 
     def add_vehicle(self, veh):
         self.vehicles.append(veh.id)
@@ -92,48 +196,18 @@ class Segment(ABC):
 
     def abs_f(self, t):
         return sqrt(self.compute_dx(t)**2 + self.compute_dy(t)**2)
-    
-    def find_t(self, a, L, epsilon):
-        """  Finds the t value such that the length of the curve from a to t is L.
-
-        Parameters
-        ----------
-        a : float
-            starting point of the integral
-        L : float
-            target length
-        epsilon : float
-            precision of the approximation
+
+    def speed(self, t):
+        """|r'(t)| for an array of curve parameters."""
+        return np.hypot(self.compute_dx(t), self.compute_dy(t))
+
+    def find_normalized_path(self, CURVE_RESOLUTION=50, samples=ARC_LENGTH_SAMPLES, order=GAUSS_ORDER):
+        """Points of the parametric curve equally spaced in arc length, both ends included.
+
+        Any subclass defining compute_x/compute_y and their derivatives
+        compute_dx/compute_dy (vectorized over t) gets its geometry from
+        here; `samples` and `order` set the precision of the length table
+        (see arc_length.arc_length_parameters).
         """
-        
-        def f(t):
-            integral_value, _ = quad(self.abs_f, a, t)
-            return integral_value
-        
-        # if we cannot reach the target length, return 1 
-        if f(1) < L: return 1
-        
-        lower_bound = a
-        upper_bound = 1
-        mid_point = (lower_bound + upper_bound) / 2.0
-        integ = f(mid_point)
-        while abs(integ-L) > epsilon:
-            if integ < L:       lower_bound = mid_point
-            else:               upper_bound = mid_point
-            mid_point = (lower_bound + upper_bound) / 2.0
-            integ = f(mid_point)
-        return mid_point
-    
-    def find_normalized_path(self, CURVE_RESOLUTION=50):
-        normalized_path = [(self.compute_x(0), self.compute_y(0))]
-        l = self.get_length()
-        target_l = l/(CURVE_RESOLUTION-1)
-        epsilon = 0.01
-        a = 0
-        for i in range(CURVE_RESOLUTION-1):
-            t = self.find_t(a, target_l, epsilon)
-            new_point = (self.compute_x(t), self.compute_y(t))
-            normalized_path.append(new_point)
-            if t == 1: break
-            else:      a = t
-        return normalized_path
\ No newline at end of file
+        t, _ = arc_length_parameters(self.speed, CURVE_RESOLUTION, samples, order)
+        return list(zip(self.compute_x(t).tolist(), self.compute_y(t).tolist()))
@@ -0,0 +1,170 @@
+import numpy as np
+
+from .vehicle import Vehicle
+
+
+# Per-vehicle quantities mirrored in the engine arrays. `_v_max` is the
+# configured speed limit, `v_max` the limit after event/junction factors.
+ENGINE_FIELDS = ("x", "v", "a", "v_max", "_v_max", "s0", "T", "a_max", "b_max", "l", "sqrt_ab")
+
+INITIAL_CAPACITY = 256
+
+
+def _array_property(name):
+    def getter(self):
+        return self._engine.arrays[name][self._slot]
+
+    def setter(self, value):
+        self._engine.arrays[name][self._slot] = value
+
+    return property(getter, setter)
+
+
+class EngineVehicle(Vehicle):
+    """Vehicle bound to an IDMEngine slot.
+
+    Kinematic and model parameters are read from and written to the engine
+    arrays, so the object stays a thin view usable by the GUI and user code.
+    """
+    __slots__ = ()
+
+    def __getstate__(self):
+        # The engine-backed fields are pickled with the engine arrays; setting
+        # them here would write into an engine that may not be restored yet.
+        return None, {name: getattr(self, name) for name in _VIEW_SLOTS}
+
+    @property
+    def stopped(self):
+        return bool(self._engine.stopped[self._slot])
+
+    @stopped.setter
+    def stopped(self, value):
+        self._engine.stopped[self._slot] = value
+
+
+for _name in ENGINE_FIELDS:
+    setattr(EngineVehicle, _name, _array_property(_name))
+del _name
+
+# Slots still stored on the object while it is bound to an engine.
+_VIEW_SLOTS = tuple(name for name in Vehicle.__slots__ if name not in ENGINE_FIELDS and name != "stopped")
+
+
+class IDMEngine:
+    """Structure-of-arrays Intelligent Driver Model.
+
+    Vehicles are attached to integer slots; `step` advances every vehicle on
+    the road in one batched pass with the same update rule as `Vehicle.update`.
+    """
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.capacity = 0
+        self.arrays = {}
+        self.stopped = np.zeros(0, dtype=bool)
+        self.leader = np.zeros(0, dtype=np.intp)
+        self.vehicles = []
+        self._free = []
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        for name in ENGINE_FIELDS:
+            arr = np.zeros(capacity, dtype=np.float64)
+            arr[:self.capacity] = self.arrays.get(name, arr[:0])
+            self.arrays[name] = arr
+        stopped = np.zeros(capacity, dtype=bool)
+        stopped[:self.capacity] = self.stopped
+        self.stopped = stopped
+        leader = np.full(capacity, -1, dtype=np.intp)
+        leader[:self.capacity] = self.leader
+        self.leader = leader
+        self.vehicles.extend([None] * (capacity - self.capacity))
+        self._free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.capacity - len(self._free)
+
+    def attach(self, veh):
+        """Copy the vehicle state into a free slot and turn it into a view."""
+        if isinstance(veh, EngineVehicle):
+            return veh._slot
+        if not self._free:
+            self._grow(max(INITIAL_CAPACITY, 2 * self.capacity))
+        slot = self._free.pop()
+        for name in ENGINE_FIELDS:
+            self.arrays[name][slot] = getattr(veh, name)
+        self.stopped[slot] = veh.stopped
+        self.leader[slot] = -1
+        self.vehicles[slot] = veh
+        veh._engine = self
+        veh._slot = slot
+        veh.__class__ = EngineVehicle
+        return slot
+
+    def detach(self, veh):
+        """Copy the slot state back onto the vehicle and release the slot."""
+        if not isinstance(veh, EngineVehicle):
+            return
+        slot = veh._slot
+        values = {name: float(self.arrays[name][slot]) for name in ENGINE_FIELDS}
+        stopped = bool(self.stopped[slot])
+        veh.__class__ = Vehicle
+        for name, value in values.items():
+            setattr(veh, name, value)
+        veh.stopped = stopped
+        del veh._engine, veh._slot
+        self.vehicles[slot] = None
+        self._free.append(slot)
+
+    def step(self, slots, leaders, factors, dt):
+        """Advance the given slots by dt.
+
+        `leaders[i]` is the slot of the vehicle ahead of `slots[i]` on the
+        same segment (or -1) and `factors[i]` scales its configured v_max.
+        Leaders must be listed in `slots` too: as in the sequential loop, a
+        follower sees the leader's position and speed after this step.
+        """
+        if len(slots) == 0:
+            return
+        arrays = self.arrays
+        idx = np.asarray(slots, dtype=np.intp)
+        lead = np.asarray(leaders, dtype=np.intp)
+        self.leader[idx] = lead
+
+        v_max = arrays["_v_max"][idx] * np.asarray(factors, dtype=np.float64)
+        arrays["v_max"][idx] = v_max
+        x = arrays["x"][idx]
+        v = arrays["v"][idx]
+        a = arrays["a"][idx]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Position and velocity
+            hold = v_max <= 1e-6
+            backwards = v + a*dt < 0
+            v_new = np.where(backwards, 0.0, v + a*dt)
+            x_new = np.where(backwards, x - 1/2*v*v/a, x + v_new*dt + a*dt*dt/2)
+            x_new = np.where(hold, x, x_new)
+            v_new = np.where(hold, 0.0, v_new)
+            arrays["x"][idx] = x_new
+            arrays["v"][idx] = v_new
+
+            # Acceleration, using the leaders' updated state
+            has_lead = lead >= 0
+            lead_x = arrays["x"][lead]
+            lead_v = arrays["v"][lead]
+            lead_l = arrays["l"][lead]
+            delta_x = lead_x - x_new - lead_l
+            delta_v = v_new - lead_v
+            s0 = arrays["s0"][idx]
+            T = arrays["T"][idx]
+            sqrt_ab = arrays["sqrt_ab"][idx]
+            alpha = np.where(
+                has_lead,
+                (s0 + np.maximum(0, T*v_new + delta_v*v_new/sqrt_ab)) / delta_x,
+                0.0,
+            )
+            a_max = arrays["a_max"][idx]
+            a_new = a_max * (1 - (v_new/v_max)**4 - alpha**2)
+            stopped = self.stopped[idx]
+            if stopped.any():
+                a_new = np.where(stopped, -arrays["b_max"][idx]*v_new/v_max, a_new)
+            arrays["a"][idx] = np.where(hold, 0.0, a_new)
@@ -0,0 +1,153 @@
+import heapq
+import math
+from itertools import count
+
+
+def on_right(h_self, h_other):
+    """True when heading h_other comes from the right of h_self (priority-to-right)."""
+    d = (h_other - h_self + math.pi) % (2*math.pi) - math.pi
+    return 0 < d < math.pi/2
+
+
+class Approach:
+    """Static description of one junction approach, compiled from its config dict.
+
+    The live signal state stays in the source dict (`phase`, `phase_start`)
+    so the Window and user code keep reading the junction configuration.
+    """
+    __slots__ = (
+        "junction_id", "junction_index", "seg_idx", "offset", "type", "is_light", "green", "red", "source",
+        "stop_pos", "heading", "conflicts",
+    )
+
+    def __init__(self, junction_id, junction_index, seg_idx, source):
+        self.junction_id = junction_id
+        self.junction_index = junction_index
+        self.seg_idx = seg_idx
+        self.offset = source.get("offset", 0.5)
+        self.type = source.get("type", "yield")
+        self.is_light = self.type == "light"
+        self.green = source.get("green", 30)
+        self.red = source.get("red", 30)
+        self.source = source
+
+        # Filled in by JunctionControl.compile
+        self.stop_pos = 0.0  # distance of the junction from the segment start
+        self.heading = 0.0
+        self.conflicts = ()  # approaches this one yields to
+
+    @property
+    def phase(self):
+        return self.source.get("phase", "green")
+
+    def phase_duration(self, phase):
+        if phase == "green":
+            return self.green
+        if phase == "red":
+            return self.red
+        return None
+
+
+class JunctionControl:
+    """Compiled junction topology with event-driven traffic light phases.
+
+    `segment_approaches` maps a segment index to the approaches located on
+    it. Signal switches sit in a heap keyed by their due time, so a tick with
+    no phase change costs a single comparison.
+
+    Right-of-way between approaches only depends on their headings, so it is
+    resolved once: `conflict_matrices[j][a][b]` is True when approach `a` of
+    junction `j` yields to approach `b`, and each Approach keeps the list of
+    approaches it yields to in `conflicts`. `segment_dependencies` maps a
+    segment index to the segments whose lead vehicles its yield approaches
+    check.
+
+    Compiling copies what it needs out of the junction dicts (approach list,
+    segment, offset, type, green/red durations) and schedules the lights
+    from their `phase`/`phase_start`. Later edits to those dicts are not
+    seen until the next compile: call `Simulation.recompile_junctions()`
+    after changing a junction at runtime.
+    """
+    def __init__(self):
+        self.segment_approaches = {}
+        self.junction_ids = []
+        self.approaches = []
+        self.conflict_matrices = []
+        self.segment_dependencies = {}
+        self._switches = []
+        self._seq = count()
+
+    def __getstate__(self):
+        # itertools.count does not pickle on every Python version; keep its position.
+        state = self.__dict__.copy()
+        state["_seq"] = next(self._seq)
+        self._seq = count(state["_seq"])
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._seq = count(state["_seq"])
+
+    def compile(self, junctions, segment_by_id, segments):
+        self.segment_approaches = {}
+        self.junction_ids = []
+        self.approaches = []
+        self.conflict_matrices = []
+        self.segment_dependencies = {}
+        self._switches = []
+        for j_idx, (jid, junc) in enumerate(junctions.items()):
+            self.junction_ids.append(jid)
+            members = []
+            for appr in junc.get("approaches", []):
+                seg_id = appr.get("segment_id")
+                if seg_id not in segment_by_id:
+                    continue
+                approach = Approach(jid, j_idx, segment_by_id[seg_id], appr)
+                seg = segments[approach.seg_idx]
+                approach.stop_pos = approach.offset * seg.get_length()
+                approach.heading = float(seg.get_heading(min(max(approach.offset, 0.0), 1.0)))
+                members.append(approach)
+                self.approaches.append(approach)
+                self.segment_approaches.setdefault(approach.seg_idx, []).append(approach)
+
+                if approach.is_light:
+                    phase_start = appr.setdefault("phase_start", 0.0)
+                    phase = appr.setdefault("phase", "green")
+                    self._schedule(approach, phase_start, phase)
+
+            matrix = [
+                [a.seg_idx != b.seg_idx and on_right(a.heading, b.heading) for b in members]
+                for a in members
+            ]
+            for a, row in zip(members, matrix):
+                a.conflicts = tuple(b for b, yields in zip(members, row) if yields)
+                if a.conflicts and not a.is_light:
+                    self.segment_dependencies.setdefault(a.seg_idx, set()).update(b.seg_idx for b in a.conflicts)
+            self.conflict_matrices.append(matrix)
+
+    def _schedule(self, approach, phase_start, phase):
+        duration = approach.phase_duration(phase)
+        if duration is not None:
+            heapq.heappush(self._switches, (phase_start + duration, next(self._seq), approach))
+
+    def advance(self, t):
+        """Switch every light whose phase has elapsed at time t; return the switch count."""
+        switches = self._switches
+        switched = []
+        while switches:
+            _, _, approach = switches[0]
+            appr = approach.source
+            duration = approach.phase_duration(appr["phase"])
+            if duration is not None and t - appr["phase_start"] < duration:
+                break
+            heapq.heappop(switches)
+            if duration is None:
+                continue  # phase overridden with a non-cycling value
+            appr["phase"] = "red" if appr["phase"] == "green" else "green"
+            appr["phase_start"] = t
+            switched.append(approach)
+
+        # Reschedule after the loop so a light switches at most once per tick.
+        for approach in switched:
+            self._schedule(approach, t, approach.source["phase"])
+        return len(switched)
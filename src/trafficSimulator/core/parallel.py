@@ -0,0 +1,423 @@
+"""Spatial domain decomposition: one Simulation stepped by several processes.
+
+`partition_segments` splits the network into regions and
+`PartitionedSimulation` steps each region in its own worker process, in
+lock-step with a coordinator that owns time, the vehicle generators and
+the trip statistics.
+
+Every worker holds a full replica of the network (segments, events,
+junctions) but only moves the vehicles on the segments it owns. A tick is
+two round trips:
+
+1. Workers update junctions, events and their vehicles, then take the
+   vehicles that ran off the end of a segment off it. Vehicles entering a
+   segment of another region, and finished trips, go to the coordinator.
+2. The coordinator forwards the handovers; each worker appends every
+   arriving vehicle (its own and handed-over ones) in global source-segment
+   order and reports the tail of its spawn segments. The coordinator then
+   runs the generators against those tails, and new vehicles are sent to
+   their region with the next tick.
+
+Regions never split a junction, so the priority checks between its
+approaches read the same state as in a single process, and updates inside
+a region follow the global segment order. A partitioned run therefore
+reproduces the single-process run exactly for the same seed.
+"""
+
+import multiprocessing
+import pickle
+import traceback
+
+from .idm_engine import IDMEngine
+
+
+def partition_segments(sim, n_regions):
+    """Split segment indices into at most n_regions lists (each sorted).
+
+    Segments sharing a junction are kept in the same region. Groups are then
+    ordered by the x coordinate of their centroid and cut into vertical strips
+    holding roughly the same number of segments each.
+    """
+    n = len(sim.segments)
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for junc in sim.junctions.values():
+        members = [
+            sim.segment_by_id[appr.get("segment_id")]
+            for appr in junc.get("approaches", [])
+            if appr.get("segment_id") in sim.segment_by_id
+        ]
+        for idx in members[1:]:
+            a, b = find(members[0]), find(idx)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+
+    groups = {}
+    for idx in range(n):
+        groups.setdefault(find(idx), []).append(idx)
+
+    def centroid(members):
+        xs = []
+        ys = []
+        for idx in members:
+            pts = sim.segments[idx].points
+            if pts:
+                xmin, ymin, xmax, ymax = sim.segments[idx].bounding_box()
+                xs.append((xmin + xmax) / 2)
+                ys.append((ymin + ymax) / 2)
+        if not xs:
+            return (0.0, 0.0)
+        return (sum(xs) / len(xs), sum(ys) / len(ys))
+
+    ordered = sorted(groups.values(), key=lambda members: centroid(members) + (members[0],))
+    regions = [[] for _ in range(max(1, n_regions))]
+    placed = 0
+    for members in ordered:
+        # Region by the position of the group's middle along the strip order.
+        r = min(len(regions) - 1, int((placed + len(members) / 2) * len(regions) / max(n, 1)))
+        regions[r].extend(members)
+        placed += len(members)
+    return [sorted(region) for region in regions if region]
+
+
+def _spawn_segments(sim):
+    """Indices of the segments the generators can insert vehicles on."""
+    entries = set()
+    for gen in sim.vehicle_generator:
+        for _, config in gen.vehicles:
+            path = config.get("path")
+            if path:
+                entries.add(sim.resolve_path(path[:1])[0])
+            elif config.get("start_segment") in sim.segment_by_id:
+                entries.add(sim.segment_by_id[config["start_segment"]])
+    return entries
+
+
+def _region_worker(conn, payload, owned, spawn_segments, vectorized):
+    """Worker process loop: step the owned segments of a simulation replica."""
+    try:
+        sim = pickle.loads(payload)
+        owned = list(owned)
+        owned_set = set(owned)
+        keep = set()
+        for idx, segment in enumerate(sim.segments):
+            if idx in owned_set:
+                keep.update(segment.vehicles)
+            else:
+                segment.vehicles.clear()
+        sim.vehicles = {vid: veh for vid, veh in sim.vehicles.items() if vid in keep}
+        if vectorized:
+            sim.enable_vectorized_engine(IDMEngine())
+        conn.send(("ready", len(sim.vehicles)))
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+        return
+
+    def receive(veh):
+        sim.vehicles[veh.id] = veh
+        if sim.engine is not None:
+            sim.engine.attach(veh)
+
+    def release(veh):
+        sim.vehicles.pop(veh.id, None)
+        if sim.engine is not None:
+            sim.engine.detach(veh)
+
+    local_moves = []
+    while True:
+        command, data = conn.recv()
+        try:
+            if command == "step":
+                sim.dt, spawns = data
+                # Vehicles spawned by the coordinator at the end of the last tick
+                for seg_idx, veh in spawns:
+                    receive(veh)
+                    sim.segments[seg_idx].vehicles.append(veh.id)
+
+                sim._update_junctions()
+                sim._update_events()
+                if sim.engine is not None:
+                    sim._update_vehicles_vectorized(owned)
+                else:
+                    sim._update_vehicles(owned)
+
+                outgoing = []
+                finished = []
+                local_moves = []
+                moves = sim._collect_transitions(owned)
+                for src, veh, next_idx in moves:
+                    if next_idx is None:
+                        release(veh)
+                        finished.append((src, sim.trip_record(veh)))
+                    elif next_idx in owned_set:
+                        local_moves.append((src, veh.id, next_idx))
+                    else:
+                        release(veh)
+                        outgoing.append((src, veh, next_idx))
+                conn.send(("ok", (outgoing, finished, len(moves))))
+
+            elif command == "merge":
+                arrivals = list(local_moves)
+                for src, veh, next_idx in data:
+                    receive(veh)
+                    arrivals.append((src, veh.id, next_idx))
+                # Same append order as the single-process transition pass
+                arrivals.sort(key=lambda move: move[0])
+                for _, vid, next_idx in arrivals:
+                    sim.segments[next_idx].vehicles.append(vid)
+                local_moves = []
+
+                sim.t += sim.dt
+                sim.frame_count += 1
+                tails = {}
+                for idx in spawn_segments:
+                    queue = sim.segments[idx].vehicles
+                    tails[idx] = sim.vehicles[queue[-1]].x if queue else None
+                conn.send(("ok", tails))
+
+            elif command == "collect":
+                vehicles = list(sim.vehicles.values())
+                for veh in vehicles:
+                    release(veh)
+                queues = {idx: list(sim.segments[idx].vehicles) for idx in owned}
+                conn.send(("ok", (vehicles, queues)))
+
+            elif command == "stop":
+                conn.send(("ok", None))
+                return
+        except Exception:
+            conn.send(("error", traceback.format_exc()))
+            return
+
+
+class _SpawnFrontier:
+    """What the vehicle generators see of a partitioned simulation.
+
+    Space checks use the spawn-segment tails reported by the workers; added
+    vehicles are queued for their region instead of being stepped locally.
+    Everything else (time, routing, vehicle pool) is the coordinator's.
+    """
+    def __init__(self, runner, tails):
+        self._runner = runner
+        self._sim = runner.sim
+        self._tails = tails
+
+    def __getattr__(self, name):
+        return getattr(self._sim, name)
+
+    def has_space_for(self, veh):
+        if veh.path[0] not in self._tails:
+            raise ValueError(f"Segment {veh.path[0]} is not a spawn segment of any generator")
+        tail = self._tails[veh.path[0]]
+        return tail is None or tail > veh.s0 + veh.l
+
+    def add_vehicle(self, veh):
+        self._sim.prepare_vehicle_path(veh)
+        veh.spawn_time = self._sim.t
+        seg_idx = veh.path[0]
+        region = self._runner.segment_region[seg_idx]
+        self._runner._spawns[region].append((seg_idx, veh))
+        self._runner.vehicles[veh.id] = region
+        self._tails[seg_idx] = veh.x
+
+
+class PartitionedSimulation:
+    """Step a Simulation across worker processes, one per region.
+
+    While running, the wrapped simulation only keeps time, routing, the
+    generators and the trip statistics: its vehicles live in the workers.
+    `vehicles` maps each active vehicle id to its region. `close()` (or
+    leaving the `with` block) brings the vehicles back into `sim`, which
+    can then carry on in a single process.
+    """
+    def __init__(self, sim, regions=2, mp_context=None):
+        self.sim = sim
+        self.regions = partition_segments(sim, regions) if isinstance(regions, int) else regions
+        self.segment_region = {}
+        for r, region in enumerate(self.regions):
+            for idx in region:
+                self.segment_region[idx] = r
+        if len(self.segment_region) != len(sim.segments):
+            raise ValueError("Regions must cover every segment exactly once")
+
+        self.vectorized = sim.engine is not None
+        sim.disable_vectorized_engine()
+
+        spawn_segments = _spawn_segments(sim)
+        per_region = [[] for _ in self.regions]
+        for idx in sorted(spawn_segments):
+            per_region[self.segment_region[idx]].append(idx)
+
+        # Workers get the network, events, junctions and vehicles, never the
+        # generators or listeners: those stay with the coordinator.
+        replica = object.__new__(type(sim))
+        replica.__dict__.update(sim.__dict__)
+        replica.vehicle_generator = []
+        replica.trip_listeners = []
+        replica.trip_records = None
+        replica.recycle_vehicles = False
+        replica.vehicle_pool = []
+        payload = pickle.dumps(replica)
+
+        self.vehicles = {}
+        for idx, segment in enumerate(sim.segments):
+            for vid in segment.vehicles:
+                self.vehicles[vid] = self.segment_region[idx]
+
+        ctx = mp_context or multiprocessing.get_context()
+        self._conns = []
+        self._procs = []
+        for region, spawns in zip(self.regions, per_region):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(
+                target=_region_worker,
+                args=(child, payload, region, spawns, self.vectorized),
+                daemon=True,
+            )
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        self._spawns = [[] for _ in self.regions]
+        self._closed = False
+        self._gather()
+
+        # The vehicles now live in the workers.
+        for segment in sim.segments:
+            segment.vehicles.clear()
+        sim.vehicles = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def t(self):
+        return self.sim.t
+
+    @property
+    def dt(self):
+        return self.sim.dt
+
+    @dt.setter
+    def dt(self, value):
+        # Sent to the workers with every step.
+        self.sim.dt = value
+
+    def _gather(self):
+        results = []
+        for r, conn in enumerate(self._conns):
+            status, data = conn.recv()
+            if status == "error":
+                self._terminate()
+                raise RuntimeError(f"Region worker {r} failed:\n{data}")
+            results.append(data)
+        return results
+
+    def _call(self, command, per_region):
+        for conn, data in zip(self._conns, per_region):
+            conn.send((command, data))
+        return self._gather()
+
+    def update(self):
+        if self._closed:
+            raise RuntimeError("PartitionedSimulation is closed")
+        sim = self.sim
+        # Profiled from the coordinator: the "vehicles" phase is the workers'
+        # step round trip, "transitions" the handover and merge.
+        prof = sim.profiler
+        if prof is not None:
+            prof.start_tick(sim)
+            vehicles_updated = len(self.vehicles)
+
+        # Keep the coordinator's light phases and active events current too.
+        sim._update_junctions()
+        if prof is not None:
+            prof.lap()
+        sim._update_events()
+        if prof is not None:
+            prof.lap()
+
+        spawns, self._spawns = self._spawns, [[] for _ in self.regions]
+        replies = self._call("step", [(sim.dt, region_spawns) for region_spawns in spawns])
+        if prof is not None:
+            prof.lap()
+
+        handovers = [[] for _ in self.regions]
+        finished = []
+        transitions = 0
+        for outgoing, done, moves in replies:
+            transitions += moves
+            for move in outgoing:
+                region = self.segment_region[move[2]]
+                handovers[region].append(move)
+                self.vehicles[move[1].id] = region
+            finished.extend(done)
+        # Trips are recorded in segment order, as in a single-process tick.
+        finished.sort(key=lambda item: item[0])
+        for _, record in finished:
+            self.vehicles.pop(record.id, None)
+            sim.record_trip(record)
+
+        tails = {}
+        for reply in self._call("merge", handovers):
+            tails.update(reply)
+        if prof is not None:
+            prof.lap()
+            before_spawns = len(self.vehicles)
+
+        sim._update_generators(_SpawnFrontier(self, tails))
+        if prof is not None:
+            prof.lap()
+            prof.end_tick(vehicles_updated, transitions, len(self.vehicles) - before_spawns)
+
+        sim.t += sim.dt
+        sim.frame_count += 1
+
+    def run(self, steps):
+        for _ in range(steps):
+            self.update()
+
+    def summary(self):
+        summary = self.sim.summary()
+        summary["active_vehicles"] = len(self.vehicles)
+        summary["regions"] = len(self.regions)
+        return summary
+
+    def close(self):
+        """Stop the workers and move every vehicle back into `sim`."""
+        if self._closed:
+            return
+        sim = self.sim
+        for vehicles, queues in self._call("collect", [None] * len(self.regions)):
+            for veh in vehicles:
+                sim.vehicles[veh.id] = veh
+            for idx, queue in queues.items():
+                sim.segments[idx].vehicles.extend(queue)
+        # Vehicles spawned in the last tick had not reached their worker yet.
+        for spawns in self._spawns:
+            for seg_idx, veh in spawns:
+                sim.vehicles[veh.id] = veh
+                sim.segments[seg_idx].vehicles.append(veh.id)
+        self._spawns = [[] for _ in self.regions]
+        self._call("stop", [None] * len(self.regions))
+        self._terminate()
+        if self.vectorized:
+            sim.enable_vectorized_engine()
+
+    def _terminate(self):
+        self._closed = True
+        for conn in self._conns:
+            conn.close()
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
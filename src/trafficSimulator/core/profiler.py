@@ -0,0 +1,108 @@
+import csv
+from collections import deque
+from time import perf_counter
+
+
+# Phases of Simulation.update, in execution order.
+PHASES = ("junctions", "events", "vehicles", "transitions", "generators")
+# Per-tick counters.
+COUNTERS = ("vehicles_updated", "transitions", "spawns", "routing_calls", "route_misses")
+
+
+class Profiler:
+    """Per-phase wall time and per-tick counters of Simulation.update.
+
+    Totals cover every tick since the profiler was enabled (or reset); the
+    last `window` ticks are also kept one row each for rolling statistics
+    and export. A row is a tuple of t, the phase times (seconds) and the
+    counters, in the order of `columns`.
+    """
+    def __init__(self, window=600):
+        self.window = window
+        self.columns = ("t",) + PHASES + COUNTERS
+        self.reset()
+
+    def reset(self):
+        self.ticks = 0
+        self.phase_totals = dict.fromkeys(PHASES, 0.0)
+        self.phase_max = dict.fromkeys(PHASES, 0.0)
+        self.counter_totals = dict.fromkeys(COUNTERS, 0)
+        self.rows = deque(maxlen=self.window)
+
+    def start_tick(self, sim):
+        self._sim = sim
+        self._routing_calls = sim.routing_calls
+        self._route_misses = sim.route_cache.misses
+        self._times = []
+        self._last = perf_counter()
+
+    def lap(self):
+        """Close the current phase."""
+        now = perf_counter()
+        self._times.append(now - self._last)
+        self._last = now
+
+    def end_tick(self, vehicles_updated, transitions, spawns):
+        sim = self._sim
+        counts = (
+            vehicles_updated,
+            transitions,
+            spawns,
+            sim.routing_calls - self._routing_calls,
+            sim.route_cache.misses - self._route_misses,
+        )
+        for phase, elapsed in zip(PHASES, self._times):
+            self.phase_totals[phase] += elapsed
+            if elapsed > self.phase_max[phase]:
+                self.phase_max[phase] = elapsed
+        for name, value in zip(COUNTERS, counts):
+            self.counter_totals[name] += value
+        self.ticks += 1
+        self.rows.append((sim.t,) + tuple(self._times) + counts)
+        self._sim = None
+
+    def stats(self):
+        """Aggregates over every profiled tick."""
+        return self._aggregate(self.ticks, self.phase_totals, self.phase_max, self.counter_totals)
+
+    def rolling_stats(self):
+        """Aggregates over the last `window` ticks."""
+        n_phases = len(PHASES)
+        totals = dict.fromkeys(PHASES, 0.0)
+        maxima = dict.fromkeys(PHASES, 0.0)
+        counters = dict.fromkeys(COUNTERS, 0)
+        for row in self.rows:
+            for phase, elapsed in zip(PHASES, row[1:1 + n_phases]):
+                totals[phase] += elapsed
+                maxima[phase] = max(maxima[phase], elapsed)
+            for name, value in zip(COUNTERS, row[1 + n_phases:]):
+                counters[name] += value
+        return self._aggregate(len(self.rows), totals, maxima, counters)
+
+    @staticmethod
+    def _aggregate(ticks, totals, maxima, counters):
+        tick_total = sum(totals.values())
+        return {
+            "ticks": ticks,
+            "seconds": tick_total,
+            "mean_tick_ms": 1e3 * tick_total / ticks if ticks else 0.0,
+            "phases": {
+                phase: {
+                    "seconds": totals[phase],
+                    "mean_ms": 1e3 * totals[phase] / ticks if ticks else 0.0,
+                    "max_ms": 1e3 * maxima[phase],
+                    "share": totals[phase] / tick_total if tick_total > 0 else 0.0,
+                }
+                for phase in PHASES
+            },
+            "counters": {
+                name: {"total": counters[name], "per_tick": counters[name] / ticks if ticks else 0.0}
+                for name in COUNTERS
+            },
+        }
+
+    def export_csv(self, out):
+        """Write the rolling window, one row per tick, to the open text stream `out`."""
+        writer = csv.writer(out)
+        writer.writerow(self.columns)
+        writer.writerows(self.rows)
@@ -0,0 +1,183 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+# Recordable per-vehicle columns and their storage types. `segment` is the
+# segment index (the id map is saved in meta.json), `x` the distance along
+# it and `px`/`py` the world position.
+TRAJECTORY_FIELDS = {
+    "t": np.float64,
+    "id": np.int64,
+    "segment": np.int32,
+    "x": np.float64,
+    "v": np.float64,
+    "a": np.float64,
+    "px": np.float64,
+    "py": np.float64,
+}
+
+TRAJECTORY_FORMATS = ("npz", "parquet")
+
+# Slack when comparing the clock with the next sampling time.
+SAMPLE_EPSILON = 1e-9
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+class TrajectoryRecorder:
+    """Stream vehicle states into fixed-size column chunks on disk.
+
+    Every `interval` simulated seconds (every tick when None) one row per
+    active vehicle is written into a preallocated chunk of `chunk_size`
+    rows. Full chunks are written to `directory` as chunk_00000.npz,
+    chunk_00001.npz, ... (or .parquet) and the buffer is reused, so memory
+    stays bounded however long the run is. meta.json describes the columns
+    and maps segment indices to ids; `load_trajectories` reads it all back.
+    It is written when recording starts and rewritten after every chunk,
+    so the chunks of an interrupted run stay readable; "complete" is only
+    set by `close()`.
+    """
+    def __init__(self, directory, interval=None, fields=None, chunk_size=100_000, format="npz"):
+        fields = tuple(fields) if fields is not None else tuple(TRAJECTORY_FIELDS)
+        unknown = [f for f in fields if f not in TRAJECTORY_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown trajectory fields {unknown}, expected some of {tuple(TRAJECTORY_FIELDS)}")
+        if format not in TRAJECTORY_FORMATS:
+            raise ValueError(f"Unknown trajectory format '{format}', expected one of {TRAJECTORY_FORMATS}")
+        if format == "parquet" and _pyarrow() is None:
+            raise ImportError("Writing Parquet trajectories requires pyarrow")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.interval = interval
+        self.fields = fields
+        self.chunk_size = chunk_size
+        self.format = format
+        self._columns = {name: np.empty(chunk_size, dtype=TRAJECTORY_FIELDS[name]) for name in fields}
+        self._fill = 0
+        self._need_position = "px" in fields or "py" in fields
+        self._next_sample = None
+        self.chunks = 0
+        self.rows = 0
+        self.samples = 0
+        self._segment_ids = []
+        self._write_meta(complete=False)
+
+    def sample(self, sim):
+        """Record the current state of sim if a sample is due."""
+        t = sim.t
+        if self._next_sample is not None and t < self._next_sample - SAMPLE_EPSILON:
+            return
+        if self.interval:
+            self._next_sample = t + self.interval if self._next_sample is None else self._next_sample + self.interval
+        if len(self._segment_ids) != len(sim.segments):
+            self._segment_ids = [seg.id for seg in sim.segments]
+            self._write_meta(complete=False)
+
+        vehicles = sim.vehicles
+        for seg_idx, seg in enumerate(sim.segments):
+            ids = seg.vehicles
+            if not ids:
+                continue
+            block = [vehicles[vid] for vid in ids]
+            data = {"t": t, "segment": seg_idx}
+            if "id" in self.fields:
+                data["id"] = [veh.id for veh in block]
+            if "x" in self.fields or self._need_position:
+                data["x"] = np.fromiter((veh.x for veh in block), dtype=float, count=len(block))
+            if "v" in self.fields:
+                data["v"] = [veh.v for veh in block]
+            if "a" in self.fields:
+                data["a"] = [veh.a for veh in block]
+            if self._need_position:
+                # Same mapping as Simulation.vehicle_poses
+                points = seg.get_point(data["x"] / seg.get_length())
+                data["px"] = points[:, 0]
+                data["py"] = points[:, 1]
+            self._append(data, len(block))
+        self.samples += 1
+
+    def _append(self, data, n):
+        start = 0
+        while start < n:
+            take = min(n - start, self.chunk_size - self._fill)
+            end = self._fill + take
+            for name, column in self._columns.items():
+                value = data[name]
+                column[self._fill:end] = value if np.isscalar(value) else value[start:start + take]
+            self._fill = end
+            start += take
+            if self._fill == self.chunk_size:
+                self.flush()
+
+    def flush(self):
+        """Write the buffered rows as a new chunk file."""
+        if not self._fill:
+            return
+        columns = {name: column[:self._fill] for name, column in self._columns.items()}
+        path = self.directory / f"chunk_{self.chunks:05d}.{self.format}"
+        if self.format == "parquet":
+            pa = _pyarrow()
+            pa.parquet.write_table(pa.table(columns), path)
+        else:
+            np.savez(path, **columns)
+        self.chunks += 1
+        self.rows += self._fill
+        self._fill = 0
+        self._write_meta(complete=False)
+
+    def close(self):
+        """Flush the last partial chunk and mark meta.json complete."""
+        self.flush()
+        self._write_meta(complete=True)
+
+    def _write_meta(self, complete):
+        meta = {
+            "fields": list(self.fields),
+            "dtypes": {name: np.dtype(TRAJECTORY_FIELDS[name]).str for name in self.fields},
+            "format": self.format,
+            "interval": self.interval,
+            "chunks": self.chunks,
+            "rows": self.rows,
+            "samples": self.samples,
+            "segment_ids": self._segment_ids,
+            "complete": complete,
+        }
+        # Replace the file in one step: a reader never sees it half written.
+        tmp = self.directory / "meta.json.tmp"
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.directory / "meta.json")
+
+
+def load_trajectories(directory, fields=None):
+    """Concatenate the chunks written by a TrajectoryRecorder; returns {field: array}."""
+    directory = Path(directory)
+    with (directory / "meta.json").open("r", encoding="utf-8") as f:
+        meta = json.load(f)
+    fields = list(fields) if fields is not None else meta["fields"]
+    parts = {name: [] for name in fields}
+    for i in range(meta["chunks"]):
+        path = directory / f"chunk_{i:05d}.{meta['format']}"
+        if meta["format"] == "parquet":
+            table = _pyarrow().parquet.read_table(path, columns=fields)
+            for name in fields:
+                parts[name].append(table.column(name).to_numpy())
+        else:
+            with np.load(path) as chunk:
+                for name in fields:
+                    parts[name].append(chunk[name])
+    return {
+        name: np.concatenate(arrays) if arrays else np.empty(0, dtype=meta["dtypes"][name])
+        for name, arrays in parts.items()
+    }
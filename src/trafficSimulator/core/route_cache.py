@@ -0,0 +1,70 @@
+from collections import OrderedDict
+
+
+class RouteCache:
+    """Bounded LRU cache for routing results.
+
+    Routes are keyed by (start_id, end_id, graph_version) so a rebuilt graph
+    never serves stale paths. When `use_trees` is set, a one-to-all shortest
+    path tree is kept per origin and later destinations are read from it.
+    """
+    def __init__(self, max_routes=4096, max_trees=256, use_trees=False):
+        self.max_routes = max_routes
+        self.max_trees = max_trees
+        self.use_trees = use_trees
+        self.routes = OrderedDict()
+        self.trees = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.tree_hits = 0
+        self.tree_misses = 0
+
+    @staticmethod
+    def _get(table, key):
+        value = table.get(key)
+        if value is not None:
+            table.move_to_end(key)
+        return value
+
+    @staticmethod
+    def _put(table, key, value, limit):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > limit:
+            table.popitem(last=False)
+
+    def get_route(self, key):
+        route = self._get(self.routes, key)
+        if route is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return route
+
+    def put_route(self, key, route):
+        self._put(self.routes, key, route, self.max_routes)
+
+    def get_tree(self, key):
+        tree = self._get(self.trees, key)
+        if tree is None:
+            self.tree_misses += 1
+        else:
+            self.tree_hits += 1
+        return tree
+
+    def put_tree(self, key, tree):
+        self._put(self.trees, key, tree, self.max_trees)
+
+    def clear(self):
+        self.routes.clear()
+        self.trees.clear()
+
+    def stats(self):
+        return {
+            "routes": len(self.routes),
+            "trees": len(self.trees),
+            "hits": self.hits,
+            "misses": self.misses,
+            "tree_hits": self.tree_hits,
+            "tree_misses": self.tree_misses,
+        }
@@ -0,0 +1,91 @@
+class RoutingGraph:
+    """Directed segment connectivity, maintained incrementally.
+
+    Edges follow segment direction (start -> end): u -> v when the end point
+    of u and the start point of v fall on the same cell of a grid of size
+    `tol`, or lie within `tol` of each other in neighbouring cells. Endpoint
+    hash maps and adjacency lists are updated on every insertion and removal
+    instead of being rebuilt.
+    """
+    def __init__(self, tol):
+        self.tol = tol
+        self.start_map = {}  # quantized point -> [segment id] starting there
+        self.end_map = {}    # quantized point -> [segment id] ending there
+        self.adjacency = {}  # segment id -> [(next segment id, cost)]
+        self._keys = {}      # segment id -> (start key, end key, length, start point, end point, order)
+        self._order = 0
+        self.version = 0
+
+    def _point_key(self, pt):
+        """Quantize a point to an integer grid to detect connectivity with tolerance."""
+        return (round(pt[0] / self.tol), round(pt[1] / self.tol))
+
+    def _near(self, table, pt, key):
+        """Segment ids in table whose endpoint snaps to pt (same cell or within tol)."""
+        tol = self.tol
+        found = []
+        for i in range(round((pt[0] - tol) / tol), round((pt[0] + tol) / tol) + 1):
+            for j in range(round((pt[1] - tol) / tol), round((pt[1] + tol) / tol) + 1):
+                for seg_id in table.get((i, j), ()):
+                    if (i, j) == key:
+                        found.append(seg_id)
+                        continue
+                    other = self._keys[seg_id][4 if table is self.end_map else 3]
+                    if (other[0] - pt[0])**2 + (other[1] - pt[1])**2 <= tol*tol:
+                        found.append(seg_id)
+        # Insertion order keeps adjacency lists deterministic.
+        found.sort(key=lambda seg_id: self._keys[seg_id][5])
+        return found
+
+    def __contains__(self, seg_id):
+        return seg_id in self.adjacency
+
+    def add_segment(self, seg_id, seg):
+        if seg_id in self.adjacency:
+            raise ValueError(f"Segment id '{seg_id}' already in routing graph")
+        self.adjacency[seg_id] = []
+        self.version += 1
+        if not seg.points:
+            return
+
+        start_pt = seg.points[0]
+        end_pt = seg.points[-1]
+        start_key = self._point_key(start_pt)
+        end_key = self._point_key(end_pt)
+        length = seg.get_length()
+        self._keys[seg_id] = (start_key, end_key, length, start_pt, end_pt, self._order)
+        self._order += 1
+
+        # Incoming edges: segments ending where this one starts
+        for u in self._near(self.end_map, start_pt, start_key):
+            if u != seg_id:
+                self.adjacency[u].append((seg_id, length))
+        # Outgoing edges: segments starting where this one ends
+        for v in self._near(self.start_map, end_pt, end_key):
+            if v != seg_id:
+                self.adjacency[seg_id].append((v, self._keys[v][2]))
+
+        self.start_map.setdefault(start_key, []).append(seg_id)
+        self.end_map.setdefault(end_key, []).append(seg_id)
+
+    def remove_segment(self, seg_id):
+        if seg_id not in self.adjacency:
+            raise ValueError(f"Segment id '{seg_id}' not in routing graph")
+        del self.adjacency[seg_id]
+        self.version += 1
+        keys = self._keys.pop(seg_id, None)
+        if keys is None:
+            return
+
+        start_key, end_key, _, start_pt, _, _ = keys
+        self._discard(self.start_map, start_key, seg_id)
+        self._discard(self.end_map, end_key, seg_id)
+        for u in self._near(self.end_map, start_pt, start_key):
+            self.adjacency[u] = [edge for edge in self.adjacency[u] if edge[0] != seg_id]
+
+    @staticmethod
+    def _discard(table, key, seg_id):
+        bucket = table[key]
+        bucket.remove(seg_id)
+        if not bucket:
+            del table[key]
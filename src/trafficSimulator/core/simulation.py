@@ -1,8 +1,25 @@
+import logging
+from collections import deque
+
 from .vehicle_generator import VehicleGenerator
 from .geometry.quadratic_curve import QuadraticCurve
 from .geometry.cubic_curve import CubicCurve
 from .geometry.segment import Segment
-from .vehicle import Vehicle
+from .vehicle import Vehicle, TripRecord
+from .idm_engine import IDMEngine
+from .event_scheduler import EventScheduler
+from .spawn_scheduler import SpawnScheduler
+from .junction_control import JunctionControl
+from .route_cache import RouteCache
+from .routing_graph import RoutingGraph
+from .spatial_index import SpatialIndex
+from .profiler import Profiler
+from .recorder import TrajectoryRecorder
+from .geometry.pose_table import PoseTable
+from . import snapshot
+
+
+log = logging.getLogger(__name__)
 
 
 class Simulation:
@@ -11,32 +28,165 @@ class Simulation:
         self.segment_by_id = {}
         self.vehicles = {}
         self.vehicle_generator = []
+        self.spawn_scheduler = SpawnScheduler()
+        self._generators_dirty = True
         self.environment = []  # static environment objects (trees, lamps, RSUs, etc.)
         self.events = []  # scheduled events (accidents, works, animals)
         self.active_event_ids = set()
         self.segment_event_factors = {}
         self.segment_events_by_idx = {}
         self.event_lookahead = 50  # meters to look ahead for event-based slowdown
+        self.event_scheduler = EventScheduler()
+        self._events_dirty = True
+        self._active_event_counts = {}  # event id -> number of active events sharing it
         self.junctions = {}  # id -> junction dict
-        self.segment_junctions = {}  # seg_idx -> list of approach dicts
+        self.segment_junctions = {}  # seg_idx -> list of compiled Approach objects
+        self.junction_control = JunctionControl()
+        self._junctions_dirty = True
 
-        # Routing graph (directed) built over segment endpoints
-        self.graph = {}
-        self._graph_dirty = True
+        # Routing graphs (directed) over segment endpoints, one per snapping tolerance,
+        # kept up to date as segments are added.
         self.graph_tol = 5e-2  # tolerance for snapping endpoints when building connectivity
+        self._routing_graphs = {}
+        self.route_cache = RouteCache()
+
+        # Uniform-grid index over segments, endpoints and environment objects
+        self.spatial_index = SpatialIndex()
+        self._environment_indexed = 0  # environment objects already in the index
+        self._pose_table = None  # batched point/heading lookup, rebuilt when segments change
+
+        # Finished vehicles are retired from `vehicles`; their trips are summarized here.
+        self.trip_records = deque(maxlen=10000)  # most recent TripRecords
+        self.trip_listeners = []  # callables receiving every TripRecord
+        self.completed_trips = 0
+        self.total_trip_distance = 0.0
+        self.total_trip_time = 0.0
+        # When enabled, retired Vehicle objects are reset and reused for new spawns.
+        self.recycle_vehicles = False
+        self.vehicle_pool = []
+
+        # Optional structure-of-arrays car-following engine (see enable_vectorized_engine)
+        self.engine = None
+
+        # Per-phase tick instrumentation; None (off) costs one check per phase.
+        self.profiler = None
+        self.routing_calls = 0  # calls to prepare_vehicle_path
+
+        # Optional trajectory recorder, sampled at the end of every tick.
+        self.recorder = None
 
         self.t = 0.0
         self.frame_count = 0
         self.dt = 1/60  
 
+    def __getstate__(self):
+        # Listeners, instrumentation and the recycling pool belong to the
+        # running process and are not part of the simulated state; the pose
+        # table is rebuilt from the segments on first use.
+        state = self.__dict__.copy()
+        state["trip_listeners"] = []
+        state["profiler"] = None
+        state["recorder"] = None
+        state["vehicle_pool"] = []
+        state["_pose_table"] = None
+        return state
+
+    def save_state(self, path):
+        """Write the complete simulation state to a binary snapshot file.
+
+        Vehicles, segment occupancy, generators (timers and RNG state),
+        junction phases, events, caches, the engine and t/frame_count are
+        all saved; continuing a restored copy gives the same results as
+        continuing this one. Trip listeners, the profiler and the
+        trajectory recorder are not saved.
+        """
+        snapshot.save_state(self, path)
+
+    @staticmethod
+    def load_state(path):
+        """Return the Simulation stored by save_state at path (a pickle: trusted files only)."""
+        return snapshot.load_state(path)
 
     def add_vehicle(self, veh):
         # Resolve/compute path identifiers to indices and register vehicle.
         self.prepare_vehicle_path(veh)
+        veh.spawn_time = self.t
         self.vehicles[veh.id] = veh
+        if self.engine is not None:
+            self.engine.attach(veh)
         if len(veh.path) > 0:
             self.segments[veh.path[0]].add_vehicle(veh)
 
+    def make_vehicle(self, config):
+        """Return a Vehicle for a config dict or a prototype Vehicle to clone.
+
+        Reuses a retired vehicle object when recycling is on.
+        """
+        if self.vehicle_pool:
+            veh = self.vehicle_pool.pop()
+            if isinstance(config, Vehicle):
+                return veh.copy_from(config)
+            veh.reset(config)
+            return veh
+        if isinstance(config, Vehicle):
+            return config.clone()
+        return Vehicle(config)
+
+    def release_vehicle(self, veh):
+        """Hand an unused or retired vehicle back to the pool."""
+        if self.recycle_vehicles:
+            self.vehicle_pool.append(veh)
+
+    def retire_vehicle(self, veh):
+        """Remove a finished vehicle from the active set and record its trip."""
+        self.vehicles.pop(veh.id, None)
+        if self.engine is not None:
+            self.engine.detach(veh)
+        record = self.trip_record(veh)
+        self.record_trip(record)
+        self.release_vehicle(veh)
+        return record
+
+    def trip_record(self, veh):
+        """Build the TripRecord of a vehicle leaving the network now."""
+        duration = self.t - veh.spawn_time if veh.spawn_time is not None else 0.0
+        return TripRecord(
+            veh.id,
+            veh.vehicle_class,
+            veh.spawn_time,
+            self.t,
+            tuple(self.segments[idx].id if self.segments[idx].id is not None else idx for idx in veh.path),
+            veh.distance,
+            veh.distance / duration if duration > 0 else 0.0,
+        )
+
+    def record_trip(self, record):
+        """Add a finished trip to the aggregates and notify the trip listeners."""
+        self.completed_trips += 1
+        self.total_trip_distance += record.distance
+        self.total_trip_time += record.exit_time - record.spawn_time if record.spawn_time is not None else 0.0
+        self.trip_records.append(record)
+        for listener in self.trip_listeners:
+            listener(record)
+
+    def enable_vectorized_engine(self, engine=None):
+        """Step all vehicles through a batched NumPy IDM engine.
+
+        Registered vehicles become thin views over the engine arrays.
+        """
+        self.engine = engine or IDMEngine()
+        for veh in self.vehicles.values():
+            self.engine.attach(veh)
+        return self.engine
+
+    def disable_vectorized_engine(self):
+        """Return to per-vehicle updates, copying the array state back."""
+        if self.engine is None:
+            return
+        for veh in self.vehicles.values():
+            self.engine.detach(veh)
+        self.engine = None
+
     def add_segment(self, seg):
         # Keep lookup by segment id (when provided) for path resolution.
         if seg.id is not None:
@@ -44,26 +194,105 @@ class Simulation:
                 raise ValueError(f"Segment id '{seg.id}' already exists")
             self.segment_by_id[seg.id] = len(self.segments)
         self.segments.append(seg)
-        self._graph_dirty = True
+        self.spatial_index.add_segment(len(self.segments) - 1, seg)
+        self._pose_table = None
+        if seg.id is not None:
+            for graph in self._routing_graphs.values():
+                graph.add_segment(seg.id, seg)
+        self._events_dirty = True
+        self._junctions_dirty = True
+
+    def remove_segment(self, seg_id):
+        """Remove the segment with id seg_id; later segments move down one index.
+
+        The segment must carry no vehicles and appear in no active
+        vehicle's or generator's path. Vehicle paths given as indices are
+        renumbered, and every routing graph drops the segment in place.
+        """
+        if seg_id not in self.segment_by_id:
+            raise ValueError(f"Unknown segment id '{seg_id}'")
+        idx = self.segment_by_id[seg_id]
+        if self.segments[idx].vehicles:
+            raise ValueError(f"Segment '{seg_id}' still has vehicles on it")
+        paths = [veh.path for veh in self.vehicles.values()]
+        for gen in self.vehicle_generator:
+            paths.append(gen.upcoming_vehicle.path)
+            paths.extend(prototype.path for prototype in gen._prototypes)
+        if any(idx in path or seg_id in path for path in paths):
+            raise ValueError(f"Segment '{seg_id}' is on the path of an active vehicle or generator")
+
+        for path in paths:
+            path[:] = [item - 1 if not isinstance(item, str) and item > idx else item for item in path]
+        del self.segments[idx]
+        del self.segment_by_id[seg_id]
+        for other, other_idx in self.segment_by_id.items():
+            if other_idx > idx:
+                self.segment_by_id[other] = other_idx - 1
+        self.spatial_index.remove_segment(idx)
+        self._pose_table = None
+        for graph in self._routing_graphs.values():
+            graph.remove_segment(seg_id)
+        # Cached routes hold segment indices.
+        self.route_cache.clear()
+        self._events_dirty = True
+        self._junctions_dirty = True
 
     def add_vehicle_generator(self, gen):
         self.vehicle_generator.append(gen)
+        gen.simulation = self
+        self._generators_dirty = True
+
+    def reschedule_generators(self):
+        """Recompute every generator's wake-up time.
+
+        Setting a generator's vehicle_rate calls this by itself; call it
+        after changing anything else that moves the next spawn attempt
+        (e.g. last_added_time or the headway model).
+        """
+        self._generators_dirty = True
 
     def add_environment_object(self, obj):
         # obj is expected to be a dict-like structure with at least a type and position
         self.environment.append(obj)
+        self.index_environment()
+
+    def index_environment(self):
+        """Add environment objects appended to `environment` directly to the spatial index."""
+        for idx in range(self._environment_indexed, len(self.environment)):
+            position = self.environment[idx].get("position", (0, 0))
+            if position is not None:
+                self.spatial_index.add_point("environment", idx, position)
+        self._environment_indexed = len(self.environment)
 
     def add_event(self, event):
         """Register a timed event; assigns an id if missing."""
         if "id" not in event or event.get("id") is None:
             event["id"] = f"event_{len(self.events)}"
         self.events.append(event)
+        self._events_dirty = True
+
+    def recompile_events(self):
+        """Pick up runtime edits to the event dicts (start_time, duration, end_time, segment_id, ...).
+
+        The event queues are rebuilt on the next tick from the current
+        time: events are active again exactly when start <= t < end.
+        """
+        self._events_dirty = True
 
     def add_junction(self, junction):
         """Register a junction with approaches and optional traffic lights."""
         jid = junction.get("id", f"junction_{len(self.junctions)}")
         junction["id"] = jid
         self.junctions[jid] = junction
+        self._junctions_dirty = True
+
+    def recompile_junctions(self):
+        """Pick up runtime edits to the junction dicts (timings, offsets, types, approaches).
+
+        Lights keep their current phase and phase start; the next switch is
+        rescheduled with the new durations.
+        """
+        self._junctions_dirty = True
 
     def create_vehicle(self, **kwargs):
         veh = Vehicle(kwargs)
@@ -85,41 +314,89 @@ class Simulation:
         gen = VehicleGenerator(kwargs)
         self.add_vehicle_generator(gen)
 
-    def _point_key(self, pt, tol):
-        """Quantize a point to an integer grid to detect connectivity with tolerance."""
-        return (round(pt[0] / tol), round(pt[1] / tol))
-
-    def rebuild_graph(self, tol=None):
-        """Build a directed graph where edges follow segment direction (start -> end)."""
+    def routing_graph(self, tol=None):
+        """Return the routing graph for a snapping tolerance, building it on first use."""
         tol = tol or self.graph_tol
-        start_map = {}
-        end_map = {}
-        for seg_id, idx in self.segment_by_id.items():
-            seg = self.segments[idx]
-            if not seg.points:
+        graph = self._routing_graphs.get(tol)
+        if graph is None:
+            graph = RoutingGraph(tol)
+            for seg_id, idx in self.segment_by_id.items():
+                graph.add_segment(seg_id, self.segments[idx])
+            self._routing_graphs[tol] = graph
+        return graph
+
+    def pose_table(self):
+        """PoseTable over all segments (built on first use after a change)."""
+        if self._pose_table is None:
+            self._pose_table = PoseTable(self.segments)
+        return self._pose_table
+
+    def segment_poses(self, seg_indices, offsets):
+        """Points (n, 2) and headings (n,) at offsets along the given segments, in one call."""
+        return self.pose_table().query(seg_indices, offsets)
+
+    def vehicle_poses(self, seg_indices=None):
+        """World positions and headings of the vehicles on the given segments (default: all).
+
+        Returns (vehicles, points (n, 2), headings (n,)) with vehicles listed
+        segment by segment, leader first.
+        """
+        if seg_indices is None:
+            seg_indices = range(len(self.segments))
+        vehicles = []
+        owners = []
+        offsets = []
+        for seg_idx in seg_indices:
+            segment = self.segments[seg_idx]
+            if not segment.vehicles:
                 continue
-            start_key = self._point_key(seg.points[0], tol)
-            end_key = self._point_key(seg.points[-1], tol)
-            start_map.setdefault(start_key, []).append(seg_id)
-            end_map.setdefault(end_key, []).append(seg_id)
-
-        graph = {sid: [] for sid in self.segment_by_id}
-        for end_key, from_list in end_map.items():
-            to_list = start_map.get(end_key, [])
-            for u in from_list:
-                for v in to_list:
-                    if u == v:
-                        continue
-                    cost = self.segments[self.segment_by_id[v]].get_length()
-                    graph[u].append((v, cost))
-
-        self.graph = graph
-        self._graph_dirty = False
-        return start_map, end_map
-
-    def _dijkstra_path(self, start_seg_id, end_seg_id):
+            length = segment.get_length()
+            for vid in segment.vehicles:
+                veh = self.vehicles[vid]
+                vehicles.append(veh)
+                owners.append(seg_idx)
+                offsets.append(veh.x / length)
+        points, headings = self.segment_poses(owners, offsets)
+        return vehicles, points, headings
+
+    def set_routing_graph(self, graph):
+        """Install a prebuilt routing graph (e.g. from the network cache) for its tolerance."""
+        self._routing_graphs[graph.tol] = graph
+        # Versions of an unrelated graph may repeat: drop routes keyed on them.
+        self.route_cache.clear()
+
+    @property
+    def graph(self):
+        """Adjacency lists {segment id: [(next id, cost)]} at the current graph_tol."""
+        return self.routing_graph().adjacency
+
+    @graph.setter
+    def graph(self, adjacency):
+        # Replace the connectivity at graph_tol by hand; segments without an
+        # entry have no outgoing edges.
+        graph = RoutingGraph(self.graph_tol)
+        graph.adjacency = {seg_id: list(edges) for seg_id, edges in adjacency.items()}
+        previous = self._routing_graphs.get(self.graph_tol)
+        graph.version = previous.version + 1 if previous is not None else 1
+        self.set_routing_graph(graph)
+
+    @property
+    def graph_version(self):
+        """Changes whenever the graph at the current graph_tol changes; part of the route cache key."""
+        graph = self.routing_graph()
+        return (graph.tol, graph.version)
+
+    def rebuild_graph(self, tol=None):
+        """Rebuild the graph for a tolerance from scratch; returns (start_map, end_map)."""
+        self._routing_graphs.pop(tol or self.graph_tol, None)
+        graph = self.routing_graph(tol)
+        return graph.start_map, graph.end_map
+
+    def _dijkstra(self, start_seg_id, end_seg_id=None, graph=None):
+        """Return (dist, prev) maps; stops early once end_seg_id is settled."""
         import heapq
 
+        adjacency = (graph or self.routing_graph()).adjacency
         dist = {start_seg_id: 0.0}
         prev = {}
         heap = [(0.0, start_seg_id)]
@@ -130,13 +407,17 @@ class Simulation:
                 break
             if cur_dist != dist.get(u, float("inf")):
                 continue
-            for v, cost in self.graph.get(u, []):
+            for v, cost in adjacency.get(u, []):
                 alt = cur_dist + cost
                 if alt < dist.get(v, float("inf")):
                     dist[v] = alt
                     prev[v] = u
                     heapq.heappush(heap, (alt, v))
 
+        return dist, prev
+
+    @staticmethod
+    def _path_from_tree(dist, prev, start_seg_id, end_seg_id):
         if end_seg_id not in prev and end_seg_id != start_seg_id:
             return None, None
 
@@ -146,9 +427,54 @@ class Simulation:
         path.reverse()
         return path, dist.get(end_seg_id, 0.0)
 
+    def _dijkstra_path(self, start_seg_id, end_seg_id, graph=None):
+        dist, prev = self._dijkstra(start_seg_id, end_seg_id, graph)
+        return self._path_from_tree(dist, prev, start_seg_id, end_seg_id)
+
+    def shortest_path_tree(self, start_seg_id, tol=None):
+        """Return (dist, prev) of the one-to-all shortest path tree from a segment id."""
+        graph = self.routing_graph(tol)
+        key = (start_seg_id, graph.tol, graph.version)
+        tree = self.route_cache.get_tree(key)
+        if tree is None:
+            tree = self._dijkstra(start_seg_id, graph=graph)
+            self.route_cache.put_tree(key, tree)
+        return tree
+
+    def _find_path(self, start_seg_id, end_seg_id, tol=None):
+        if self.route_cache.use_trees:
+            dist, prev = self.shortest_path_tree(start_seg_id, tol)
+            return self._path_from_tree(dist, prev, start_seg_id, end_seg_id)
+        return self._dijkstra_path(start_seg_id, end_seg_id, self.routing_graph(tol))
+
+    def _cached_route(self, start_seg_id, end_seg_id):
+        """Return the cached (ids, indices, length) route between two segment ids."""
+        if start_seg_id not in self.segment_by_id:
+            raise ValueError(f"Unknown start segment id '{start_seg_id}'")
+        if end_seg_id not in self.segment_by_id:
+            raise ValueError(f"Unknown end segment id '{end_seg_id}'")
+
+        # Every tolerance graph changes together, so the main graph version is enough.
+        key = (start_seg_id, end_seg_id) + self.graph_version
+        route = self.route_cache.get_route(key)
+        if route is None:
+            path = self.shortest_path_uncached(start_seg_id, end_seg_id)
+            indices = tuple(self.segment_by_id[sid] for sid in path)
+            length = sum(self.segments[idx].get_length() for idx in indices)
+            route = (tuple(path), indices, length)
+            self.route_cache.put_route(key, route)
+        return route
+
     def shortest_path(self, start_seg_id, end_seg_id):
         """Return a list of segment ids forming the shortest directed path (by length).
 
+        Results are memoized in `route_cache` until the graph changes.
+        """
+        return list(self._cached_route(start_seg_id, end_seg_id)[0])
+
+    def shortest_path_uncached(self, start_seg_id, end_seg_id):
+        """Compute the shortest directed path between two segment ids.
+
         If no path is found with the current tolerance, retry once with a looser
         tolerance (5x) before failing to help with near-miss endpoints.
         """
@@ -157,22 +483,21 @@ class Simulation:
         if end_seg_id not in self.segment_by_id:
             raise ValueError(f"Unknown end segment id '{end_seg_id}'")
 
-        if self._graph_dirty:
-            self.rebuild_graph()
-
         if start_seg_id == end_seg_id:
             return [start_seg_id]
 
-        path, _ = self._dijkstra_path(start_seg_id, end_seg_id)
+        path, _ = self._find_path(start_seg_id, end_seg_id)
         if path is not None:
             return path
 
-        # Retry with looser tolerance
+        # Retry with looser tolerance (its graph is kept separately from the main one)
         loose_tol = self.graph_tol * 5
-        self.rebuild_graph(loose_tol)
-        path, _ = self._dijkstra_path(start_seg_id, end_seg_id)
+        path, _ = self._find_path(start_seg_id, end_seg_id, loose_tol)
         if path is not None:
-            print(f"[routing] rebuilt graph with tol={loose_tol} to connect {start_seg_id}->{end_seg_id}")
+            log.info(
+                "routing used loose tolerance %s to connect %s->%s", loose_tol, start_seg_id, end_seg_id,
+                extra={"data": {"event": "route_loose_tol", "tol": loose_tol, "start": start_seg_id, "end": end_seg_id}},
+            )
             return path
 
         # Diagnostics: show endpoint distances to help debugging
@@ -188,24 +513,29 @@ class Simulation:
 
     def prepare_vehicle_path(self, veh):
         """Ensure vehicle.path is resolved; auto-route if start/end are provided."""
+        self.routing_calls += 1
         if (not veh.path or len(veh.path) == 0) and veh.start_segment and veh.end_segment:
-            veh.path = self.shortest_path(veh.start_segment, veh.end_segment)
-        if not veh.path:
-            raise ValueError("Vehicle has no path and no start/end routing information")
-        veh.path = self.resolve_path(veh.path)
+            _, indices, total_len = self._cached_route(veh.start_segment, veh.end_segment)
+            veh.path = list(indices)
+        else:
+            if not veh.path:
+                raise ValueError("Vehicle has no path and no start/end routing information")
+            veh.path = self.resolve_path(veh.path)
+            total_len = None
 
         # Log chosen path with length for diagnostics (helpful to compare alternatives)
-        try:
-            total_len = sum(self.segments[idx].get_length() for idx in veh.path)
-            print(
-                f"[routing] class={getattr(veh, 'vehicle_class', None)} "
-                f"start={veh.start_segment} end={veh.end_segment} "
-                f"path_ids={[self.segments[i].id for i in veh.path]} "
-                f"length={total_len:.2f}"
+        if log.isEnabledFor(logging.DEBUG):
+            if total_len is None:
+                total_len = sum(self.segments[idx].get_length() for idx in veh.path)
+            path_ids = [self.segments[i].id for i in veh.path]
+            log.debug(
+                "route class=%s start=%s end=%s path_ids=%s length=%.2f",
+                veh.vehicle_class, veh.start_segment, veh.end_segment, path_ids, total_len,
+                extra={"data": {
+                    "event": "route", "t": self.t, "vehicle": veh.id, "vehicle_class": veh.vehicle_class,
+                    "path": path_ids, "length": total_len,
+                }},
             )
-        except Exception:
-            # Do not fail simulation because of logging
-            pass
 
         return veh.path
 
@@ -225,18 +555,114 @@ class Simulation:
                 resolved.append(item)
         return resolved
 
+    def has_space_for(self, veh):
+        """Whether veh fits behind the last vehicle at the start of its resolved path."""
+        segment = self.segments[veh.path[0]]
+        return len(segment.vehicles) == 0 \
+            or self.vehicles[segment.vehicles[-1]].x > veh.s0 + veh.l
+
+    def enable_profiling(self, window=600):
+        """Start recording per-phase tick times and counters; returns the Profiler."""
+        self.profiler = Profiler(window)
+        return self.profiler
+
+    def disable_profiling(self):
+        self.profiler = None
+
+    def stats(self, rolling=False):
+        """Profiler aggregates (over the rolling window if `rolling`); {} when profiling is off."""
+        if self.profiler is None:
+            return {}
+        return self.profiler.rolling_stats() if rolling else self.profiler.stats()
+
+    def record_trajectories(self, directory, interval=None, fields=None, chunk_size=100_000, format="npz"):
+        """Stream vehicle states to chunk files in directory; returns the TrajectoryRecorder.
+
+        The current state is recorded immediately, then every `interval`
+        simulated seconds (every tick when None). Call stop_recording() to
+        write the last chunk.
+        """
+        self.stop_recording()
+        self.recorder = TrajectoryRecorder(directory, interval, fields, chunk_size, format)
+        self.recorder.sample(self)
+        return self.recorder
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
     def run(self, steps):
         for _ in range(steps):
             self.update()
 
+    def summary(self):
+        """Return aggregate statistics of the run so far as a plain dict."""
+        return {
+            "t": self.t,
+            "frame_count": self.frame_count,
+            "segments": len(self.segments),
+            "active_vehicles": len(self.vehicles),
+            "completed_trips": self.completed_trips,
+            "total_trip_distance": self.total_trip_distance,
+            "mean_trip_time": self.total_trip_time / self.completed_trips if self.completed_trips else 0.0,
+            "mean_trip_speed": self.total_trip_distance / self.total_trip_time if self.total_trip_time > 0 else 0.0,
+            "active_events": len(self.active_event_ids),
+        }
+
     def update(self):
+        prof = self.profiler
+        if prof is not None:
+            prof.start_tick(self)
+            vehicles_updated = len(self.vehicles)
+
         # Update junction timing and mappings
         self._update_junctions()
+        if prof is not None:
+            prof.lap()
         # Update events and compute per-segment speed factors
         self._update_events()
+        if prof is not None:
+            prof.lap()
 
         # Update vehicles
-        for seg_idx, segment in enumerate(self.segments):
+        if self.engine is not None:
+            self._update_vehicles_vectorized()
+        else:
+            self._update_vehicles()
+        if prof is not None:
+            prof.lap()
+
+        # Check roads for out of bounds vehicle
+        transitions = self._update_transitions()
+        if prof is not None:
+            prof.lap()
+            before_spawns = len(self.vehicles)
+
+        # Wake the vehicle generators that are due
+        self._update_generators()
+        if prof is not None:
+            prof.lap()
+            prof.end_tick(vehicles_updated, transitions, len(self.vehicles) - before_spawns)
+
+        # Increment time
+        self.t += self.dt
+        self.frame_count += 1
+
+        if self.recorder is not None:
+            self.recorder.sample(self)
+
+    def _update_vehicles(self, seg_indices=None):
+        """Sequential IDM update, segment by segment (all segments, or seg_indices in order).
+
+        Each vehicle's speed factor is evaluated just before it moves, so
+        junction priority checks see vehicles on earlier segments already
+        moved this tick.
+        """
+        if seg_indices is None:
+            seg_indices = range(len(self.segments))
+        for seg_idx in seg_indices:
+            segment = self.segments[seg_idx]
             if len(segment.vehicles) != 0:
                 lead = self.vehicles[segment.vehicles[0]]
                 factor = self._compute_speed_factor(seg_idx, lead)
@@ -249,99 +675,169 @@ class Simulation:
                 veh.v_max = veh._v_max * factor
                 veh.update(lead, self.dt)
 
-        # Check roads for out of bounds vehicle
-        for segment in self.segments:
+    def _update_vehicles_vectorized(self, seg_indices=None):
+        """Collect speed factors and leaders, then run batched IDM passes.
+
+        Same result as `_update_vehicles`. A yield approach reads the lead
+        vehicles of the approaches it gives way to, which the sequential
+        loop has already moved when their segment comes first; the batch is
+        stepped before collecting such a segment, so its factors see them
+        moved too. Without yield junctions a tick is a single pass.
+        """
+        if seg_indices is None:
+            seg_indices = range(len(self.segments))
+        depends = self.junction_control.segment_dependencies
+        slots = []
+        leaders = []
+        factors = []
+        pending = set()  # segments collected but not stepped yet
+        for seg_idx in seg_indices:
+            queue = self.segments[seg_idx].vehicles
+            if not queue:
+                continue
+            reads = depends.get(seg_idx)
+            if reads is not None and not pending.isdisjoint(reads):
+                self.engine.step(slots, leaders, factors, self.dt)
+                slots, leaders, factors = [], [], []
+                pending.clear()
+            lead_slot = -1
+            for vehicle_id in queue:
+                veh = self.vehicles[vehicle_id]
+                factors.append(self._compute_speed_factor(seg_idx, veh))
+                slots.append(veh._slot)
+                leaders.append(lead_slot)
+                lead_slot = veh._slot
+            pending.add(seg_idx)
+        if slots:
+            self.engine.step(slots, leaders, factors, self.dt)
+
+    def _update_transitions(self):
+        """Move vehicles across segment ends; returns the number of moves."""
+        moves = self._collect_transitions()
+        self._apply_transitions(moves)
+        return len(moves)
+
+    def _collect_transitions(self, seg_indices=None):
+        """Take every lead vehicle that ran past the end of its segment off that segment.
+
+        Returns (seg_idx, vehicle, next_idx) moves in segment order, with
+        next_idx None when the vehicle finished its path.
+        """
+        if seg_indices is None:
+            seg_indices = range(len(self.segments))
+        moves = []
+        for seg_idx in seg_indices:
+            segment = self.segments[seg_idx]
             # If road has no vehicles, continue
             if len(segment.vehicles) == 0: continue
             # If not
-            vehicle_id = segment.vehicles[0]
-            vehicle = self.vehicles[vehicle_id]
+            vehicle = self.vehicles[segment.vehicles[0]]
             # If first vehicle is out of road bounds
             if vehicle.x >= segment.get_length():
-                # If vehicle has a next road
+                vehicle.distance += segment.get_length()
+                # If vehicle has a next road, move on to it
                 if vehicle.current_road_index + 1 < len(vehicle.path):
-                    # Update current road to next road
                     vehicle.current_road_index += 1
-                    # Add it to the next road
-                    next_road_index = vehicle.path[vehicle.current_road_index]
-                    self.segments[next_road_index].vehicles.append(vehicle_id)
+                    next_idx = vehicle.path[vehicle.current_road_index]
+                else:
+                    next_idx = None
                 # Reset vehicle properties
                 vehicle.x = 0
                 # In all cases, remove it from its road
-                segment.vehicles.popleft() 
-
-        # Update vehicle generators
-        for gen in self.vehicle_generator:
-            gen.update(self)
-        # Increment time
-        self.t += self.dt
-        self.frame_count += 1
+                segment.vehicles.popleft()
+                moves.append((seg_idx, vehicle, next_idx))
+        return moves
+
+    def _apply_transitions(self, moves):
+        """Append moved vehicles to their next segment; retire those whose path is finished."""
+        for _, vehicle, next_idx in moves:
+            if next_idx is None:
+                self.retire_vehicle(vehicle)
+            else:
+                self.segments[next_idx].vehicles.append(vehicle.id)
+
+    def _update_generators(self, target=None):
+        """Run the generators whose next spawn attempt is due against target (default: self)."""
+        scheduler = self.spawn_scheduler
+        generators = self.vehicle_generator
+        if self._generators_dirty or scheduler.count != len(generators) or \
+                (scheduler.time is not None and self.t < scheduler.time):
+            scheduler.compile(generators)
+            self._generators_dirty = False
+
+        for idx in scheduler.due(self.t):
+            gen = generators[idx]
+            gen.update(target or self)
+            scheduler.schedule(idx, gen)
 
     def _update_events(self):
+        """Apply the event activations and deactivations due at the current time."""
+        scheduler = self.event_scheduler
+        if self._events_dirty or scheduler.count != len(self.events) or \
+                (scheduler.time is not None and self.t < scheduler.time):
+            self._compile_events()
+
+        activated, deactivated = scheduler.advance(self.t)
+        for ev in activated:
+            self._activate_event(ev)
+        for ev in deactivated:
+            self._deactivate_event(ev)
+
+    def _compile_events(self):
+        """Rebuild the event queues and clear the per-segment tables."""
+        self.event_scheduler.compile(self.events)
         self.segment_event_factors = {}
         self.segment_events_by_idx = {}
-        active_ids = set()
-        for ev in self.events:
-            start = ev.get("start_time", 0)
-            duration = ev.get("duration")
-            end_time = ev.get("end_time", None)
-            if end_time is None and duration is not None:
-                end_time = start + duration
-
-            is_active = self.t >= start and (end_time is None or self.t < end_time)
-            ev["active"] = is_active
-            if is_active:
-                active_ids.add(ev.get("id"))
-
-                seg_id = ev.get("segment_id")
-                speed_factor = ev.get("speed_factor", 1.0)
-                offset = ev.get("offset", 0.5)
-                if seg_id is not None and seg_id in self.segment_by_id:
-                    seg_idx = self.segment_by_id[seg_id]
-                    current = self.segment_event_factors.get(seg_idx, 1.0)
-                    # Apply the most restrictive (minimum) factor when multiple events overlap.
-                    self.segment_event_factors[seg_idx] = min(current, speed_factor)
-
-                    seg_len = self.segments[seg_idx].get_length() if seg_idx < len(self.segments) else 0
-                    pos = offset * seg_len
-                    bucket = self.segment_events_by_idx.setdefault(seg_idx, [])
-                    bucket.append({"pos": pos, "factor": speed_factor, "event": ev})
-
-        self.active_event_ids = active_ids
+        self.active_event_ids = set()
+        self._active_event_counts = {}
+        self._events_dirty = False
+
+    def _activate_event(self, ev):
+        ev_id = ev.get("id")
+        self._active_event_counts[ev_id] = self._active_event_counts.get(ev_id, 0) + 1
+        self.active_event_ids.add(ev_id)
+
+        seg_id = ev.get("segment_id")
+        if seg_id is not None and seg_id in self.segment_by_id:
+            speed_factor = ev.get("speed_factor", 1.0)
+            seg_idx = self.segment_by_id[seg_id]
+            current = self.segment_event_factors.get(seg_idx, 1.0)
+            # Apply the most restrictive (minimum) factor when multiple events overlap.
+            self.segment_event_factors[seg_idx] = min(current, speed_factor)
+
+            seg_len = self.segments[seg_idx].get_length() if seg_idx < len(self.segments) else 0
+            pos = ev.get("offset", 0.5) * seg_len
+            bucket = self.segment_events_by_idx.setdefault(seg_idx, [])
+            bucket.append({"pos": pos, "factor": speed_factor, "event": ev})
+
+    def _deactivate_event(self, ev):
+        ev_id = ev.get("id")
+        remaining = self._active_event_counts.get(ev_id, 0) - 1
+        if remaining > 0:
+            self._active_event_counts[ev_id] = remaining
+        else:
+            self._active_event_counts.pop(ev_id, None)
+            self.active_event_ids.discard(ev_id)
+
+        seg_id = ev.get("segment_id")
+        if seg_id is None or seg_id not in self.segment_by_id:
+            return
+        seg_idx = self.segment_by_id[seg_id]
+        bucket = self.segment_events_by_idx.get(seg_idx, [])
+        bucket[:] = [entry for entry in bucket if entry["event"] is not ev]
+        if bucket:
+            self.segment_event_factors[seg_idx] = min(1.0, *(entry["factor"] for entry in bucket))
+        else:
+            self.segment_events_by_idx.pop(seg_idx, None)
+            self.segment_event_factors.pop(seg_idx, None)
 
     def _update_junctions(self):
-        """Advance traffic lights and rebuild segment->approach mapping."""
-        self.segment_junctions = {}
-        for jid, junc in self.junctions.items():
-            for appr in junc.get("approaches", []):
-                seg_id = appr.get("segment_id")
-                if seg_id not in self.segment_by_id:
-                    continue
-                seg_idx = self.segment_by_id[seg_id]
-
-                # Traffic light timing
-                if appr.get("type") == "light":
-                    green = appr.get("green", 30)
-                    red = appr.get("red", 30)
-                    phase_start = appr.setdefault("phase_start", 0.0)
-                    phase = appr.setdefault("phase", "green")
-                    elapsed = self.t - phase_start
-                    if phase == "green" and elapsed >= green:
-                        appr["phase"] = "red"
-                        appr["phase_start"] = self.t
-                    elif phase == "red" and elapsed >= red:
-                        appr["phase"] = "green"
-                        appr["phase_start"] = self.t
-
-                bucket = self.segment_junctions.setdefault(seg_idx, [])
-                bucket.append({
-                    "junction_id": jid,
-                    "offset": appr.get("offset", 0.5),
-                    "type": appr.get("type", "yield"),
-                    "phase": appr.get("phase", "green"),
-                    "green": appr.get("green", 30),
-                    "red": appr.get("red", 30)
-                })
+        """Advance traffic lights whose phase is due; compile topology when it changed."""
+        if self._junctions_dirty:
+            self.junction_control.compile(self.junctions, self.segment_by_id, self.segments)
+            self.segment_junctions = self.junction_control.segment_approaches
+            self._junctions_dirty = False
+        self.junction_control.advance(self.t)
 
     def _compute_junction_factor(self, seg_idx, vehicle):
         """Compute slowdown/stop factor due to junction control and precedence."""
@@ -349,8 +845,7 @@ class Simulation:
         if not approaches:
             return 1.0
 
-        seg = self.segments[seg_idx]
-        seg_len = seg.get_length()
+        seg_len = self.segments[seg_idx].get_length()
         factor = 1.0
         slow_dist = 40.0  # generic slowdown near junction
         light_slow_dist = 35.0  # start braking for a red light from this distance
@@ -359,14 +854,8 @@ class Simulation:
         yield_stop_factor = 0.1
         yield_factor = 0.2
 
-        # Heading at position helper
-        def heading_at(offset):
-            off = min(max(offset, 0.0), 1.0)
-            return seg.get_heading(off)
-
         for appr in approaches:
-            offset = appr.get("offset", 0.5)
-            ctrl_type = appr.get("type", "yield")
+            offset = appr.offset
             dist_to = offset * seg_len - vehicle.x
             if dist_to < -2:
                 continue  # already passed
@@ -376,61 +865,36 @@ class Simulation:
                 factor = min(factor, 0.6)
 
             # Control logic
-            if ctrl_type == "light":
-                phase = appr.get("phase", "green")
-                if phase != "green" and dist_to >= 0:
+            if appr.is_light:
+                if appr.phase != "green" and dist_to >= 0:
                     if dist_to <= light_stop_dist:
                         factor = min(factor, light_stop_factor)
                     elif dist_to <= light_slow_dist:
                         factor = min(factor, 0.4)
             else:  # yield / merge priority-to-right
                 if dist_to >= 0:
-                    if self._has_vehicle_with_priority(appr, seg_idx, vehicle, dist_to, heading_at(offset)):
+                    if self._has_vehicle_with_priority(appr):
                         factor = min(factor, yield_stop_factor)
                     else:
                         factor = min(factor, yield_factor if dist_to < slow_dist else factor)
 
         return factor
 
-    def _has_vehicle_with_priority(self, approach, seg_idx, vehicle, dist_to, heading):
-        """Check if another approach at the same junction has priority (right-first/merge)."""
-        jid = approach.get("junction_id")
-        if jid not in self.junctions:
-            return False
-        junc = self.junctions[jid]
+    def _has_vehicle_with_priority(self, approach):
+        """Check if an approach this one yields to (right-first/merge) has a vehicle close to the junction."""
         conflict_dist = 20.0
-
-        # Right-side check using heading difference
-        def on_right(h_self, h_other):
-            import math
-            d = (h_other - h_self + math.pi) % (2*math.pi) - math.pi
-            return 0 < d < math.pi/2
-
-        for other in junc.get("approaches", []):
-            other_seg_id = other.get("segment_id")
-            if other_seg_id not in self.segment_by_id:
-                continue
-            other_idx = self.segment_by_id[other_seg_id]
-            if other_idx == seg_idx:
-                continue
-            other_offset = other.get("offset", 0.5)
-            other_seg = self.segments[other_idx]
-            other_len = other_seg.get_length()
-
+        segments = self.segments
+        for other in approach.conflicts:
             # If other is light-controlled and red, it does not have priority now
-            if other.get("type") == "light" and other.get("phase", "green") != "green":
+            if other.is_light and other.phase != "green":
                 continue
 
             # Find lead vehicle on that segment, if any
-            if len(other_seg.vehicles) == 0:
+            other_vehicles = segments[other.seg_idx].vehicles
+            if not other_vehicles:
                 continue
-            other_lead = self.vehicles[other_seg.vehicles[0]]
-            dist_other = other_offset * other_len - other_lead.x
-            if dist_other < -2 or dist_other > conflict_dist:
-                continue
-
-            other_heading = other_seg.get_heading(other_offset)
-            if on_right(heading, other_heading):
+            dist_other = other.stop_pos - self.vehicles[other_vehicles[0]].x
+            if -2 <= dist_other <= conflict_dist:
                 return True
 
         return False
@@ -0,0 +1,43 @@
+import pickle
+import struct
+
+from . import vehicle
+
+
+# File layout: magic, format version (uint16, little endian), then one
+# pickle holding the Simulation and the vehicle id counter.
+STATE_MAGIC = b"TRAFSIM-STATE\n"
+STATE_VERSION = 7
+
+
+def save_state(sim, path):
+    """Write the full state of sim to path."""
+    payload = {"next_vehicle_id": vehicle.peek_vehicle_id(), "simulation": sim}
+    with open(path, "wb") as f:
+        f.write(STATE_MAGIC)
+        f.write(struct.pack("<H", STATE_VERSION))
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def is_state_file(path):
+    """True when path starts with the snapshot magic."""
+    with open(path, "rb") as f:
+        return f.read(len(STATE_MAGIC)) == STATE_MAGIC
+
+
+def load_state(path):
+    """Read a Simulation written by save_state.
+
+    The payload is a pickle, which can run arbitrary code when loaded:
+    only load state files from a trusted source.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(STATE_MAGIC)) != STATE_MAGIC:
+            raise ValueError(f"'{path}' is not a simulation state file")
+        (version,) = struct.unpack("<H", f.read(2))
+        if version != STATE_VERSION:
+            raise ValueError(f"Unsupported simulation state version {version} (expected {STATE_VERSION})")
+        payload = pickle.load(f)
+    # New vehicles must not reuse the ids of the restored ones.
+    vehicle.reserve_vehicle_ids(payload["next_vehicle_id"])
+    return payload["simulation"]
@@ -0,0 +1,178 @@
+from math import floor, hypot, inf
+
+import numpy as np
+
+
+class GridIndex:
+    """Uniform grid over axis-aligned bounding boxes.
+
+    Items are registered with a (xmin, ymin, xmax, ymax) box and stored in
+    every cell the box overlaps, or only in the cells given explicitly
+    (e.g. those a polyline crosses), so rectangle and radius queries only
+    visit the cells they cover.
+    """
+    def __init__(self, cell_size=25.0):
+        self.cell_size = float(cell_size)
+        self.cells = {}     # (i, j) -> set of items
+        self.boxes = {}     # item -> bbox
+        self._occupied = {}  # item -> cells it is stored in
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _cell_range(self, xmin, ymin, xmax, ymax):
+        size = self.cell_size
+        return (floor(xmin / size), floor(ymin / size), floor(xmax / size), floor(ymax / size))
+
+    def line_cells(self, x0, y0, x1, y1):
+        """Cells crossed by the straight line from (x0, y0) to (x1, y1), in order."""
+        size = self.cell_size
+        i, j = floor(x0 / size), floor(y0 / size)
+        i_end, j_end = floor(x1 / size), floor(y1 / size)
+        dx, dy = x1 - x0, y1 - y0
+        step_i = 1 if i_end > i else -1
+        step_j = 1 if j_end > j else -1
+        # Line parameter at the next vertical / horizontal cell border, and
+        # its increment per cell.
+        t_x = ((i + (step_i > 0)) * size - x0) / dx if dx else inf
+        t_y = ((j + (step_j > 0)) * size - y0) / dy if dy else inf
+        dt_x = size / abs(dx) if dx else inf
+        dt_y = size / abs(dy) if dy else inf
+        cells = [(i, j)]
+        while i != i_end or j != j_end:
+            # The step count is fixed by the end cells, whatever the rounding.
+            if j == j_end or (i != i_end and t_x < t_y):
+                i += step_i
+                t_x += dt_x
+            else:
+                j += step_j
+                t_y += dt_y
+            cells.append((i, j))
+        return cells
+
+    def insert(self, item, bbox, cells=None):
+        if item in self.boxes:
+            self.remove(item)
+        self.boxes[item] = bbox
+        if cells is None:
+            i0, j0, i1, j1 = self._cell_range(*bbox)
+            cells = [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+        else:
+            cells = list(dict.fromkeys(cells))
+        self._occupied[item] = cells
+        for key in cells:
+            self.cells.setdefault(key, set()).add(item)
+
+    def remove(self, item):
+        del self.boxes[item]
+        for key in self._occupied.pop(item):
+            cell = self.cells[key]
+            cell.discard(item)
+            if not cell:
+                del self.cells[key]
+
+    def query_rect(self, xmin, ymin, xmax, ymax):
+        """Return the items stored in cells the rectangle covers whose bounding box overlaps it."""
+        found = set()
+        i0, j0, i1, j1 = self._cell_range(xmin, ymin, xmax, ymax)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self.cells):
+            # Very large query: scanning the occupied cells is cheaper.
+            candidates = (
+                item
+                for (i, j), cell in self.cells.items()
+                if i0 <= i <= i1 and j0 <= j <= j1
+                for item in cell
+            )
+        else:
+            candidates = (
+                item
+                for i in range(i0, i1 + 1)
+                for j in range(j0, j1 + 1)
+                for item in self.cells.get((i, j), ())
+            )
+        for item in candidates:
+            bx0, by0, bx1, by1 = self.boxes[item]
+            if bx0 <= xmax and bx1 >= xmin and by0 <= ymax and by1 >= ymin:
+                found.add(item)
+        return found
+
+    def query_radius(self, point, radius):
+        """Return the items whose bounding box is within radius of point."""
+        x, y = point
+        found = set()
+        for item in self.query_rect(x - radius, y - radius, x + radius, y + radius):
+            bx0, by0, bx1, by1 = self.boxes[item]
+            dx = max(bx0 - x, 0.0, x - bx1)
+            dy = max(by0 - y, 0.0, y - by1)
+            if hypot(dx, dy) <= radius:
+                found.add(item)
+        return found
+
+
+class SpatialIndex:
+    """Spatial lookups over a simulation's network and scenery.
+
+    Keeps one GridIndex per layer: segments (keyed by segment index, stored
+    in the cells their polyline crosses), segment endpoints (keyed by
+    (segment index, 0 for start / 1 for end)) and environment objects
+    (keyed by list index).
+    """
+    def __init__(self, cell_size=25.0):
+        self.segments = GridIndex(cell_size)
+        self.endpoints = GridIndex(cell_size)
+        self.environment = GridIndex(cell_size)
+        self._segment_objs = {}
+
+    def add_segment(self, seg_idx, seg):
+        endpoints = seg.endpoints()
+        if endpoints is None:
+            return
+        self._segment_objs[seg_idx] = seg
+        self.segments.insert(seg_idx, seg.bounding_box(), self._polyline_cells(seg._point_array))
+        for end, pt in enumerate(endpoints):
+            self.endpoints.insert((seg_idx, end), (pt[0], pt[1], pt[0], pt[1]))
+
+    def remove_segment(self, seg_idx):
+        """Drop segment seg_idx; segments after it move down one index, as in the segment list."""
+        later = sorted(idx for idx in self._segment_objs if idx > seg_idx)
+        if seg_idx in self._segment_objs:
+            later.insert(0, seg_idx)
+        moved = [(idx, self._segment_objs.pop(idx)) for idx in later]
+        for idx, _ in moved:
+            self.segments.remove(idx)
+            self.endpoints.remove((idx, 0))
+            self.endpoints.remove((idx, 1))
+        for idx, seg in moved:
+            if idx != seg_idx:
+                self.add_segment(idx - 1, seg)
+
+    def _polyline_cells(self, points):
+        """Cells crossed by a polyline, given as an (n, 2) array.
+
+        A long diagonal or curved road crosses far fewer cells than its
+        bounding box covers. Pieces whose ends lie in the same or adjacent
+        cells add nothing beyond the cells of the points; only longer ones
+        are walked.
+        """
+        grid = self.segments
+        ij = np.floor(points / grid.cell_size).astype(np.int64)
+        cells = list(map(tuple, ij.tolist()))
+        steps = np.abs(np.diff(ij, axis=0)).sum(axis=1)
+        for k in np.flatnonzero(steps > 1).tolist():
+            (x0, y0), (x1, y1) = points[k].tolist(), points[k + 1].tolist()
+            cells.extend(grid.line_cells(x0, y0, x1, y1))
+        return cells
+
+    def add_point(self, layer, key, position):
+        x, y = position[0], position[1]
+        getattr(self, layer).insert(key, (x, y, x, y))
+
+    def nearest_endpoint(self, point, radius):
+        """Return ((seg_idx, end), distance) of the closest endpoint within radius, or None."""
+        best = None
+        for key in self.endpoints.query_radius(point, radius):
+            bx, by, _, _ = self.endpoints.boxes[key]
+            dist = hypot(bx - point[0], by - point[1])
+            if best is None or (dist, key) < (best[1], best[0]):
+                best = (key, dist)
+        return best
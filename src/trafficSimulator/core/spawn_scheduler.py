@@ -0,0 +1,35 @@
+import heapq
+
+
+# Slack when comparing wake-up times with the clock: a generator woken a
+# hair early re-checks its own condition and is simply queued again.
+WAKE_EPSILON = 1e-9
+
+
+class SpawnScheduler:
+    """Priority queue of vehicle generator wake-up times.
+
+    Each generator sits in a heap keyed by `next_attempt_time()`, so a tick
+    only touches the generators that are due instead of polling all of them.
+    """
+    def __init__(self):
+        self.compile([])
+
+    def compile(self, generators):
+        self._heap = [(gen.next_attempt_time(), idx) for idx, gen in enumerate(generators)]
+        heapq.heapify(self._heap)
+        self.count = len(generators)
+        self.time = None
+
+    def due(self, t):
+        """Pop and return the indices of the generators due at time t, in index order."""
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= t + WAKE_EPSILON:
+            due.append(heapq.heappop(heap)[1])
+        self.time = t
+        due.sort()
+        return due
+
+    def schedule(self, idx, gen):
+        heapq.heappush(self._heap, (gen.next_attempt_time(), idx))
@@ -1,5 +1,6 @@
-import uuid
-import numpy as np
+from collections import namedtuple
+from itertools import count
+from math import sqrt
 
 
 # Styling presets by vehicle class for consistent rendering.
@@ -11,23 +12,153 @@ VEHICLE_CLASS_STYLES = {
     "ev": {"color": (0, 191, 255), "shape": "rect"},
 }
 
+# Compact summary emitted when a vehicle leaves the network.
+TripRecord = namedtuple(
+    "TripRecord",
+    ["id", "vehicle_class", "spawn_time", "exit_time", "path", "distance", "mean_speed"],
+)
+
+# Vehicle ids are sequential integers, unique within the process.
+_vehicle_ids = count()
+
+
+def peek_vehicle_id():
+    """Return the id the next vehicle will get, without consuming it."""
+    global _vehicle_ids
+    nxt = next(_vehicle_ids)
+    _vehicle_ids = count(nxt)
+    return nxt
+
+
+def reserve_vehicle_ids(start):
+    """Make sure vehicles created from now on get ids >= start."""
+    global _vehicle_ids
+    _vehicle_ids = count(max(start, next(_vehicle_ids)))
+
+
+# Telemetry/OBU-related fields (placeholders for future logic) and their
+# defaults. They are kept in a per-vehicle side table that only exists once
+# one of them (or any other non-core attribute) is set.
+TELEMETRY_DEFAULTS = {
+    "co2_emission": None,  # g/km or similar
+    "engine_type": None,   # e.g., electric, combustion, hybrid, hydrogen
+    "rpm": None,
+    "ac_temp": None,
+    "ambient_light": None,
+    "fog_lights": False,
+    "rain_sensor": False,
+}
+
+# Core attributes, stored in slots (see Vehicle.copy_from).
+_FIELDS = (
+    "id", "l", "s0", "T", "v_max", "a_max", "b_max", "sqrt_ab", "_v_max",
+    "path", "current_road_index", "start_segment", "end_segment",
+    "spawn_time", "distance", "x", "v", "a", "stopped",
+    "vehicle_class", "color", "shape",
+)
+
+
+def _telemetry_property(name, default):
+    def getter(self):
+        return self.get_extra(name, default)
+
+    def setter(self, value):
+        self.set_extra(name, value)
+
+    return property(getter, setter)
+
+
 class Vehicle:
+    # `_engine`/`_slot` are only set while bound to an IDMEngine. `_extra`
+    # is the side table for telemetry and config keys that are not slots;
+    # it stays None until one is set. There is no instance __dict__, so
+    # other attributes go through set_extra/get_extra.
+    __slots__ = _FIELDS + ("_engine", "_slot", "_extra")
+
     def __init__(self, config={}):
+        self._extra = None
+        self._configure(config)
+
+    def reset(self, config={}):
+        """(Re)initialize the vehicle from a config; used to recycle retired vehicles."""
+        self._extra = None
+        self._configure(config)
+
+    def _configure(self, config):
         # Set default configuration
         self.set_default_config()
 
         # Update configuration
         for attr, val in config.items():
-            setattr(self, attr, val)
+            try:
+                setattr(self, attr, val)
+            except AttributeError:
+                # Not a slot (or a read-only property): keep it in the side table
+                self.set_extra(attr, val)
 
         # Harmonize style defaults based on vehicle_class when explicit values are missing
         self.apply_style_defaults()
 
         # Calculate properties
         self.init_properties()
-        
+
+    def set_extra(self, name, value):
+        """Store a telemetry or custom attribute in the side table."""
+        if self._extra is None:
+            self._extra = {}
+        self._extra[name] = value
+
+    def get_extra(self, name, default=None):
+        """Return a telemetry or custom attribute from the side table."""
+        extra = self._extra
+        return default if extra is None else extra.get(name, default)
+
+    @property
+    def extra(self):
+        """Telemetry and custom attributes explicitly set on this vehicle."""
+        return dict(self._extra or ())
+
+    def clone(self):
+        """Return a fresh vehicle with this one's configuration and a new id.
+
+        Used with prototypes: a vehicle built once from a config and copied
+        for every spawn instead of re-running the constructor.
+        """
+        veh = object.__new__(Vehicle)
+        veh._copy(self)
+        return veh
+
+    def copy_from(self, prototype):
+        """Turn this (retired) vehicle into a fresh copy of prototype."""
+        return self._copy(prototype)
+
+    def _copy(self, prototype):
+        p = prototype
+        self.id = next(_vehicle_ids)
+        self.l, self.s0, self.T = p.l, p.s0, p.T
+        self.v_max = p.v_max
+        self.a_max = p.a_max
+        self.b_max = p.b_max
+        self.sqrt_ab = p.sqrt_ab
+        self._v_max = p._v_max
+        self.path = list(p.path)
+        self.current_road_index = p.current_road_index
+        self.start_segment = p.start_segment
+        self.end_segment = p.end_segment
+        self.spawn_time = p.spawn_time
+        self.distance = p.distance
+        self.x = p.x
+        self.v = p.v
+        self.a = p.a
+        self.stopped = p.stopped
+        self.vehicle_class = p.vehicle_class
+        self.color = p.color
+        self.shape = p.shape
+        self._extra = dict(p._extra) if p._extra else None
+        return self
+
     def set_default_config(self):    
-        self.id = uuid.uuid4()
+        self.id = next(_vehicle_ids)
 
         # Physical parameters
         self.l = 4
@@ -43,6 +174,10 @@ class Vehicle:
         self.start_segment = None  # optional segment id for auto-routing
         self.end_segment = None    # optional segment id for auto-routing
 
+        # Trip bookkeeping (filled in by the simulation)
+        self.spawn_time = None
+        self.distance = 0.0  # length of the segments already completed
+
         # Kinematics
         self.x = 0
         self.v = 0
@@ -54,15 +189,6 @@ class Vehicle:
         self.color = None
         self.shape = None  # supported: rect, triangle, circle (renderer can extend)
 
-        # Telemetry/OBU-related fields (placeholders for future logic)
-        self.co2_emission = None  # g/km or similar
-        self.engine_type = None   # e.g., electric, combustion, hybrid, hydrogen
-        self.rpm = None
-        self.ac_temp = None
-        self.ambient_light = None
-        self.fog_lights = False
-        self.rain_sensor = False
-
     def apply_style_defaults(self):
         """Apply color/shape defaults from class presets when not explicitly set."""
         preset = VEHICLE_CLASS_STYLES.get(self.vehicle_class, {})
@@ -72,7 +198,7 @@ class Vehicle:
             self.shape = preset.get("shape", "rect")
 
     def init_properties(self):
-        self.sqrt_ab = 2*np.sqrt(self.a_max*self.b_max)
+        self.sqrt_ab = 2*sqrt(self.a_max*self.b_max)
         self._v_max = self.v_max
 
     def update(self, lead, dt):
@@ -102,4 +228,8 @@ class Vehicle:
 
         if self.stopped: 
             self.a = -self.b_max*self.v/self.v_max
-        
\ No newline at end of file
+        
+
+for _name, _default in TELEMETRY_DEFAULTS.items():
+    setattr(Vehicle, _name, _telemetry_property(_name, _default))
+del _name, _default
@@ -1,5 +1,40 @@
+import logging
+
 from .vehicle import Vehicle
-from numpy.random import randint
+import numpy as np
+
+
+log = logging.getLogger(__name__)
+
+
+# Supported inter-arrival models:
+#   fixed     - one vehicle every 60 / vehicle_rate seconds
+#   poisson   - exponential headways with mean 60 / vehicle_rate seconds
+#   empirical - headways resampled from the `headways` list (seconds)
+HEADWAY_MODELS = ("fixed", "poisson", "empirical")
+
+
+def alias_table(weights):
+    """Build Vose alias tables (prob, alias) for sampling indices by weight."""
+    weights = np.asarray(weights, dtype=float)
+    n = len(weights)
+    total = weights.sum()
+    if n == 0 or total <= 0:
+        raise ValueError("Vehicle generator needs at least one positive weight")
+    scaled = weights * n / total
+    prob = np.ones(n)
+    alias = np.arange(n)
+    small = [i for i in range(n) if scaled[i] < 1.0]
+    large = [i for i in range(n) if scaled[i] >= 1.0]
+    while small and large:
+        lo = small.pop()
+        hi = large.pop()
+        prob[lo] = scaled[lo]
+        alias[lo] = hi
+        scaled[hi] -= 1.0 - scaled[lo]
+        (small if scaled[hi] < 1.0 else large).append(hi)
+    return prob, alias
+
 
 class VehicleGenerator:
     def __init__(self, config={}):
@@ -15,38 +50,146 @@ class VehicleGenerator:
 
     def set_default_config(self):
         """Set default configuration"""
+        # Simulation the generator was added to; told when the spawn
+        # schedule changes (see the vehicle_rate setter).
+        self.simulation = None
         self.vehicle_rate = 10
         self.vehicles = [
             (1, {})
         ]
         self.last_added_time = 0
 
+        # Randomness: every generator draws from its own numpy Generator,
+        # seeded by `seed` unless an `rng` is handed in.
+        self.seed = None
+        self.rng = None
+        self.headway = "fixed"
+        self.headways = None
+        self.block_size = 256  # draws pre-sampled per refill
+
+        # Blocked spawns (first segment full) are retried on every tick by
+        # default. A positive retry_backoff waits instead, doubling the delay
+        # on every failure up to max_retry_backoff seconds.
+        self.retry_backoff = 0
+        self.max_retry_backoff = 1.0
+
     def init_properties(self):
+        if self.rng is None:
+            self.rng = np.random.default_rng(self.seed)
+        if self.headway not in HEADWAY_MODELS:
+            raise ValueError(f"Unknown headway model '{self.headway}', expected one of {HEADWAY_MODELS}")
+        if self.headway == "empirical" and not self.headways:
+            raise ValueError("Empirical headway model requires a non-empty 'headways' list")
+
+        self._prob, self._alias = alias_table([pair[0] for pair in self.vehicles])
+        # One prototype per config entry; spawns are clones of it.
+        self._prototypes = [Vehicle(config) for _, config in self.vehicles]
+        self._choices = np.empty(0, dtype=int)
+        self._choice_pos = 0
+        self._headway_block = np.empty(0)
+        self._headway_pos = 0
+
+        self.next_headway = self.draw_headway()
         self.upcoming_vehicle = self.generate_vehicle()
+        self._backoff = 0.0
+        self._retry_at = None
+
+    @property
+    def vehicle_rate(self):
+        """Vehicles per minute."""
+        return self._vehicle_rate
+
+    @vehicle_rate.setter
+    def vehicle_rate(self, value):
+        self._vehicle_rate = value
+        # The next spawn attempt moves with the rate: requeue the generator.
+        if self.simulation is not None:
+            self.simulation.reschedule_generators()
+
+    def _next_choice(self):
+        """Index into self.vehicles of the next vehicle type (alias method, block sampled)."""
+        if self._choice_pos >= len(self._choices):
+            n = self.block_size
+            idx = self.rng.integers(0, len(self._prob), size=n)
+            u = self.rng.random(n)
+            self._choices = np.where(u < self._prob[idx], idx, self._alias[idx])
+            self._choice_pos = 0
+        choice = self._choices[self._choice_pos]
+        self._choice_pos += 1
+        return int(choice)
 
-    def generate_vehicle(self):
+    def draw_headway(self):
+        """Return the gap (seconds) to wait after the last added vehicle."""
+        if self.headway == "fixed":
+            return None
+        if self._headway_pos >= len(self._headway_block):
+            n = self.block_size
+            if self.headway == "poisson":
+                # Unit-mean draws, scaled when used so vehicle_rate can change.
+                self._headway_block = self.rng.standard_exponential(n)
+            else:
+                self._headway_block = self.rng.choice(np.asarray(self.headways, dtype=float), size=n)
+            self._headway_pos = 0
+        value = float(self._headway_block[self._headway_pos])
+        self._headway_pos += 1
+        return value
+
+    def current_headway(self):
+        """Seconds between the last added vehicle and the next one."""
+        if self.headway == "fixed":
+            return 60 / self.vehicle_rate
+        if self.headway == "poisson":
+            return self.next_headway * 60 / self.vehicle_rate
+        return self.next_headway
+
+    def generate_vehicle(self, simulation=None):
         """Returns a random vehicle from self.vehicles with random proportions"""
-        total = sum(pair[0] for pair in self.vehicles)
-        r = randint(1, total+1)
-        for (weight, config) in self.vehicles:
-            r -= weight
-            if r <= 0:
-                return Vehicle(config)
+        prototype = self._prototypes[self._next_choice()]
+        if simulation is not None:
+            return simulation.make_vehicle(prototype)
+        return prototype.clone()
+
+    def next_attempt_time(self):
+        """Simulation time of the next spawn attempt."""
+        if self._retry_at is not None:
+            return self._retry_at
+        return self.last_added_time + self.current_headway()
 
     def update(self, simulation):
-        """Add vehicles"""
-        if simulation.t - self.last_added_time >= 60 / self.vehicle_rate:
-            print('adding vehicle')
-            # If time elasped after last added vehicle is
-            # greater than vehicle_period; generate a vehicle
-            # Resolve path (ids or indices) before accessing simulation segments.
-            simulation.prepare_vehicle_path(self.upcoming_vehicle)
-
-            segment = simulation.segments[self.upcoming_vehicle.path[0]]      
-            if len(segment.vehicles) == 0\
-               or simulation.vehicles[segment.vehicles[-1]].x > self.upcoming_vehicle.s0 + self.upcoming_vehicle.l:
-                # If there is space for the generated vehicle; add it
-                simulation.add_vehicle(self.upcoming_vehicle)
-                # Reset last_added_time and upcoming_vehicle
-                self.last_added_time = simulation.t
-            self.upcoming_vehicle = self.generate_vehicle()
+        """Add the upcoming vehicle if it is due; return True when one was added."""
+        t = simulation.t
+        if t - self.last_added_time < self.current_headway():
+            return False
+        if self._retry_at is not None and t < self._retry_at:
+            return False
+
+        # Resolve path (ids or indices) before accessing simulation segments.
+        simulation.prepare_vehicle_path(self.upcoming_vehicle)
+
+        added = simulation.has_space_for(self.upcoming_vehicle)
+        if added:
+            # If there is space for the generated vehicle; add it
+            simulation.add_vehicle(self.upcoming_vehicle)
+            if log.isEnabledFor(logging.DEBUG):
+                veh = self.upcoming_vehicle
+                log.debug(
+                    "vehicle %s added on segment %s", veh.id, veh.path[0],
+                    extra={"data": {"event": "spawn", "t": t, "vehicle": veh.id, "segment": veh.path[0]}},
+                )
+            # Reset last_added_time and draw the next headway
+            self.last_added_time = t
+            self.next_headway = self.draw_headway()
+            self._backoff = 0.0
+            self._retry_at = None
+            self.upcoming_vehicle = self.generate_vehicle(simulation)
+        else:
+            # Keep the same vehicle for the next attempt.
+            if self.retry_backoff > 0:
+                self._backoff = min(self.max_retry_backoff, 2*self._backoff or self.retry_backoff)
+                self._retry_at = t + self._backoff
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(
+                    "spawn blocked on segment %s, retry in %.2fs", self.upcoming_vehicle.path[0], self._backoff,
+                    extra={"data": {"event": "spawn_blocked", "t": t, "segment": self.upcoming_vehicle.path[0]}},
+                )
+        return added
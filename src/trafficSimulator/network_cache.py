@@ -0,0 +1,238 @@
+"""On-disk cache of compiled road networks.
+
+Building curves is the slow part of loading a configuration: every
+`QuadraticCurve`/`CubicCurve` is reparametrized by arc length. The cache
+stores what that produces for the "segments" section of a config:
+
+- points.npy:     the coordinates of every segment's points, concatenated
+                  (2 x N float64);
+- cumulative.npy: the arc length at every point (N);
+- pieces.npy:     dx, dy, length and heading of every polyline piece
+                  (4 x P);
+- network.pkl:    per-segment type, offsets into the arrays, metadata
+                  (including the id, from which the id map is rebuilt) and
+                  curve parameters, plus the routing graph;
+- manifest.json:  the key and the SHA-256 of each of the files above.
+
+The arrays are loaded memory-mapped and segments are rebuilt straight from
+views of them (`Segment.from_tables`), so a load neither copies the
+geometry into Python objects nor recomputes it. The manifest is checked
+before anything is unpickled; an entry that does not match is discarded.
+
+Entries live in one directory per key, a SHA-256 of the canonical JSON of
+the "segments" section and `NETWORK_CACHE_VERSION`; editing the segments
+(or a geometry change that bumps the version) selects a new entry, so the
+cache never needs invalidating by hand. The rest of the config (vehicles,
+generators, events, junctions) is always built fresh. After each write
+the least recently used entries are deleted to keep the directory under
+`CACHE_MAX_BYTES` (TRAFFICSIM_CACHE_MAX_MB overrides it).
+
+network.pkl is unpickled on load, and the manifest only guards against
+corruption, not tampering: use a cache directory only you can write to.
+The default one (`default_cache_dir`) is per-user and created private.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .core.geometry.segment import Segment
+from .core.geometry.quadratic_curve import QuadraticCurve
+from .core.geometry.cubic_curve import CubicCurve
+
+
+log = logging.getLogger(__name__)
+
+# Bump whenever cached geometry would differ for the same config.
+NETWORK_CACHE_VERSION = 3
+
+# Per-user cache location, under $XDG_CACHE_HOME (default ~/.cache);
+# TRAFFICSIM_CACHE_DIR overrides it.
+CACHE_DIRNAME = "trafficsim"
+
+# Size cap of a cache directory; TRAFFICSIM_CACHE_MAX_MB overrides it.
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Unfinished writes older than this are left-overs of a crashed process.
+STALE_WRITE_SECONDS = 3600
+
+MANIFEST = "manifest.json"
+ARRAYS = ("points", "cumulative", "pieces")
+
+SEGMENT_TYPES = {cls.__name__: cls for cls in (Segment, QuadraticCurve, CubicCurve)}
+
+_METADATA = ("id", "category", "material", "max_speed", "width", "color", "direction_hint")
+# Attributes every Segment gets from Segment.__init__; anything else on an
+# instance is a construction parameter of its subclass (start, control, ...).
+_BASE_ATTRIBUTES = frozenset(vars(Segment([(0.0, 0.0), (1.0, 0.0)])))
+
+
+def network_key(config):
+    """Cache key of the network described by config["segments"]."""
+    text = json.dumps(
+        {"version": NETWORK_CACHE_VERSION, "segments": config.get("segments", [])},
+        sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def default_cache_dir():
+    """$TRAFFICSIM_CACHE_DIR, else the per-user cache directory."""
+    override = os.environ.get("TRAFFICSIM_CACHE_DIR")
+    if override:
+        return Path(override)
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / CACHE_DIRNAME
+
+
+def cache_max_bytes():
+    value = os.environ.get("TRAFFICSIM_CACHE_MAX_MB")
+    return int(float(value) * 1024 * 1024) if value else CACHE_MAX_BYTES
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _files(entry):
+    return [entry / "network.pkl"] + [entry / f"{name}.npy" for name in ARRAYS]
+
+
+def load_network(cache_dir, key):
+    """Return (segments, routing graph) cached under key, or None on a miss."""
+    entry = Path(cache_dir) / key
+    if not entry.is_dir():
+        return None
+    try:
+        with (entry / MANIFEST).open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        files = manifest["files"]
+        if manifest.get("key") != key or manifest.get("version") != NETWORK_CACHE_VERSION \
+                or sorted(files) != sorted(path.name for path in _files(entry)) \
+                or any(_file_digest(entry / name) != digest for name, digest in files.items()):
+            raise ValueError("manifest does not match the cached files")
+        with (entry / "network.pkl").open("rb") as f:
+            network = pickle.load(f)
+        xy, cumulative, pieces = (np.asarray(np.load(entry / f"{name}.npy", mmap_mode="r")) for name in ARRAYS)
+    except (OSError, KeyError, TypeError, ValueError, pickle.UnpicklingError, EOFError) as exc:
+        log.warning("discarding network cache entry %s: %s", entry, exc)
+        shutil.rmtree(entry, ignore_errors=True)
+        return None
+
+    segments = []
+    offsets = network["offsets"]
+    piece_offsets = network["piece_offsets"]
+    for i, (kind, params, metadata) in enumerate(network["segments"]):
+        a, b = offsets[i], offsets[i + 1]
+        p, q = piece_offsets[i], piece_offsets[i + 1]
+        segments.append(SEGMENT_TYPES[kind].from_tables(xy[:, a:b], cumulative[a:b], pieces[:, p:q], params, **metadata))
+    try:
+        os.utime(entry)  # recently used: pruned last
+    except OSError:
+        pass
+    return segments, network["graph"]
+
+
+def store_network(cache_dir, key, segments, graph):
+    """Write segments and their routing graph under key; failures are logged, not raised."""
+    cache_dir = Path(cache_dir)
+    records = []
+    offsets = [0]
+    piece_offsets = [0]
+    xy, cumulative, pieces = [np.empty((2, 0))], [np.empty(0)], [np.empty((4, 0))]
+    for seg in segments:
+        params = {name: value for name, value in vars(seg).items() if name not in _BASE_ATTRIBUTES}
+        metadata = {name: getattr(seg, name) for name in _METADATA}
+        records.append((type(seg).__name__, params, metadata))
+        seg_xy, seg_cumulative, seg_pieces = seg.tables()
+        xy.append(seg_xy)
+        cumulative.append(seg_cumulative)
+        pieces.append(seg_pieces)
+        offsets.append(offsets[-1] + seg_xy.shape[1])
+        piece_offsets.append(piece_offsets[-1] + seg_pieces.shape[1])
+    arrays = {
+        "points": np.concatenate(xy, axis=1),
+        "cumulative": np.concatenate(cumulative),
+        "pieces": np.concatenate(pieces, axis=1),
+    }
+    network = {"segments": records, "offsets": offsets, "piece_offsets": piece_offsets, "graph": graph}
+
+    try:
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # Write into a private directory and rename it into place, so
+        # concurrent loaders never see a half-written entry.
+        tmp = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=cache_dir))
+        try:
+            for name, array in arrays.items():
+                np.save(tmp / f"{name}.npy", array)
+            with (tmp / "network.pkl").open("wb") as f:
+                pickle.dump(network, f, protocol=pickle.HIGHEST_PROTOCOL)
+            manifest = {
+                "version": NETWORK_CACHE_VERSION,
+                "key": key,
+                "files": {path.name: _file_digest(path) for path in _files(tmp)},
+            }
+            with (tmp / MANIFEST).open("w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(tmp, cache_dir / key)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not (cache_dir / key).is_dir():
+                raise
+    except OSError as exc:
+        log.warning("could not write network cache in %s: %s", cache_dir, exc)
+        return
+    prune_cache(cache_dir, keep=key)
+
+
+def prune_cache(cache_dir, max_bytes=None, keep=None):
+    """Delete least recently used entries until cache_dir holds at most max_bytes.
+
+    `max_bytes` defaults to `cache_max_bytes()`; the entry `keep` is never
+    deleted. Left-over directories of interrupted writes are removed too.
+    Returns the number of bytes freed.
+    """
+    cache_dir = Path(cache_dir)
+    max_bytes = cache_max_bytes() if max_bytes is None else max_bytes
+    now = time.time()
+    entries = []
+    freed = 0
+    try:
+        children = list(cache_dir.iterdir())
+    except OSError:
+        return 0
+    for entry in children:
+        try:
+            if not entry.is_dir():
+                continue
+            size = sum(path.stat().st_size for path in entry.iterdir())
+            mtime = entry.stat().st_mtime
+        except OSError:
+            continue  # removed concurrently
+        if entry.name.startswith("."):
+            if now - mtime > STALE_WRITE_SECONDS:
+                shutil.rmtree(entry, ignore_errors=True)
+                freed += size
+            continue
+        entries.append((mtime, entry.name, size, entry))
+
+    total = sum(size for _, _, size, _ in entries)
+    for _, name, size, entry in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name == keep:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        freed += size
+    return freed
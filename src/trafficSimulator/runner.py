@@ -0,0 +1,32 @@
+"""Headless stepping of a simulation, shared by the CLI and parameter sweeps."""
+
+import math
+import time
+
+
+def run_headless(sim, duration, dt=None):
+    """Step `sim` (a Simulation or PartitionedSimulation) for `duration` simulated seconds as fast as possible.
+
+    Returns a dict with the throughput figures and the final summary.
+    """
+    if dt is not None:
+        sim.dt = dt
+    steps = int(math.ceil(duration / sim.dt - 1e-9))
+
+    vehicle_steps = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        vehicle_steps += len(sim.vehicles)
+        sim.update()
+    wall = time.perf_counter() - start
+
+    simulated = steps * sim.dt
+    return {
+        "steps": steps,
+        "simulated_seconds": simulated,
+        "wall_seconds": wall,
+        "sim_seconds_per_wall_second": simulated / wall if wall > 0 else math.inf,
+        "vehicle_steps": vehicle_steps,
+        "vehicle_steps_per_second": vehicle_steps / wall if wall > 0 else math.inf,
+        "summary": sim.summary(),
+    }
@@ -0,0 +1,359 @@
+"""Synthetic network generator for benchmarks and stress tests.
+
+Builds JSON-compatible configurations (the format read by
+`build_simulation`) for three parameterized layouts:
+
+- grid:     a Manhattan grid of two-way streets, lights or yield
+            junctions at the crossings;
+- radial:   spokes from a center crossed by concentric ring roads (the
+            rings are cubic arcs);
+- arterial: a straight two-way main road with side streets at every
+            block, lights on the main road.
+
+Every street is a pair of one-way segments. Straight `Segment`,
+`QuadraticCurve` and `CubicCurve` geometry is mixed according to
+`curve_fraction`; curves bend to the right of travel so the two directions
+of a street do not overlap. Generators spawn routed vehicles
+(start_segment/end_segment) at the edge of the network, events are spread
+over random segments, and `vehicles` pre-populates the network with
+vehicles following short random walks, so large fleets exist from the
+first tick. The same arguments and seed always give the same config.
+"""
+
+import math
+
+import numpy as np
+
+
+SCENARIO_KINDS = ("grid", "radial", "arterial")
+
+# Bumper-to-bumper room (meters) given to each pre-populated vehicle.
+VEHICLE_SPACING = 25.0
+
+# Vehicle mix used by generators and pre-populated vehicles: (weight, config).
+VEHICLE_MIX = (
+    (12, {"vehicle_class": "vehicle"}),
+    (3, {"vehicle_class": "truck", "l": 8, "v_max": 13.0}),
+    (2, {"vehicle_class": "bus", "l": 10, "v_max": 12.0}),
+    (2, {"vehicle_class": "ev"}),
+)
+
+
+class _Network:
+    """Nodes and directed edges of a generated layout, before conversion to config."""
+    def __init__(self, rng, curve_fraction, bend):
+        self.rng = rng
+        self.curve_fraction = curve_fraction
+        self.bend = bend
+        self.nodes = []
+        self.edges = []  # (segment id, src node, dst node)
+        self.segments = []  # segment configs, parallel to edges
+        self.out_edges = {}
+        self.in_edges = {}
+
+    def add_node(self, x, y):
+        self.nodes.append((float(x), float(y)))
+        return len(self.nodes) - 1
+
+    def add_edge(self, src, dst, shape=None, **geometry):
+        """Add a one-way segment src -> dst; shape is drawn from curve_fraction when None."""
+        idx = len(self.edges)
+        seg_id = f"s{idx}"
+        start, end = self.nodes[src], self.nodes[dst]
+        if shape is None:
+            shape = "segment"
+            if self.rng.random() < self.curve_fraction:
+                shape = "quadratic" if self.rng.random() < 0.5 else "cubic"
+        self.segments.append(self._segment(seg_id, start, end, shape, geometry))
+        self.edges.append((seg_id, src, dst))
+        self.out_edges.setdefault(src, []).append(idx)
+        self.in_edges.setdefault(dst, []).append(idx)
+        return idx
+
+    def add_street(self, a, b, shape=None):
+        """Two-way street: one segment per direction, same geometry kind."""
+        if shape is None and self.rng.random() < self.curve_fraction:
+            shape = "quadratic" if self.rng.random() < 0.5 else "cubic"
+        self.add_edge(a, b, shape or "segment")
+        self.add_edge(b, a, shape or "segment")
+
+    def _segment(self, seg_id, start, end, shape, geometry):
+        if shape == "arc":
+            # Circular arc around `center`, approximated by one cubic.
+            cx, cy = geometry["center"]
+            a0 = math.atan2(start[1] - cy, start[0] - cx)
+            a1 = math.atan2(end[1] - cy, end[0] - cx)
+            sweep = (a1 - a0 + math.pi) % (2*math.pi) - math.pi
+            radius = math.hypot(start[0] - cx, start[1] - cy)
+            k = 4/3 * math.tan(sweep/4) * radius
+            c1 = (start[0] - k*math.sin(a0), start[1] + k*math.cos(a0))
+            c2 = (end[0] + k*math.sin(a1), end[1] - k*math.cos(a1))
+            return {"id": seg_id, "type": "cubic", "start": list(start), "control_1": list(c1),
+                    "control_2": list(c2), "end": list(end)}
+
+        dx, dy = end[0] - start[0], end[1] - start[1]
+        # Unit normal to the right of travel, scaled by the bend.
+        length = math.hypot(dx, dy)
+        nx, ny = dy/length * self.bend * length, -dx/length * self.bend * length
+        if shape == "quadratic":
+            control = (start[0] + dx/2 + 2*nx, start[1] + dy/2 + 2*ny)
+            return {"id": seg_id, "type": "quadratic", "start": list(start), "control": list(control),
+                    "end": list(end)}
+        if shape == "cubic":
+            c1 = (start[0] + dx/3 + nx, start[1] + dy/3 + ny)
+            c2 = (start[0] + 2*dx/3 + nx, start[1] + 2*dy/3 + ny)
+            return {"id": seg_id, "type": "cubic", "start": list(start), "control_1": list(c1),
+                    "control_2": list(c2), "end": list(end)}
+        return {"id": seg_id, "type": "segment", "points": [list(start), list(end)]}
+
+    def edge_length(self, idx):
+        _, src, dst = self.edges[idx]
+        (x0, y0), (x1, y1) = self.nodes[src], self.nodes[dst]
+        return math.hypot(x1 - x0, y1 - y0)
+
+    def random_walk(self, idx, steps):
+        """Segment ids of a walk of up to `steps` edges from edge idx, avoiding U-turns."""
+        path = [idx]
+        for _ in range(steps - 1):
+            _, src, dst = self.edges[path[-1]]
+            options = [e for e in self.out_edges.get(dst, ()) if self.edges[e][2] != src]
+            if not options:
+                break
+            path.append(options[int(self.rng.integers(len(options)))])
+        return [self.edges[e][0] for e in path]
+
+
+def _junction(net, node, light_axis=None, green=30.0, red=30.0):
+    """Junction at node over its incoming edges.
+
+    With light_axis (a unit direction), approaches roughly parallel to it
+    start green and the others red; without it every approach yields.
+    """
+    approaches = []
+    for e in net.in_edges.get(node, ()):
+        seg_id, src, dst = net.edges[e]
+        appr = {"segment_id": seg_id, "offset": 1.0, "type": "yield"}
+        if light_axis is not None:
+            (x0, y0), (x1, y1) = net.nodes[src], net.nodes[dst]
+            length = math.hypot(x1 - x0, y1 - y0)
+            along = abs((x1 - x0)*light_axis[0] + (y1 - y0)*light_axis[1]) / length
+            appr.update(type="light", green=green, red=red, phase="green" if along > 0.7 else "red")
+        approaches.append(appr)
+    return {"id": f"j{node}", "approaches": approaches}
+
+
+def _events(net, count, horizon):
+    rng = net.rng
+    events = []
+    for i in range(count):
+        seg_id = net.edges[int(rng.integers(len(net.edges)))][0]
+        kind = "works" if rng.random() < 0.5 else "accident"
+        events.append({
+            "id": f"ev{i}",
+            "type": kind,
+            "segment_id": seg_id,
+            "offset": round(float(rng.uniform(0.3, 0.7)), 3),
+            "start_time": round(float(rng.uniform(0.0, horizon)), 1),
+            "duration": round(float(rng.uniform(60.0, 300.0)), 1),
+            "speed_factor": 0.5 if kind == "works" else 0.3,
+        })
+    return events
+
+
+def _generators(net, entries, exits, count, rate, destinations):
+    """Generators on `count` entry edges, each routing to a few random exit edges."""
+    rng = net.rng
+    if not entries or not exits:
+        return []
+    picks = rng.choice(len(entries), size=min(count, len(entries)), replace=False)
+    generators = []
+    for pick in sorted(int(p) for p in picks):
+        start = net.edges[entries[pick]][0]
+        targets = [net.edges[exits[int(i)]][0] for i in rng.integers(len(exits), size=destinations)]
+        vehicles = []
+        for end in targets:
+            weight, cfg = VEHICLE_MIX[int(rng.integers(len(VEHICLE_MIX)))]
+            vehicles.append([weight, dict(cfg, start_segment=start, end_segment=end, v=10.0)])
+        generators.append({"vehicle_rate": rate, "vehicles": vehicles})
+    return generators
+
+
+def _vehicles(net, count, walk):
+    """`count` vehicles spread over random segments, leaders first on each segment."""
+    if count <= 0:
+        return []
+    rng = net.rng
+    capacity = [max(0, int(net.edge_length(e) // VEHICLE_SPACING) - 1) for e in range(len(net.edges))]
+    if sum(capacity) < count:
+        raise ValueError(
+            f"Network holds at most {sum(capacity)} vehicles at {VEHICLE_SPACING} m spacing; "
+            f"use more segments for {count} vehicles"
+        )
+    # Fill segments in random order, evenly, until the fleet is placed.
+    order = rng.permutation(len(net.edges))
+    per_segment = np.zeros(len(net.edges), dtype=int)
+    remaining = count
+    while remaining:
+        for e in order:
+            if remaining and per_segment[e] < capacity[e]:
+                per_segment[e] += 1
+                remaining -= 1
+
+    weights = np.array([w for w, _ in VEHICLE_MIX], dtype=float)
+    kinds = rng.choice(len(VEHICLE_MIX), size=count, p=weights/weights.sum())
+    vehicles = []
+    for e in range(len(net.edges)):
+        n = int(per_segment[e])
+        length = net.edge_length(e)
+        for i in range(n):
+            cfg = dict(VEHICLE_MIX[int(kinds[len(vehicles)])][1])
+            cfg.update(
+                path=net.random_walk(e, walk),
+                x=round(length * (n - i) / (n + 1), 2),
+                v=10.0,
+            )
+            vehicles.append(cfg)
+    return vehicles
+
+
+def _config(kind, params, net, junctions, entries, exits, vehicles, events, generators,
+            vehicle_rate, destinations, walk, horizon, seed):
+    return {
+        "ui": {"title": f"Synthetic {kind} network ({len(net.edges)} segments)"},
+        "scenario": dict(params, kind=kind, segments=len(net.edges)),
+        "seed": seed,
+        "segments": net.segments,
+        "junctions": junctions,
+        "events": _events(net, len(net.edges) // 100 if events is None else events, horizon),
+        "vehicle_generators": _generators(
+            net, entries, exits, max(1, len(entries) // 4) if generators is None else generators,
+            vehicle_rate, destinations,
+        ),
+        "vehicles": _vehicles(net, vehicles, walk),
+    }
+
+
+def grid_scenario(
+    rows=10, cols=10, spacing=100.0, curve_fraction=0.2, bend=0.08, light_fraction=0.5,
+    vehicles=0, events=None, generators=None, vehicle_rate=20, destinations=4, walk=8,
+    horizon=600.0, seed=0,
+):
+    """Manhattan grid of rows x cols crossings: 4*rows*cols - 2*(rows + cols) segments."""
+    params = dict(locals())
+    rng = np.random.default_rng(seed)
+    net = _Network(rng, curve_fraction, bend)
+    node = [[net.add_node(c*spacing, r*spacing) for c in range(cols)] for r in range(rows)]
+    for r in range(rows):
+        for c in range(cols):
+            if c + 1 < cols:
+                net.add_street(node[r][c], node[r][c + 1])
+            if r + 1 < rows:
+                net.add_street(node[r][c], node[r + 1][c])
+
+    junctions = []
+    for n in range(len(net.nodes)):
+        if len(net.in_edges.get(n, ())) >= 3:
+            lit = len(net.in_edges[n]) == 4 and rng.random() < light_fraction
+            junctions.append(_junction(net, n, (1.0, 0.0) if lit else None))
+
+    # Vehicles enter on edges leaving the border and leave on edges reaching it.
+    border = {node[r][c] for r in range(rows) for c in range(cols) if r in (0, rows - 1) or c in (0, cols - 1)}
+    entries = [e for e, (_, src, _) in enumerate(net.edges) if src in border]
+    exits = [e for e, (_, _, dst) in enumerate(net.edges) if dst in border]
+    return _config("grid", params, net, junctions, entries, exits, vehicles, events, generators,
+                   vehicle_rate, destinations, walk, horizon, seed)
+
+
+def radial_scenario(
+    spokes=8, rings=4, ring_spacing=80.0, curve_fraction=0.2, bend=0.08, light_fraction=0.5,
+    vehicles=0, events=None, generators=None, vehicle_rate=20, destinations=4, walk=8,
+    horizon=600.0, seed=0,
+):
+    """Spokes crossed by ring roads around a central hub: 4*spokes*rings segments."""
+    params = dict(locals())
+    rng = np.random.default_rng(seed)
+    net = _Network(rng, curve_fraction, bend)
+    hub = net.add_node(0.0, 0.0)
+    ring_nodes = []
+    for m in range(1, rings + 1):
+        radius = m * ring_spacing
+        ring_nodes.append([
+            net.add_node(radius*math.cos(2*math.pi*k/spokes), radius*math.sin(2*math.pi*k/spokes))
+            for k in range(spokes)
+        ])
+    for k in range(spokes):
+        inner = hub
+        for m in range(rings):
+            net.add_street(inner, ring_nodes[m][k])
+            inner = ring_nodes[m][k]
+    for m in range(rings):
+        for k in range(spokes):
+            a, b = ring_nodes[m][k], ring_nodes[m][(k + 1) % spokes]
+            net.add_edge(a, b, "arc", center=(0.0, 0.0))
+            net.add_edge(b, a, "arc", center=(0.0, 0.0))
+
+    junctions = [_junction(net, hub)]
+    for m in range(rings):
+        for k in range(spokes):
+            n = ring_nodes[m][k]
+            lit = m < rings - 1 and rng.random() < light_fraction
+            # Radial approaches get green first at lit crossings.
+            x, y = net.nodes[n]
+            r = math.hypot(x, y)
+            junctions.append(_junction(net, n, (x/r, y/r) if lit else None))
+
+    outer = set(ring_nodes[-1])
+    entries = [e for e, (_, src, dst) in enumerate(net.edges) if src in outer and dst not in outer]
+    exits = [e for e, (_, src, dst) in enumerate(net.edges) if dst in outer and src not in outer]
+    return _config("radial", params, net, junctions, entries, exits, vehicles, events, generators,
+                   vehicle_rate, destinations, walk, horizon, seed)
+
+
+def arterial_scenario(
+    blocks=20, block_length=120.0, side_length=100.0, curve_fraction=0.2, bend=0.08, light_every=2,
+    vehicles=0, events=None, generators=None, vehicle_rate=20, destinations=4, walk=8,
+    horizon=600.0, seed=0,
+):
+    """Two-way main road of `blocks` blocks with a side street each way at every crossing: 6*blocks + 4 segments."""
+    params = dict(locals())
+    rng = np.random.default_rng(seed)
+    net = _Network(rng, curve_fraction, bend)
+    main = [net.add_node(i*block_length, 0.0) for i in range(blocks + 1)]
+    ends = []
+    for i in range(blocks):
+        net.add_street(main[i], main[i + 1], "segment")
+    for i, n in enumerate(main):
+        for side in (1, -1):
+            end = net.add_node(i*block_length, side*side_length)
+            net.add_street(n, end)
+            ends.append(end)
+
+    junctions = []
+    for i, n in enumerate(main):
+        lit = light_every and i % light_every == 0 and 0 < i < blocks
+        junctions.append(_junction(net, n, (1.0, 0.0) if lit else None))
+
+    outer = set(ends) | {main[0], main[-1]}
+    entries = [e for e, (_, src, _) in enumerate(net.edges) if src in outer]
+    exits = [e for e, (_, _, dst) in enumerate(net.edges) if dst in outer]
+    return _config("arterial", params, net, junctions, entries, exits, vehicles, events, generators,
+                   vehicle_rate, destinations, walk, horizon, seed)
+
+
+def generate_scenario(kind, segments=400, vehicles=0, seed=0, **options):
+    """Config of a `kind` network sized to roughly `segments` segments.
+
+    Extra keyword options go to the layout function (grid_scenario,
+    radial_scenario or arterial_scenario).
+    """
+    if kind == "grid":
+        n = max(2, round((1 + math.sqrt(1 + segments)) / 2))
+        return grid_scenario(rows=n, cols=n, vehicles=vehicles, seed=seed, **options)
+    if kind == "radial":
+        rings = max(1, round(math.sqrt(segments / 8)))
+        spokes = max(3, round(segments / (4*rings)))
+        return radial_scenario(spokes=spokes, rings=rings, vehicles=vehicles, seed=seed, **options)
+    if kind == "arterial":
+        blocks = max(1, round((segments - 4) / 6))
+        return arterial_scenario(blocks=blocks, vehicles=vehicles, seed=seed, **options)
+    raise ValueError(f"Unknown scenario kind '{kind}', expected one of {SCENARIO_KINDS}")
@@ -0,0 +1,245 @@
+"""Parameter sweeps over a process pool.
+
+A sweep is a list of jobs, one per (config, parameter override, seed)
+combination. Jobs run in worker processes; each worker builds a network
+once per config file and reuses its segments for every later job on that
+config. Results come back one row per job as they finish and can be
+written out as a single CSV table.
+
+Overrides address the JSON configuration with dotted paths, list items by
+index, e.g. ``vehicle_generators.0.vehicle_rate`` or ``events.1.start_time``.
+"""
+
+import copy
+import csv
+import itertools
+import os
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from .config import load_config, build_simulation, copy_network
+from .runner import run_headless
+
+
+# Leading columns of the result table; override paths follow "seed".
+BASE_COLUMNS = ("job", "config", "seed")
+RESULT_COLUMNS = (
+    "status",
+    "error",
+    "attempts",
+    "steps",
+    "simulated_seconds",
+    "wall_seconds",
+    "sim_seconds_per_wall_second",
+    "vehicle_steps_per_second",
+)
+
+
+def apply_override(config, path, value):
+    """Set the value at dotted `path` inside the nested config, in place."""
+    keys = path.split(".")
+    node = config
+    for key in keys[:-1]:
+        try:
+            node = node[int(key)] if isinstance(node, list) else node[key]
+        except (KeyError, IndexError, ValueError):
+            raise ValueError(f"Override path '{path}' does not exist in the configuration")
+    last = keys[-1]
+    if isinstance(node, list):
+        try:
+            node[int(last)] = value
+        except (IndexError, ValueError):
+            raise ValueError(f"Override path '{path}' does not exist in the configuration")
+    else:
+        node[last] = value
+
+
+def expand_jobs(configs, grid=None, seeds=(None,)):
+    """Return the cartesian product of configs x grid values x seeds as job dicts.
+
+    `grid` maps override paths to the list of values to try.
+    """
+    grid = grid or {}
+    paths = list(grid)
+    jobs = []
+    for config in configs:
+        for values in itertools.product(*(grid[p] for p in paths)):
+            for seed in seeds:
+                jobs.append({
+                    "job": len(jobs),
+                    "config": str(config),
+                    "overrides": dict(zip(paths, values)),
+                    "seed": seed,
+                })
+    return jobs
+
+
+# Per-process cache: config path -> (parsed config, template segments).
+_networks = {}
+
+
+def _network(path):
+    if path not in _networks:
+        config = load_config(path)
+        template = build_simulation(copy.deepcopy(config))
+        _networks[path] = (config, template.segments)
+    return _networks[path]
+
+
+def _simulation_for(job):
+    base, segments = _network(job["config"])
+
+    config = copy.deepcopy(base)
+    for key, value in job["overrides"].items():
+        apply_override(config, key, value)
+    if any(key.split(".")[0] == "segments" for key in job["overrides"]):
+        # Geometry changed: this job cannot share the cached network.
+        return build_simulation(config, seed=job["seed"])
+    return build_simulation(config, segments=copy_network(segments), seed=job["seed"])
+
+
+def run_job(job, duration, dt=None, engine="python"):
+    """Run a single sweep job and return its result row."""
+    row = _row(job)
+    try:
+        sim = _simulation_for(job)
+        if engine == "vectorized":
+            sim.enable_vectorized_engine()
+        report = run_headless(sim, duration, dt)
+    except Exception as exc:
+        row["status"] = "error"
+        row["error"] = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        return row
+
+    summary = report.pop("summary")
+    for key in RESULT_COLUMNS[3:]:
+        row[key] = report[key]
+    row.update(summary)
+    row["status"] = "ok"
+    return row
+
+
+def _row(job, status=None, attempts=1):
+    row = {"job": job["job"], "config": job["config"], "seed": job["seed"]}
+    row.update(job["overrides"])
+    row["status"] = status
+    row["error"] = None
+    row["attempts"] = attempts
+    return row
+
+
+def _run_pool(queue, workers, duration, dt, engine, run):
+    """Run jobs taken from the front of `queue` on a fresh pool, at most `workers` at a time.
+
+    Yields (job, row) as jobs finish, with row None for jobs lost when a
+    worker dies. Submission stops at the first crash, so only the jobs in
+    flight are lost; the others stay in `queue`.
+    """
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(queue)))) as pool:
+        running = {}
+        broken = False
+        while running or (queue and not broken):
+            while queue and not broken and len(running) < workers:
+                job = queue.popleft()
+                try:
+                    running[pool.submit(run, job, duration, dt, engine)] = job
+                except BrokenProcessPool:
+                    queue.appendleft(job)
+                    broken = True
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                try:
+                    row = future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    row = None
+                yield job, row
+
+
+def iter_sweep(jobs, duration, dt=None, engine="python", workers=None, retries=1, run=run_job):
+    """Run jobs on a process pool and yield result rows as they complete.
+
+    A job raising an exception yields a row with status "error". If a worker
+    process dies, the pool is lost together with the jobs running on it;
+    the sweep carries on with a fresh pool of `workers` processes, and the
+    lost jobs are queued again at the back. Only jobs lost to a crash a
+    second time are isolated, each in a pool of its own so that a job
+    killing its worker cannot take others down with it, and tried up to
+    `retries` times. Jobs that still crash yield a row with status "crashed".
+
+    `run(job, duration, dt, engine)` is called in the workers to produce a
+    row; it must be picklable (a module-level function).
+    """
+    workers = workers or os.cpu_count() or 1
+    queue = deque(jobs)
+    lost_once = set()
+    isolated = []
+    while queue:
+        for job, row in _run_pool(queue, workers, duration, dt, engine, run):
+            if row is not None:
+                row["attempts"] = 2 if job["job"] in lost_once else 1
+                yield row
+            elif job["job"] in lost_once:
+                isolated.append(job)
+            else:
+                lost_once.add(job["job"])
+                queue.append(job)
+
+    for job in sorted(isolated, key=lambda job: job["job"]):
+        for attempt in range(3, retries + 3):
+            [(_, row)] = _run_pool(deque([job]), 1, duration, dt, engine, run)
+            if row is not None:
+                row["attempts"] = attempt
+                yield row
+                break
+        else:
+            row = _row(job, status="crashed", attempts=retries + 2)
+            row["error"] = "worker process terminated abruptly"
+            yield row
+
+
+def run_sweep(jobs, duration, dt=None, engine="python", workers=None, retries=1, on_result=None, run=run_job):
+    """Run a sweep to completion and return the rows ordered by job index.
+
+    `on_result(row)` is called for every row as soon as it arrives.
+    """
+    rows = []
+    for row in iter_sweep(jobs, duration, dt, engine, workers, retries, run):
+        if on_result is not None:
+            on_result(row)
+        rows.append(row)
+    rows.sort(key=lambda row: row["job"])
+    return rows
+
+
+def table_columns(rows, jobs=()):
+    """Column order for rows: job/config/seed, override paths of jobs, status, metrics, summary keys."""
+    parameters = []
+    for job in jobs:
+        for key in job["overrides"]:
+            if key not in parameters:
+                parameters.append(key)
+    columns = list(BASE_COLUMNS) + parameters + list(RESULT_COLUMNS)
+    known = set(columns)
+    for row in rows:
+        for key in row:
+            if key not in known:
+                columns.append(key)
+                known.add(key)
+    return columns
+
+
+def write_csv(rows, out, jobs=()):
+    """Write rows as a CSV table to the open text stream `out`.
+
+    `jobs` (the list given to `run_sweep`) supplies the override columns.
+    """
+    writer = csv.DictWriter(out, fieldnames=table_columns(rows, jobs), restval="")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({key: "" if value is None else value for key, value in row.items()})
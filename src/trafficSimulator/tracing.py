@@ -0,0 +1,94 @@
+"""Logging setup for simulation diagnostics.
+
+The simulation logs through the standard `logging` module under the
+"trafficSimulator" logger and guards its hot-path messages with
+`isEnabledFor`, so nothing is formatted unless the level is enabled.
+Structured fields travel in the record's `data` attribute
+(``log.debug(msg, extra={"data": {...}})``) and are written out by
+`JsonLinesHandler`.
+"""
+
+import json
+import logging
+import sys
+
+
+LOGGER_NAME = "trafficSimulator"
+
+
+class JsonLinesHandler(logging.Handler):
+    """Append log records to a file as JSON objects, one per line.
+
+    Lines are buffered and written `batch_size` at a time (and on flush or
+    close), so tracing many events does not turn into one write per event.
+    """
+    def __init__(self, path, batch_size=1000, level=logging.NOTSET):
+        super().__init__(level)
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer = []
+        self._stream = open(path, "a", encoding="utf-8")
+
+    def emit(self, record):
+        try:
+            entry = {
+                "time": record.created,
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+            }
+            data = getattr(record, "data", None)
+            if data:
+                entry.update(data)
+            self._buffer.append(json.dumps(entry, default=str))
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._buffer and self._stream is not None:
+                self._stream.write("\n".join(self._buffer) + "\n")
+                self._stream.flush()
+                self._buffer.clear()
+        finally:
+            self.release()
+
+    def close(self):
+        self.acquire()
+        try:
+            self.flush()
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+        finally:
+            self.release()
+        super().close()
+
+
+def configure_logging(level="WARNING", json_path=None, batch_size=1000, stream=sys.stderr):
+    """Send the simulation's log records to `stream` and optionally a JSON-lines file.
+
+    Returns the package logger. Calling it again replaces the handlers it
+    installed before.
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    for handler in list(logger.handlers):
+        if getattr(handler, "_configured_by_trafficsim", False):
+            logger.removeHandler(handler)
+            handler.close()
+
+    handlers = []
+    if stream is not None:
+        text = logging.StreamHandler(stream)
+        text.setFormatter(logging.Formatter("[%(name)s] %(levelname)s %(message)s"))
+        handlers.append(text)
+    if json_path is not None:
+        handlers.append(JsonLinesHandler(json_path, batch_size))
+    for handler in handlers:
+        handler._configured_by_trafficsim = True
+        logger.addHandler(handler)
+    return logger
@@ -1,5 +1,8 @@
 import dearpygui.dearpygui as dpg
 from math import cos, sin
+import numpy as np
+
+from ..core.profiler import PHASES, COUNTERS
 
 
 class Window:
@@ -123,6 +126,27 @@ class Window:
                     with dpg.table_row():
                         dpg.add_text("Active events:")
                         dpg.add_text("_", tag="ActiveEvents")
+
+            with dpg.collapsing_header(label="Profiling", default_open=False):
+                dpg.add_checkbox(label="Profile ticks", default_value=False, callback=self.toggle_profiling, tag="ProfileToggle")
+
+                with dpg.table(header_row=False):
+                    dpg.add_table_column()
+                    dpg.add_table_column()
+
+                    with dpg.table_row():
+                        dpg.add_text("Tick:")
+                        dpg.add_text("_", tag="ProfileTick")
+
+                    for phase in PHASES:
+                        with dpg.table_row():
+                            dpg.add_text(f"  {phase}:")
+                            dpg.add_text("_", tag=f"ProfilePhase_{phase}")
+
+                    for counter in COUNTERS:
+                        with dpg.table_row():
+                            dpg.add_text(f"{counter.replace('_', ' ').capitalize()}/tick:")
+                            dpg.add_text("_", tag=f"ProfileCounter_{counter}")
             
             
             with dpg.collapsing_header(label="Camera Control", default_open=True):
@@ -175,6 +199,15 @@ class Window:
         active_events = len(getattr(self.simulation, "active_event_ids", []))
         dpg.set_value("ActiveEvents", active_events)
 
+        # Profiler figures over its rolling window
+        stats = self.simulation.stats(rolling=True)
+        if stats:
+            dpg.set_value("ProfileTick", f"{stats['mean_tick_ms']:.2f} ms")
+            for phase, values in stats["phases"].items():
+                dpg.set_value(f"ProfilePhase_{phase}", f"{values['mean_ms']:.2f} ms ({100*values['share']:.0f}%)")
+            for counter, values in stats["counters"].items():
+                dpg.set_value(f"ProfileCounter_{counter}", f"{values['per_tick']:.2f}")
+
         
 
 
@@ -230,6 +263,16 @@ class Window:
             -(y - self.canvas_height/2) / self.zoom - self.offset[1]
         )
     
+    def visible_rect(self, margin=0):
+        """World-space (xmin, ymin, xmax, ymax) currently shown on the canvas."""
+        x0, y0 = self.to_world(0, 0)
+        x1, y1 = self.to_world(self.canvas_width, self.canvas_height)
+        return (min(x0, x1) - margin, min(y0, y1) - margin, max(x0, x1) + margin, max(y0, y1) + margin)
+
+    def visible_segments(self):
+        """Indices of the segments whose bounding box intersects the viewport."""
+        return sorted(self.simulation.spatial_index.segments.query_rect(*self.visible_rect()))
+
     @property
     def canvas_width(self):
         return dpg.get_item_width("MainWindow")
@@ -295,54 +338,55 @@ class Window:
             )
 
     def draw_segments(self):
-        for segment in self.simulation.segments:
+        visible = self.visible_segments()
+        arrows = []
+        for seg_idx in visible:
+            segment = self.simulation.segments[seg_idx]
             color = segment.color if hasattr(segment, "color") else (180, 180, 220)
             thickness = (segment.width if hasattr(segment, "width") else 3.5) * self.zoom
             dpg.draw_polyline(segment.points, color=color, thickness=thickness, parent="Canvas")
 
             # Direction hint: arrow along the segment centerline to show flow.
-            if getattr(segment, "direction_hint", True) and len(segment.points) >= 2:
-                if not self.show_arrows:
-                    continue
-                mid_point = segment.get_point(0.5)
-                heading = -segment.get_heading(0.5)  # invert to compensate flipped Y scale
-                arrow_len = max(2.5, (segment.width if hasattr(segment, "width") else 3.5) * 1.1)
-                dx = cos(heading) * arrow_len
-                dy = sin(heading) * arrow_len
-                start = (mid_point[0] - dx * 0.5, mid_point[1] - dy * 0.5)
-                end = (mid_point[0] + dx * 0.5, mid_point[1] + dy * 0.5)
-                dpg.draw_arrow(start, end, thickness=0, size=arrow_len*0.35, color=(0, 0, 0, 80), parent="Canvas")
+            if self.show_arrows and getattr(segment, "direction_hint", True) and len(segment.points) >= 2:
+                arrows.append(seg_idx)
+        if not arrows:
+            return
+
+        mid_points, headings = self.simulation.segment_poses(arrows, np.full(len(arrows), 0.5))
+        for seg_idx, mid_point, heading in zip(arrows, mid_points.tolist(), (-headings).tolist()):  # invert heading to compensate flipped Y scale
+            segment = self.simulation.segments[seg_idx]
+            arrow_len = max(2.5, (segment.width if hasattr(segment, "width") else 3.5) * 1.1)
+            dx = cos(heading) * arrow_len
+            dy = sin(heading) * arrow_len
+            start = (mid_point[0] - dx * 0.5, mid_point[1] - dy * 0.5)
+            end = (mid_point[0] + dx * 0.5, mid_point[1] + dy * 0.5)
+            dpg.draw_arrow(start, end, thickness=0, size=arrow_len*0.35, color=(0, 0, 0, 80), parent="Canvas")
 
     def draw_vehicles(self):
-        for segment in self.simulation.segments:
-            for vehicle_id in segment.vehicles:
-                vehicle = self.simulation.vehicles[vehicle_id]
-                progress = vehicle.x / segment.get_length()
-
-                position = segment.get_point(progress)
-                heading = -segment.get_heading(progress)  # compensate Y flip
-
-                node = dpg.add_draw_node(parent="Canvas")
-
-                color = getattr(vehicle, "color", (0, 0, 255))
-                thickness = 1.2 * self.zoom
-                half_len = vehicle.l / 2
-                half_width = vehicle.l / 4
-
-                # Simple shapes per vehicle class; renderer can be extended later.
-                if vehicle.shape == "triangle":
-                    tip = (half_len, 0)
-                    rear_left = (-half_len, half_width)
-                    rear_right = (-half_len, -half_width)
-                    dpg.draw_triangle(tip, rear_left, rear_right, color=color, fill=color, thickness=thickness, parent=node)
-                elif vehicle.shape == "circle":
-                    dpg.draw_circle(center=(0, 0), radius=half_len * 0.6, color=color, fill=color, thickness=thickness, parent=node)
-                else:  # default rectangle
-                    dpg.draw_rectangle((-half_len, -half_width), (half_len, half_width), color=color, fill=color, thickness=thickness, parent=node)
-
-                translate = dpg.create_translation_matrix(position)
-                rotate = dpg.create_rotation_matrix(heading, [0, 0, 1])
-                dpg.apply_transform(node, translate*rotate)
+        # Positions and headings of every visible vehicle in one batched query.
+        vehicles, positions, headings = self.simulation.vehicle_poses(self.visible_segments())
+        for vehicle, position, heading in zip(vehicles, positions.tolist(), (-headings).tolist()):  # compensate Y flip
+            node = dpg.add_draw_node(parent="Canvas")
+
+            color = getattr(vehicle, "color", (0, 0, 255))
+            thickness = 1.2 * self.zoom
+            half_len = vehicle.l / 2
+            half_width = vehicle.l / 4
+
+            # Simple shapes per vehicle class; renderer can be extended later.
+            if vehicle.shape == "triangle":
+                tip = (half_len, 0)
+                rear_left = (-half_len, half_width)
+                rear_right = (-half_len, -half_width)
+                dpg.draw_triangle(tip, rear_left, rear_right, color=color, fill=color, thickness=thickness, parent=node)
+            elif vehicle.shape == "circle":
+                dpg.draw_circle(center=(0, 0), radius=half_len * 0.6, color=color, fill=color, thickness=thickness, parent=node)
+            else:  # default rectangle
+                dpg.draw_rectangle((-half_len, -half_width), (half_len, half_width), color=color, fill=color, thickness=thickness, parent=node)
+
+            translate = dpg.create_translation_matrix(position)
+            rotate = dpg.create_rotation_matrix(heading, [0, 0, 1])
+            dpg.apply_transform(node, translate*rotate)
 
     def draw_events(self):
         if not self.show_events:
@@ -407,7 +451,14 @@ class Window:
     def draw_environment(self):
         if not self.show_environment:
             return
-        for obj in getattr(self.simulation, "environment", []):
+        environment = self.simulation.environment
+        # Pick up objects appended to the list without add_environment_object.
+        self.simulation.index_environment()
+        # Markers are drawn with sizes scaled by zoom; widen the query to keep them whole.
+        max_size = max((obj.get("size", 3) for obj in environment), default=0)
+        visible = self.simulation.spatial_index.environment.query_rect(*self.visible_rect(4 * max_size * self.zoom))
+        for idx in sorted(visible):
+            obj = environment[idx]
             obj_type = obj.get("type", "marker")
             pos = obj.get("position", (0, 0))
             color = tuple(obj.get("color", (60, 60, 60)))
@@ -506,4 +557,10 @@ class Window:
         self.show_events = dpg.get_value("EventsToggle")
 
     def toggle_arrows(self):
-        self.show_arrows = dpg.get_value("ArrowsToggle")
\ No newline at end of file
+        self.show_arrows = dpg.get_value("ArrowsToggle")
+
+    def toggle_profiling(self):
+        if dpg.get_value("ProfileToggle"):
+            self.simulation.enable_profiling()
+        else:
+            self.simulation.disable_profiling()
@@ -0,0 +1,12 @@
+"""Helpers shared by the test modules."""
+
+
+def vehicle_state(sim):
+    """Vehicle state listed by (segment index, queue position).
+
+    Vehicle ids come from a process-wide counter, so runs are compared by
+    place instead.
+    """
+    return [(seg_idx, pos, veh.x, veh.v, veh.a, veh.current_road_index)
+            for seg_idx, segment in enumerate(sim.segments)
+            for pos, veh in enumerate(sim.vehicles[vid] for vid in segment.vehicles)]
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from trafficSimulator.core.geometry.arc_length import arc_length_parameters, arc_length_table
+from trafficSimulator.core.geometry.cubic_curve import CubicCurve
+from trafficSimulator.core.geometry.quadratic_curve import QuadraticCurve
+
+
+CURVES = [
+    QuadraticCurve((0, 0), (80, 5), (100, 100)),
+    CubicCurve((0, 0), (120, -20), (-40, 90), (60, 60)),
+    # Strongly uneven parameter speed: control points bunched at one end.
+    CubicCurve((0, 0), (1, 0), (2, 0), (100, 30)),
+]
+
+
+def _reference_length(curve, params):
+    # Arc length at each parameter from a much finer table.
+    t, s = arc_length_table(curve.speed, samples=20000, order=8)
+    return np.interp(params, t, s), s[-1]
+
+
+@pytest.mark.parametrize("curve", CURVES, ids=["quadratic", "cubic", "uneven"])
+def test_points_are_equally_spaced_in_arc_length(curve):
+    params, total = arc_length_parameters(curve.speed, 50)
+    lengths, reference_total = _reference_length(curve, params)
+    assert total == pytest.approx(reference_total, rel=1e-9)
+    np.testing.assert_allclose(np.diff(lengths), total / 49, rtol=1e-6)
+
+    points = np.array(curve.points)
+    assert len(points) == 50
+    np.testing.assert_allclose(points[0], curve.start)
+    np.testing.assert_allclose(points[-1], curve.end)
+    np.testing.assert_allclose(points[:, 0], curve.compute_x(params))
+    np.testing.assert_allclose(points[:, 1], curve.compute_y(params))
+
+
+def test_straight_curve_has_exact_length():
+    curve = QuadraticCurve((0, 0), (30, 40), (60, 80))
+    _, total = arc_length_parameters(curve.speed, 10)
+    assert total == pytest.approx(100.0, rel=1e-12)
+    chords = np.hypot(*np.diff(np.array(curve.points), axis=0).T)
+    np.testing.assert_allclose(chords, 100.0 / 49, rtol=1e-9)
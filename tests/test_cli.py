@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from trafficSimulator.cli import main
+from trafficSimulator.config import load_simulation_from_json
+
+
+CONFIG = str(Path(__file__).resolve().parent.parent / "examples" / "config.json")
+
+
+def test_run_matches_stepping_the_simulation(capsys):
+    assert main(["run", CONFIG, "--duration", "30", "--dt", "0.1", "--seed", "5", "--json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+
+    sim, _ = load_simulation_from_json(CONFIG, seed=5)
+    sim.dt = 0.1
+    vehicle_steps = 0
+    for _ in range(300):
+        vehicle_steps += len(sim.vehicles)
+        sim.update()
+
+    assert report["steps"] == 300
+    assert report["simulated_seconds"] == pytest.approx(30.0)
+    assert report["vehicle_steps"] == vehicle_steps > 0
+    assert report["sim_seconds_per_wall_second"] > 0
+    assert report["vehicle_steps_per_second"] > 0
+    assert report["summary"] == json.loads(json.dumps(sim.summary()))
+
+
+def test_run_prints_a_readable_report(capsys):
+    assert main(["run", CONFIG, "--duration", "2"]) == 0
+    out = capsys.readouterr().out
+    assert "steps:                 120" in out
+    assert "sim-s per wall-s:" in out
+    assert "  completed_trips: 0" in out
@@ -0,0 +1,85 @@
+import pytest
+
+from trafficSimulator import Simulation
+
+
+def _reference(sim):
+    # The per-tick scan the event scheduler replaced.
+    factors, active_ids, flags = {}, set(), []
+    for ev in sim.events:
+        start = ev.get("start_time", 0)
+        end = ev.get("end_time")
+        if end is None and ev.get("duration") is not None:
+            end = start + ev["duration"]
+        active = sim.t >= start and (end is None or sim.t < end)
+        flags.append(active)
+        if active:
+            active_ids.add(ev.get("id"))
+            seg_idx = sim.segment_by_id.get(ev.get("segment_id"))
+            if seg_idx is not None:
+                factors[seg_idx] = min(factors.get(seg_idx, 1.0), ev.get("speed_factor", 1.0))
+    return flags, active_ids, factors
+
+
+def _observed(sim):
+    return [ev["active"] for ev in sim.events], sim.active_event_ids, sim.segment_event_factors
+
+
+EVENTS = [
+    {"segment_id": "a", "start_time": 1, "duration": 2, "speed_factor": 0.5},
+    {"segment_id": "a", "start_time": 2, "duration": 0, "speed_factor": 0.1},  # zero duration: never active
+    {"segment_id": "b", "start_time": 0.5, "end_time": 4, "speed_factor": 0.7},
+    {"segment_id": "b", "start_time": 3, "speed_factor": 0.9},  # open ended
+    {"id": "works", "segment_id": "a", "start_time": 2.5, "duration": 3, "speed_factor": 0.3},
+    {"id": "works", "segment_id": "b", "start_time": 4, "duration": 1, "speed_factor": 0.2},  # same id, overlapping
+    {"segment_id": "missing", "start_time": 1, "duration": 1},
+]
+
+
+def _sim():
+    sim = Simulation()
+    sim.create_segment((0, 0), (100, 0), id="a")
+    sim.create_segment((100, 0), (200, 0), id="b")
+    for ev in EVENTS:
+        sim.add_event(dict(ev))
+    return sim
+
+
+def test_events_switch_on_the_same_ticks_as_the_scan():
+    sim = _sim()
+    seen = set()
+    for _ in range(60*7):
+        expected = _reference(sim)  # evaluated at the time of the coming tick
+        sim.update()
+        assert _observed(sim) == expected
+        seen.update(sim.active_event_ids)
+    assert "works" in seen
+    assert "event_1" not in seen
+
+
+def test_runtime_edits_apply_after_recompile():
+    sim = _sim()
+    sim.run(60)
+    sim.events[0]["start_time"] = 5
+    sim.events[6]["segment_id"] = "a"
+    sim.recompile_events()
+    activated = []
+    for _ in range(60*6):
+        expected = _reference(sim)
+        sim.update()
+        assert _observed(sim) == expected
+        if sim.events[0]["active"] and not activated:
+            activated.append(sim.t - sim.dt)
+    assert activated == [pytest.approx(5, abs=sim.dt)]
+
+
+def test_edits_without_recompile_are_not_seen():
+    sim = _sim()
+    sim.run(60)
+    sim.events[2]["end_time"] = 1.5
+    sim.run(60)
+    assert sim.events[2]["active"] is True
+    sim.recompile_events()
+    sim.update()
+    assert sim.events[2]["active"] is False
+    assert pytest.approx(sim.t) == 2 + 1/60
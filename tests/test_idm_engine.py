@@ -0,0 +1,58 @@
+import numpy as np
+
+from trafficSimulator.config import build_simulation
+from trafficSimulator.scenarios import generate_scenario
+
+from helpers import vehicle_state
+
+
+def _grid(engine):
+    config = generate_scenario("grid", segments=200, vehicles=150, seed=3)
+    sim = build_simulation(config, seed=3)
+    if engine == "vectorized":
+        sim.enable_vectorized_engine()
+    return sim
+
+
+def test_engines_agree_on_network_with_junctions():
+    sequential = _grid("python")
+    vectorized = _grid("vectorized")
+    assert any(appr.get("type") == "yield" for junc in sequential.junctions.values()
+               for appr in junc.get("approaches", []))
+
+    for _ in range(4):
+        sequential.run(100)
+        vectorized.run(100)
+        a, b = vehicle_state(sequential), vehicle_state(vectorized)
+        assert [row[:2] for row in a] == [row[:2] for row in b]
+        np.testing.assert_allclose(np.array(a)[:, 2:], np.array(b)[:, 2:], rtol=1e-9, atol=1e-9)
+    assert sequential.completed_trips == vectorized.completed_trips
+
+
+def _reference_update(sim):
+    # Vehicle update loop of the original Simulation.update.
+    for segment_index, segment in enumerate(sim.segments):
+        if len(segment.vehicles) != 0:
+            lead = sim.vehicles[segment.vehicles[0]]
+            lead.v_max = lead._v_max * sim._compute_speed_factor(segment_index, lead)
+            lead.update(None, sim.dt)
+        for i in range(1, len(segment.vehicles)):
+            veh = sim.vehicles[segment.vehicles[i]]
+            veh.v_max = veh._v_max * sim._compute_speed_factor(segment_index, veh)
+            veh.update(sim.vehicles[segment.vehicles[i - 1]], sim.dt)
+
+
+def test_engines_match_original_update_order():
+    reference = _grid("python")
+    reference._update_vehicles = lambda seg_indices=None: _reference_update(reference)
+    sequential = _grid("python")
+    vectorized = _grid("vectorized")
+
+    for _ in range(4):
+        for sim in (reference, sequential, vectorized):
+            sim.run(100)
+        expected = vehicle_state(reference)
+        assert vehicle_state(sequential) == expected
+        b = vehicle_state(vectorized)
+        assert [row[:2] for row in b] == [row[:2] for row in expected]
+        np.testing.assert_allclose(np.array(b)[:, 2:], np.array(expected)[:, 2:], rtol=1e-9, atol=1e-9)
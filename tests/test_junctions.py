@@ -0,0 +1,84 @@
+import pytest
+
+from trafficSimulator import Simulation
+
+
+def _light_sim():
+    sim = Simulation()
+    sim.create_segment([(0, 0), (200, 0)], id="a")
+    sim.add_junction({"approaches": [{"segment_id": "a", "offset": 0.5, "type": "light", "green": 10, "red": 10}]})
+    return sim, sim.junctions["junction_0"]["approaches"][0]
+
+
+def _switch_times(sim, approach, steps):
+    times = []
+    phase = approach.get("phase", "green")
+    for _ in range(steps):
+        sim.update()
+        if approach["phase"] != phase:
+            phase = approach["phase"]
+            times.append(approach["phase_start"])
+    return times
+
+
+def test_light_cycles_with_configured_durations():
+    sim, approach = _light_sim()
+    assert _switch_times(sim, approach, 60*35) == pytest.approx([10.0, 20.0, 30.0], abs=0.1)
+
+
+def test_runtime_edits_apply_after_recompile():
+    sim, approach = _light_sim()
+    sim.run(60*5)
+    approach["green"] = 4
+    approach["red"] = 6
+    sim.recompile_junctions()
+    # The current green started at 0 s and now lasts 4 s: it is overdue.
+    assert _switch_times(sim, approach, 60*20) == pytest.approx([5.0, 11.0, 15.0, 21.0], abs=0.1)
+
+
+def _reference_priority(sim, seg_idx, appr):
+    # The original per-call check: look every other approach up and test headings on the spot.
+    import math
+
+    def on_right(h_self, h_other):
+        d = (h_other - h_self + math.pi) % (2*math.pi) - math.pi
+        return 0 < d < math.pi/2
+
+    seg = sim.segments[seg_idx]
+    heading = seg.get_heading(min(max(appr.get("offset", 0.5), 0.0), 1.0))
+    for other in sim.junctions[appr["junction_id"]]["approaches"]:
+        other_idx = sim.segment_by_id.get(other.get("segment_id"))
+        if other_idx is None or other_idx == seg_idx:
+            continue
+        if other.get("type") == "light" and other.get("phase", "green") != "green":
+            continue
+        other_seg = sim.segments[other_idx]
+        if len(other_seg.vehicles) == 0:
+            continue
+        other_lead = sim.vehicles[other_seg.vehicles[0]]
+        dist_other = other.get("offset", 0.5) * other_seg.get_length() - other_lead.x
+        if dist_other < -2 or dist_other > 20.0:
+            continue
+        if on_right(heading, other_seg.get_heading(other.get("offset", 0.5))):
+            return True
+    return False
+
+
+def test_conflict_tables_match_the_per_call_check():
+    from trafficSimulator.config import build_simulation
+    from trafficSimulator.scenarios import generate_scenario
+
+    sim = build_simulation(generate_scenario("grid", segments=200, vehicles=300, seed=7), seed=7)
+    sim.update()  # compiles the junctions
+    yields = [appr for approaches in sim.segment_junctions.values() for appr in approaches if not appr.is_light]
+    assert yields
+
+    positives = 0
+    for _ in range(40):
+        sim.run(15)
+        for appr in yields:
+            source = dict(appr.source, junction_id=appr.junction_id)
+            expected = _reference_priority(sim, appr.seg_idx, source)
+            assert sim._has_vehicle_with_priority(appr) == expected
+            positives += expected
+    assert positives > 0
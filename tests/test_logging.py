@@ -0,0 +1,60 @@
+import json
+import logging
+from pathlib import Path
+
+from trafficSimulator.config import load_simulation_from_json
+from trafficSimulator.tracing import LOGGER_NAME, configure_logging
+
+
+CONFIG = str(Path(__file__).resolve().parent.parent / "examples" / "config.json")
+
+
+def _run(ticks=400):
+    sim, _ = load_simulation_from_json(CONFIG, seed=3)
+    sim.dt = 0.25
+    spawned = set()
+    for _ in range(ticks):
+        before = set(sim.vehicles)
+        sim.update()
+        spawned |= set(sim.vehicles) - before
+    return sim, spawned
+
+
+def test_default_run_prints_and_logs_nothing(capsys):
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.addHandler(handler)
+    try:
+        _, spawned = _run()
+    finally:
+        logger.removeHandler(handler)
+    assert spawned
+    assert capsys.readouterr() == ("", "")
+    assert records == []
+
+
+def test_debug_trace_as_json_lines(tmp_path, capsys):
+    trace = tmp_path / "trace.jsonl"
+    configure_logging("DEBUG", json_path=trace, batch_size=50, stream=None)
+    try:
+        sim, spawned = _run()
+    finally:
+        configure_logging("WARNING", stream=None)
+        logging.getLogger(LOGGER_NAME).setLevel(logging.NOTSET)
+    assert capsys.readouterr() == ("", "")
+
+    entries = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert all(entry["logger"].startswith(LOGGER_NAME) for entry in entries)
+    by_event = {}
+    for entry in entries:
+        by_event.setdefault(entry["event"], []).append(entry)
+
+    assert {entry["vehicle"] for entry in by_event["spawn"]} == spawned
+    assert all(entry["level"] == "DEBUG" for entry in by_event["spawn"])
+    # One route entry per path resolution, including the initial vehicles.
+    assert len(by_event["route"]) == sim.routing_calls
+    for entry in by_event["route"]:
+        assert entry["length"] > 0
+        assert all(seg_id in sim.segment_by_id for seg_id in entry["path"])
@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+
+from trafficSimulator.config import load_simulation_from_json
+from trafficSimulator.network_cache import network_key, prune_cache
+from trafficSimulator.scenarios import generate_scenario
+
+from helpers import vehicle_state
+
+
+def _write_config(tmp_path, seed=1):
+    config = generate_scenario("radial", segments=80, vehicles=40, seed=seed)
+    path = tmp_path / f"radial_{seed}.json"
+    path.write_text(json.dumps(config), encoding="utf-8")
+    return path, config
+
+
+def test_cached_network_round_trip(tmp_path):
+    path, config = _write_config(tmp_path)
+    cache_dir = tmp_path / "cache"
+    built, _ = load_simulation_from_json(path, seed=4, cache=False)
+    stored, _ = load_simulation_from_json(path, seed=4, cache=cache_dir)
+    assert (cache_dir / network_key(config) / "manifest.json").is_file()
+    cached, _ = load_simulation_from_json(path, seed=4, cache=cache_dir)
+
+    assert {type(seg).__name__ for seg in cached.segments} >= {"Segment", "QuadraticCurve", "CubicCurve"}
+    offsets = np.linspace(0.0, 1.0, 7)
+    for original, copy in zip(built.segments, cached.segments):
+        assert type(copy) is type(original)
+        assert copy.id == original.id
+        assert copy.points == original.points
+        assert copy.get_length() == original.get_length()
+        np.testing.assert_array_equal(copy.get_point(offsets), original.get_point(offsets))
+        np.testing.assert_array_equal(copy.get_heading(offsets), original.get_heading(offsets))
+    assert cached.routing_graph().adjacency == built.routing_graph().adjacency
+
+    for sim in (built, stored, cached):
+        sim.run(600)
+    assert vehicle_state(cached) == vehicle_state(built)
+    assert vehicle_state(stored) == vehicle_state(built)
+
+
+def test_corrupted_entry_is_rebuilt(tmp_path):
+    path, config = _write_config(tmp_path)
+    cache_dir = tmp_path / "cache"
+    load_simulation_from_json(path, cache=cache_dir)
+    entry = cache_dir / network_key(config)
+    with (entry / "points.npy").open("r+b") as f:
+        f.seek(-8, 2)
+        f.write(b"\xff" * 8)
+
+    sim, _ = load_simulation_from_json(path, cache=cache_dir)
+    built, _ = load_simulation_from_json(path, cache=False)
+    assert [seg.points for seg in sim.segments] == [seg.points for seg in built.segments]
+    # The bad entry was discarded and written again.
+    assert not (entry / "points.npy").read_bytes().endswith(b"\xff" * 8)
+    cached, _ = load_simulation_from_json(path, cache=cache_dir)
+    assert [seg.points for seg in cached.segments] == [seg.points for seg in built.segments]
+
+
+def test_prune_keeps_most_recent_entries(tmp_path):
+    cache_dir = tmp_path / "cache"
+    keys = []
+    for seed in (1, 2, 3):
+        path, config = _write_config(tmp_path, seed)
+        load_simulation_from_json(path, cache=cache_dir)
+        keys.append(network_key(config))
+    sizes = {key: sum(p.stat().st_size for p in (cache_dir / key).iterdir()) for key in keys}
+
+    # Touch the oldest entry: it becomes the most recently used.
+    load_simulation_from_json(tmp_path / "radial_1.json", cache=cache_dir)
+    freed = prune_cache(cache_dir, max_bytes=sizes[keys[0]] + sizes[keys[2]])
+    assert freed == sizes[keys[1]]
+    assert sorted(p.name for p in cache_dir.iterdir()) == sorted([keys[0], keys[2]])
+
+
+def test_cache_is_opt_in_and_per_user(tmp_path, monkeypatch):
+    path, config = _write_config(tmp_path)
+    monkeypatch.delenv("TRAFFICSIM_CACHE_DIR", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    load_simulation_from_json(path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [path.name]
+
+    load_simulation_from_json(path, cache=True)
+    entry = tmp_path / "xdg" / "trafficsim" / network_key(config)
+    assert (entry / "manifest.json").is_file()
+    assert (tmp_path / "xdg" / "trafficsim").stat().st_mode & 0o077 == 0
+
+    monkeypatch.setenv("TRAFFICSIM_CACHE_DIR", str(tmp_path / "override"))
+    load_simulation_from_json(path, cache=True)
+    assert (tmp_path / "override" / network_key(config) / "manifest.json").is_file()
@@ -0,0 +1,29 @@
+from trafficSimulator.config import build_simulation
+from trafficSimulator.core.parallel import PartitionedSimulation
+from trafficSimulator.scenarios import generate_scenario
+
+from helpers import vehicle_state
+
+
+def _arterial():
+    config = generate_scenario("arterial", segments=60, vehicles=80, seed=5)
+    sim = build_simulation(config, seed=5)
+    trips = []
+    sim.trip_listeners.append(lambda record: trips.append((record.exit_time, record.distance)))
+    return sim, trips
+
+
+def test_partitioned_run_matches_single_process():
+    single, single_trips = _arterial()
+    single.run(2400)
+
+    partitioned, partitioned_trips = _arterial()
+    with PartitionedSimulation(partitioned, regions=3) as runner:
+        assert len(runner.regions) == 3
+        runner.run(2400)
+        assert runner.summary()["active_vehicles"] == len(single.vehicles)
+
+    assert partitioned.t == single.t
+    assert vehicle_state(partitioned) == vehicle_state(single)
+    assert single_trips and partitioned_trips == single_trips
+    assert partitioned.summary() == single.summary()
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from trafficSimulator.config import load_simulation_from_json
+from trafficSimulator.core.geometry.cubic_curve import CubicCurve
+from trafficSimulator.core.geometry.pose_table import PoseTable
+from trafficSimulator.core.geometry.quadratic_curve import QuadraticCurve
+from trafficSimulator.core.geometry.segment import Segment
+
+
+CONFIG = str(Path(__file__).resolve().parent.parent / "examples" / "config.json")
+
+SEGMENTS = [
+    Segment([(0, 0), (30, 0), (30, 40), (-10, 70)]),
+    Segment([(5, 5), (25, 5)]),  # single piece: constant heading
+    QuadraticCurve((0, 0), (80, 5), (100, 100)),
+    CubicCurve((0, 0), (120, -20), (-40, 90), (60, 60)),
+]
+IDS = ["polyline", "straight", "quadratic", "cubic"]
+
+
+@pytest.mark.parametrize("seg", SEGMENTS, ids=IDS)
+def test_point_and_heading_match_interp1d(seg):
+    interpolate = pytest.importorskip("scipy.interpolate")
+    points = np.asarray(seg.points)
+    headings = np.unwrap(np.arctan2(np.diff(points[:, 1]), np.diff(points[:, 0])))
+    ref_point = interpolate.interp1d(np.linspace(0, 1, len(points)), points, axis=0)
+    if len(headings) == 1:
+        def ref_heading(offset):
+            return np.full(np.shape(offset), headings[0])
+    else:
+        ref_heading = interpolate.interp1d(np.linspace(0, 1, len(headings)), headings)
+
+    offsets = np.linspace(0.0, 1.0, 101)
+    np.testing.assert_allclose(seg.get_point(offsets), ref_point(offsets), atol=1e-9)
+    np.testing.assert_allclose(seg.get_heading(offsets), ref_heading(offsets), atol=1e-12)
+    for offset in (0.0, 0.37, 1.0):
+        np.testing.assert_allclose(seg.get_point(offset), ref_point(offset), atol=1e-9)
+        assert seg.get_heading(offset) == pytest.approx(float(ref_heading(offset)), abs=1e-12)
+
+
+def test_pose_table_matches_scalar_queries():
+    table = PoseTable(SEGMENTS)
+    rng = np.random.default_rng(0)
+    seg_indices = rng.integers(len(SEGMENTS), size=500)
+    offsets = rng.uniform(-0.1, 1.1, size=500)
+    points, headings = table.query(seg_indices, offsets)
+    assert points.shape == (500, 2) and headings.shape == (500,)
+    for k, offset, point, heading in zip(seg_indices.tolist(), offsets.tolist(), points, headings.tolist()):
+        seg = SEGMENTS[k]
+        # Offsets outside [0, 1] are clamped to the segment ends.
+        offset = min(max(offset, 0.0), 1.0)
+        np.testing.assert_allclose(point, seg.get_point(offset), atol=1e-9)
+        assert heading == pytest.approx(float(seg.get_heading(offset)), abs=1e-12)
+
+
+def test_vehicle_poses_match_per_vehicle_lookup():
+    sim, _ = load_simulation_from_json(CONFIG, seed=3)
+    sim.dt = 0.25
+    for _ in range(200):
+        sim.update()
+    vehicles, points, headings = sim.vehicle_poses()
+    assert len(vehicles) == len(sim.vehicles) > 0
+    expected = [sim.vehicles[vid] for segment in sim.segments for vid in segment.vehicles]
+    assert vehicles == expected
+    for veh, point, heading in zip(vehicles, points, headings.tolist()):
+        seg = sim.segments[veh.path[veh.current_road_index]]
+        offset = veh.x / seg.get_length()
+        np.testing.assert_allclose(point, seg.get_point(offset), atol=1e-9)
+        assert heading == pytest.approx(float(seg.get_heading(offset)), abs=1e-12)
+
+    # The table follows changes to the network.
+    seg_idx = len(sim.segments)
+    sim.create_segment((0, 0), (10, 10), id="late")
+    point, heading = sim.segment_poses([seg_idx], [0.5])
+    np.testing.assert_allclose(point[0], (5.0, 5.0), atol=1e-12)
+    assert heading[0] == pytest.approx(np.pi / 4)
@@ -0,0 +1,77 @@
+import csv
+import io
+from pathlib import Path
+
+import pytest
+
+from helpers import vehicle_state
+from trafficSimulator.config import load_simulation_from_json
+from trafficSimulator.core.profiler import COUNTERS, PHASES
+
+
+CONFIG = str(Path(__file__).resolve().parent.parent / "examples" / "config.json")
+
+
+def _reference_counts(sim):
+    """Step sim once and count what the profiler should have seen."""
+    before = {vid: veh.current_road_index for vid, veh in sim.vehicles.items()}
+    sim.update()
+    after = {vid: veh.current_road_index for vid, veh in sim.vehicles.items()}
+    transitions = sum(vid not in after or after[vid] != idx for vid, idx in before.items())
+    spawns = sum(vid not in before for vid in after)
+    return len(before), transitions, spawns
+
+
+def test_profiled_counters_match_stepping_the_simulation():
+    plain, _ = load_simulation_from_json(CONFIG, seed=3)
+    profiled, _ = load_simulation_from_json(CONFIG, seed=3)
+    assert profiled.stats() == {}
+    plain.dt = profiled.dt = 0.25
+    prof = profiled.enable_profiling(window=50)
+
+    expected = []
+    for _ in range(400):
+        expected.append(_reference_counts(plain))
+        profiled.update()
+
+    # Profiling only observes the tick.
+    assert vehicle_state(profiled) == vehicle_state(plain)
+    n_phases = len(PHASES)
+    assert [row[1 + n_phases:4 + n_phases] for row in prof.rows] == expected[-50:]
+    assert [row[0] for row in prof.rows] == pytest.approx([k * plain.dt for k in range(350, 400)])
+
+    stats = profiled.stats()
+    assert stats["ticks"] == 400
+    for name, total in zip(COUNTERS, map(sum, zip(*expected))):
+        assert stats["counters"][name]["total"] == total
+        assert stats["counters"][name]["per_tick"] == pytest.approx(total / 400)
+    assert stats["counters"]["transitions"]["total"] > 0
+    assert stats["counters"]["spawns"]["total"] > 0
+    assert 0 < stats["counters"]["route_misses"]["total"] <= stats["counters"]["routing_calls"]["total"]
+    assert sum(phase["share"] for phase in stats["phases"].values()) == pytest.approx(1.0)
+    assert stats["seconds"] == pytest.approx(sum(phase["seconds"] for phase in stats["phases"].values()))
+
+    rolling = profiled.stats(rolling=True)
+    assert rolling["ticks"] == 50
+    for name, total in zip(COUNTERS, map(sum, zip(*expected[-50:]))):
+        assert rolling["counters"][name]["total"] == total
+
+
+def test_export_and_disable():
+    sim, _ = load_simulation_from_json(CONFIG, seed=3)
+    prof = sim.enable_profiling(window=10)
+    for _ in range(25):
+        sim.update()
+
+    out = io.StringIO()
+    prof.export_csv(out)
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert tuple(rows[0]) == prof.columns
+    assert len(rows) == 11
+    assert [float(value) for value in rows[-1]] == pytest.approx(list(prof.rows[-1]))
+
+    sim.disable_profiling()
+    sim.update()
+    assert sim.profiler is None
+    assert sim.stats() == {}
+    assert prof.ticks == 25
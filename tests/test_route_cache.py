@@ -0,0 +1,73 @@
+import random
+
+from trafficSimulator.config import build_simulation
+from trafficSimulator.scenarios import generate_scenario
+
+
+def _grid():
+    config = generate_scenario("grid", segments=200, vehicles=0, seed=2)
+    config["vehicle_generators"] = []
+    return build_simulation(config)
+
+
+def _length(sim, path):
+    return sum(sim.segments[sim.segment_by_id[seg_id]].get_length() for seg_id in path)
+
+
+def _pairs(sim, count):
+    ids = [seg.id for seg in sim.segments]
+    rng = random.Random(3)
+    pairs = []
+    while len(pairs) < count:
+        start, end = rng.sample(ids, 2)
+        try:
+            sim.shortest_path_uncached(start, end)
+        except ValueError:
+            continue
+        pairs.append((start, end))
+    return pairs
+
+
+def test_cached_routes_match_uncached_search():
+    sim = _grid()
+    pairs = _pairs(sim, 40)
+    for start, end in pairs:
+        assert sim.shortest_path(start, end) == sim.shortest_path_uncached(start, end)
+    assert sim.route_cache.stats()["misses"] == len(set(pairs))
+
+    for start, end in pairs:
+        assert sim.shortest_path(start, end) == sim.shortest_path_uncached(start, end)
+    assert sim.route_cache.stats()["hits"] == len(pairs) + len(pairs) - len(set(pairs))
+
+    trees = _grid()
+    trees.route_cache.use_trees = True
+    for start, end in pairs:
+        path = trees.shortest_path(start, end)
+        assert (path[0], path[-1]) == (start, end)
+        assert abs(_length(trees, path) - _length(sim, sim.shortest_path(start, end))) < 1e-9
+    assert 0 < trees.route_cache.stats()["trees"] <= len({start for start, _ in pairs})
+
+
+def test_graph_changes_invalidate_cached_routes():
+    sim = _grid()
+    start, end = next((a, b) for a, b in _pairs(sim, 20) if len(sim.shortest_path(a, b)) > 2)
+    sim.shortest_path(start, end)
+    misses = sim.route_cache.misses
+
+    # A new segment bumps the graph version: the route is searched again.
+    first = sim.segments[sim.segment_by_id[start]].points[-1]
+    sim.create_segment(first, (first[0] + 7.0, first[1] + 3.0), id="spur")
+    assert sim.shortest_path(start, end) == sim.shortest_path_uncached(start, end)
+    assert sim.route_cache.misses == misses + 1
+
+    # Removing a segment of the cached route must not serve it again.
+    via = sim.shortest_path(start, end)[1]
+    sim.remove_segment(via)
+    path = sim.shortest_path(start, end)
+    assert via not in path
+    assert path == sim.shortest_path_uncached(start, end)
+    assert sim.route_cache.misses == misses + 2
+
+    sim.graph_tol = 1.0
+    sim.shortest_path(start, end)
+    assert sim.route_cache.misses == misses + 3
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from trafficSimulator.config import build_simulation
+from trafficSimulator.core.routing_graph import RoutingGraph
+from trafficSimulator.scenarios import generate_scenario
+
+
+def _network(**overrides):
+    config = generate_scenario("grid", segments=120, vehicles=0, seed=1)
+    config["vehicle_generators"] = []
+    config.update(overrides)
+    return config
+
+
+def _graph(items, tol):
+    graph = RoutingGraph(tol)
+    for seg_id, seg in items:
+        graph.add_segment(seg_id, seg)
+    return graph
+
+
+@pytest.mark.parametrize("tol", [5e-2, 2.0])
+def test_incremental_graph_matches_rebuild(tol):
+    sim = build_simulation(_network())
+    items = [(seg.id, seg) for seg in sim.segments]
+    graph = _graph(items, tol)
+    removed = set(random.Random(4).sample([seg_id for seg_id, _ in items], 40))
+    for seg_id in removed:
+        graph.remove_segment(seg_id)
+    # Re-adding some puts them at the end of the insertion order.
+    readded = sorted(removed)[:10]
+    for seg_id in readded:
+        graph.add_segment(seg_id, sim.segments[sim.segment_by_id[seg_id]])
+
+    kept = [item for item in items if item[0] not in removed]
+    kept += [(seg_id, sim.segments[sim.segment_by_id[seg_id]]) for seg_id in readded]
+    assert graph.adjacency == _graph(kept, tol).adjacency
+
+
+def test_simulation_remove_segment():
+    config = _network()
+    sim = build_simulation(config)
+    loose = sim.routing_graph(2.0)
+    version = sim.graph_version
+    start, end = config["segments"][0]["id"], config["segments"][-1]["id"]
+    route = sim.shortest_path(start, end)
+    assert len(route) > 2
+    victim = route[len(route) // 2]
+    sim.add_vehicle(sim.make_vehicle({"path": [len(sim.segments) - 1]}))
+
+    sim.remove_segment(victim)
+    assert victim not in sim.segment_by_id
+    assert sim.graph_version != version
+    assert [sim.segment_by_id[seg.id] for seg in sim.segments] == list(range(len(sim.segments)))
+    [veh] = sim.vehicles.values()
+    assert veh.path == [len(sim.segments) - 1]
+    assert victim not in sim.shortest_path(start, end)
+
+    config["segments"] = [seg for seg in config["segments"] if seg["id"] != victim]
+    fresh = build_simulation(config)
+    assert sim.graph == fresh.graph
+    assert loose is sim.routing_graph(2.0)
+    assert loose.adjacency == fresh.routing_graph(2.0).adjacency
+    hits = sim.spatial_index.segments.query_rect(-1e9, -1e9, 1e9, 1e9)
+    assert hits == set(range(len(sim.segments)))
+
+    with pytest.raises(ValueError):
+        sim.remove_segment(sim.segments[-1].id)  # carries a vehicle
+
+
+def test_graph_can_be_assigned():
+    sim = build_simulation(_network())
+    seg_ids = [seg.id for seg in sim.segments[:2]]
+    sim.graph = {seg_ids[0]: [(seg_ids[1], 1.0)], seg_ids[1]: []}
+    assert sim.graph == {seg_ids[0]: [(seg_ids[1], 1.0)], seg_ids[1]: []}
+    assert sim.shortest_path(*seg_ids) == seg_ids
@@ -0,0 +1,52 @@
+import json
+import math
+from collections import Counter
+
+import pytest
+
+from helpers import vehicle_state
+from trafficSimulator.benchmark import bench_scale
+from trafficSimulator.config import build_simulation
+from trafficSimulator.scenarios import SCENARIO_KINDS, generate_scenario
+
+
+@pytest.mark.parametrize("kind", SCENARIO_KINDS)
+def test_scenario_is_seeded_sized_and_mixed(kind):
+    config = generate_scenario(kind, segments=400, vehicles=60, seed=1)
+    assert json.dumps(config) == json.dumps(generate_scenario(kind, segments=400, vehicles=60, seed=1))
+    assert json.dumps(config) != json.dumps(generate_scenario(kind, segments=400, vehicles=60, seed=2))
+
+    assert 300 <= len(config["segments"]) <= 500
+    assert len({seg["id"] for seg in config["segments"]}) == len(config["segments"])
+    types = Counter(seg["type"] for seg in config["segments"])
+    assert set(types) == {"segment", "quadratic", "cubic"}
+    assert len(config["vehicles"]) == 60
+    assert config["junctions"] and config["events"] and config["vehicle_generators"]
+
+
+@pytest.mark.parametrize("kind", SCENARIO_KINDS)
+def test_scenario_paths_connect_and_run(kind):
+    config = generate_scenario(kind, segments=200, vehicles=40, seed=4)
+    sim = build_simulation(config)
+    assert len(sim.vehicles) == 40
+    for veh in sim.vehicles.values():
+        for a, b in zip(veh.path, veh.path[1:]):
+            assert math.dist(sim.segments[a].points[-1], sim.segments[b].points[0]) < 1e-6
+
+    other = build_simulation(generate_scenario(kind, segments=200, vehicles=40, seed=4))
+    for _ in range(200):
+        sim.update()
+        other.update()
+    assert vehicle_state(sim) == vehicle_state(other)
+    assert sim.vehicles
+
+
+def test_bench_scale_reports_figures():
+    row = bench_scale(100, ticks=5, warmup=1, routes=10, isolate=False)
+    assert row["kind"] == "grid" and row["vehicles"] == row["initial_vehicles"] == 100
+    assert row["segments"] >= 200
+    assert row["ticks"] == 5 and row["routes"] == 10 and row["routes_failed"] == 0
+    for key in ("load_seconds", "cached_load_seconds", "tick_mean_ms", "route_cold_ms", "peak_rss_mb"):
+        assert row[key] > 0
+    assert row["tick_p50_ms"] <= row["tick_p95_ms"] <= row["tick_max_ms"]
+    json.dumps(row)
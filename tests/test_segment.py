@@ -0,0 +1,59 @@
+import math
+
+import numpy as np
+import pytest
+
+from trafficSimulator.core.geometry.cubic_curve import CubicCurve
+from trafficSimulator.core.geometry.quadratic_curve import QuadraticCurve
+from trafficSimulator.core.geometry.segment import Segment
+
+
+SEGMENTS = [
+    Segment([(0, 0), (30, 0), (30, 40), (-10, 70)]),
+    Segment([(5, 5), (5, 5), (25, 5)]),  # repeated point: zero-length piece
+    QuadraticCurve((0, 0), (80, 5), (100, 100)),
+    CubicCurve((0, 0), (120, -20), (-40, 90), (60, 60)),
+]
+IDS = ["polyline", "repeated-point", "quadratic", "cubic"]
+
+
+def _walk(points, distance):
+    # Point and heading at an arc length, walking the polyline piece by piece.
+    distance = min(max(distance, 0.0), sum(math.dist(a, b) for a, b in zip(points, points[1:])))
+    travelled = 0.0
+    for k, (a, b) in enumerate(zip(points, points[1:])):
+        piece = math.dist(a, b)
+        last = k == len(points) - 2
+        if distance < travelled + piece or last:
+            frac = (distance - travelled) / piece if piece else 0.0
+            point = (a[0] + frac * (b[0] - a[0]), a[1] + frac * (b[1] - a[1]))
+            return point, math.atan2(b[1] - a[1], b[0] - a[0])
+        travelled += piece
+
+
+@pytest.mark.parametrize("seg", SEGMENTS, ids=IDS)
+def test_length_matches_summed_distances(seg):
+    points = seg.points
+    expected = sum(math.dist(a, b) for a, b in zip(points, points[1:]))
+    assert seg.get_length() == pytest.approx(expected, rel=1e-12)
+    assert isinstance(points, tuple) and all(isinstance(pt, tuple) for pt in points)
+
+
+@pytest.mark.parametrize("seg", SEGMENTS, ids=IDS)
+def test_queries_at_distance_match_walking_the_polyline(seg):
+    length = seg.get_length()
+    vertices = np.asarray(seg._cumulative_length)
+    distances = np.linspace(-5.0, length + 5.0, 97)
+    points = seg.get_point_at_distance(distances)
+    headings = seg.get_heading_at_distance(distances)
+    for distance, point, heading in zip(distances.tolist(), points, headings.tolist()):
+        ref_point, ref_heading = _walk(seg.points, distance)
+        np.testing.assert_allclose(point, ref_point, atol=1e-9)
+        if np.abs(vertices - distance).min() > 1e-6 and 0 < distance < length:
+            # Headings are unwrapped along the polyline; compare the angle.
+            assert math.cos(heading - ref_heading) == pytest.approx(1.0, abs=1e-12)
+
+    # At the vertices themselves only the position is well defined.
+    for distance, point in zip(vertices.tolist(), seg.get_point_at_distance(vertices)):
+        np.testing.assert_allclose(point, _walk(seg.points, distance)[0], atol=1e-9)
+    assert seg.get_point_at_distance(length / 3).shape == (2,)
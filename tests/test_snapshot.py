@@ -0,0 +1,45 @@
+import pytest
+
+from trafficSimulator import Simulation
+from trafficSimulator.config import build_simulation
+from trafficSimulator.scenarios import generate_scenario
+
+from helpers import vehicle_state
+
+
+def _trips(sim):
+    return [(r.exit_time, r.spawn_time, r.path, r.distance) for r in sim.trip_records]
+
+
+@pytest.mark.parametrize("engine", ["python", "vectorized"])
+def test_restored_state_continues_identically(tmp_path, engine):
+    config = generate_scenario("arterial", segments=60, vehicles=80, seed=2)
+    sim = build_simulation(config, seed=2)
+    if engine == "vectorized":
+        sim.enable_vectorized_engine()
+    sim.run(1200)
+
+    path = tmp_path / "state.bin"
+    sim.save_state(path)
+    restored = Simulation.load_state(path)
+    assert restored.t == sim.t
+    assert vehicle_state(restored) == vehicle_state(sim)
+
+    sim.run(1200)
+    restored.run(1200)
+    assert restored.frame_count == sim.frame_count
+    assert vehicle_state(restored) == vehicle_state(sim)
+    assert _trips(restored) == _trips(sim)
+    assert restored.summary() == sim.summary()
+    assert sim.completed_trips > 0
+
+
+def test_cli_rejects_seed_when_resuming(tmp_path, capsys):
+    from trafficSimulator.cli import main
+
+    sim = build_simulation(generate_scenario("arterial", segments=20, vehicles=10, seed=1), seed=1)
+    path = tmp_path / "state.bin"
+    sim.save_state(path)
+    assert main(["run", str(path), "--duration", "1", "--seed", "3"]) == 2
+    assert "--seed" in capsys.readouterr().err
+    assert main(["run", str(path), "--duration", "1"]) == 0
@@ -0,0 +1,18 @@
+from trafficSimulator import Simulation
+
+
+def test_environment_appended_directly_is_indexed_on_demand():
+    sim = Simulation()
+    sim.add_environment_object({"type": "tree", "position": (10, 10), "size": 3})
+    sim.environment.append({"type": "lamp", "position": (500, 500), "size": 2})
+    sim.environment.append({"type": "marker", "position": None})
+    grid = sim.spatial_index.environment
+    assert grid.query_rect(-1e6, -1e6, 1e6, 1e6) == {0}
+
+    sim.index_environment()
+    assert grid.query_rect(-1e6, -1e6, 1e6, 1e6) == {0, 1}
+    assert grid.query_rect(490, 490, 510, 510) == {1}
+
+    sim.add_environment_object({"type": "rsu", "position": (-40, 0)})
+    assert grid.query_radius((-40, 1), 2) == {3}
+    assert len(grid) == 3
@@ -0,0 +1,24 @@
+import json
+import subprocess
+import sys
+
+from trafficSimulator.benchmark import STARTUP_FORBIDDEN, measure_startup
+
+
+def test_headless_startup_within_budget():
+    result = measure_startup(repeat=3)
+    assert result["forbidden_loaded"] == []
+    assert result["import_seconds"] <= result["budget_seconds"], result
+
+
+def test_package_import_is_lazy():
+    probe = (
+        "import json, sys, trafficSimulator\n"
+        "heavy = ('numpy',) + tuple(sys.argv[1:])\n"
+        "before = [m for m in heavy if m in sys.modules]\n"
+        "trafficSimulator.Simulation\n"
+        "print(json.dumps([before, 'numpy' in sys.modules, 'Window' in trafficSimulator.__all__]))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", probe, *STARTUP_FORBIDDEN],
+                         check=True, capture_output=True, text=True).stdout
+    assert json.loads(out) == [[], True, True]
@@ -0,0 +1,54 @@
+import os
+from pathlib import Path
+
+from trafficSimulator.sweep import expand_jobs, run_job, run_sweep, table_columns
+
+
+CONFIG = Path(__file__).resolve().parent.parent / "examples" / "config.json"
+
+
+def _crash_always(job, duration, dt, engine):
+    if job["seed"] == 2:
+        os._exit(1)
+    return run_job(job, duration, dt, engine)
+
+
+def _crash_once(job, duration, dt, engine):
+    # The marker file survives the worker, so only the first attempt dies.
+    marker = Path(job["marker"])
+    if job["seed"] == 1 and not marker.exists():
+        marker.touch()
+        os._exit(1)
+    return run_job(job, duration, dt, engine)
+
+
+def _jobs(**extra):
+    jobs = expand_jobs([CONFIG], {"vehicle_generators.0.vehicle_rate": [20]}, seeds=range(5))
+    for job in jobs:
+        job.update(extra)
+    return jobs
+
+
+def test_job_killing_its_worker_is_reported_and_others_finish():
+    rows = run_sweep(_jobs(), duration=2, workers=2, run=_crash_always)
+    assert [row["job"] for row in rows] == [0, 1, 2, 3, 4]
+    statuses = {row["seed"]: row["status"] for row in rows}
+    assert statuses == {0: "ok", 1: "ok", 2: "crashed", 3: "ok", 4: "ok"}
+    crashed = rows[2]
+    assert crashed["attempts"] == 3
+    assert crashed["error"] == "worker process terminated abruptly"
+    assert all(row["steps"] == 120 for row in rows if row["status"] == "ok")
+
+
+def test_job_lost_once_is_requeued(tmp_path):
+    rows = run_sweep(_jobs(marker=str(tmp_path / "crashed")), duration=2, workers=2, retries=0, run=_crash_once)
+    assert [row["status"] for row in rows] == ["ok"] * 5
+    assert rows[1]["attempts"] == 2
+    assert all(row["attempts"] in (1, 2) for row in rows)
+
+
+def test_parameter_columns_come_from_the_jobs():
+    jobs = _jobs()
+    columns = table_columns([{"job": 0, "extra": 1}], jobs)
+    assert columns[:4] == ["job", "config", "seed", "vehicle_generators.0.vehicle_rate"]
+    assert columns[-1] == "extra"
@@ -0,0 +1,64 @@
+import pytest
+
+from trafficSimulator import Simulation
+
+
+def _network(recycle=False):
+    sim = Simulation()
+    sim.create_segment((0, 0), (100, 0), id="a")
+    sim.create_segment((100, 0), (150, 0), id="b")
+    sim.recycle_vehicles = recycle
+    return sim
+
+
+def test_finished_vehicle_is_retired_with_a_trip_record():
+    sim = _network()
+    sim.create_vehicle(path=["a", "b"], v=10, vehicle_class="bus")
+    (vid,) = sim.vehicles
+    records = []
+    sim.trip_listeners.append(records.append)
+
+    last_x = None
+    while vid in sim.vehicles:
+        veh = sim.vehicles[vid]
+        if veh.current_road_index == 1:
+            last_x = veh.x
+        sim.update()
+    # Retired on the first tick its position passed the end of its path.
+    assert last_x < sim.segments[1].get_length()
+    assert not any(seg.vehicles for seg in sim.segments)
+
+    (record,) = records
+    assert list(sim.trip_records) == records
+    assert record.id == vid
+    assert record.vehicle_class == "bus"
+    assert record.spawn_time == 0
+    # Stamped with the clock of the tick that moved it, before t advances.
+    assert record.exit_time == pytest.approx(sim.t - sim.dt)
+    assert record.path == ("a", "b")
+    assert record.distance == pytest.approx(150.0)
+    assert record.mean_speed == pytest.approx(150.0 / record.exit_time)
+    summary = sim.summary()
+    assert summary["active_vehicles"] == 0
+    assert summary["completed_trips"] == 1
+    assert summary["mean_trip_time"] == pytest.approx(record.exit_time)
+
+
+def test_recycling_keeps_allocations_flat_without_changing_results():
+    def run(recycle):
+        sim = _network(recycle)
+        sim.create_vehicle_generator(vehicle_rate=30, seed=3,
+                                     vehicles=[(1, {"path": ["a", "b"], "v": 12}), (1, {"path": ["a", "b"], "v": 8})])
+        # Retired vehicles stay referenced by the pool, so id() is stable.
+        objects = set()
+        for _ in range(18000):
+            sim.update()
+            objects.update(map(id, sim.vehicles.values()))
+        return sim, len(objects)
+
+    fresh, _ = run(False)
+    recycled, recycled_objects = run(True)
+    assert fresh.completed_trips > 100
+    trips = [(r.spawn_time, r.exit_time, r.path, r.distance) for r in fresh.trip_records]
+    assert [(r.spawn_time, r.exit_time, r.path, r.distance) for r in recycled.trip_records] == trips
+    assert recycled_objects < fresh.completed_trips / 10
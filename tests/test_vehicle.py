@@ -0,0 +1,106 @@
+import pickle
+import sys
+
+import pytest
+
+from trafficSimulator import Simulation
+from trafficSimulator.core.idm_engine import IDMEngine
+from trafficSimulator.core.vehicle import Vehicle
+
+
+def test_extra_attributes_from_config():
+    veh = Vehicle({"l": 6, "rpm": 2000, "plate": "AB123"})
+    assert veh.l == 6
+    assert veh.rpm == 2000
+    assert veh.get_extra("plate") == "AB123"
+    assert veh.ac_temp is None
+    assert veh.extra == {"rpm": 2000, "plate": "AB123"}
+
+
+def test_extra_attributes_set_after_construction():
+    veh = Vehicle()
+    assert veh._extra is None
+    veh.set_extra("bar", 2)
+    veh.fog_lights = True
+    assert veh.get_extra("bar") == 2
+    assert veh.get_extra("baz", 5) == 5
+    assert veh.fog_lights is True
+    assert veh.extra == {"bar": 2, "fog_lights": True}
+    with pytest.raises(AttributeError):
+        veh.bar = 3
+
+
+def test_recycled_vehicle_drops_extra_attributes():
+    veh = Vehicle({"rpm": 2000})
+    veh.set_extra("bar", 2)
+    veh.reset({"l": 5})
+    assert veh.extra == {}
+    assert veh.get_extra("bar") is None
+
+    prototype = Vehicle({"plate": "XY"})
+    veh.set_extra("bar", 2)
+    veh.copy_from(prototype)
+    assert veh.extra == {"plate": "XY"}
+    clone = prototype.clone()
+    assert clone.extra == {"plate": "XY"}
+    clone.set_extra("plate", "ZZ")
+    assert prototype.get_extra("plate") == "XY"
+
+
+def test_extra_attributes_survive_pickling_and_engine():
+    veh = Vehicle({"rpm": 2000})
+    veh.set_extra("bar", 2)
+    assert pickle.loads(pickle.dumps(veh)).extra == {"rpm": 2000, "bar": 2}
+
+    engine = IDMEngine()
+    engine.attach(veh)
+    assert veh.get_extra("bar") == 2
+    veh.set_extra("baz", 3)
+    assert pickle.loads(pickle.dumps(engine)).vehicles[veh._slot].extra == {"rpm": 2000, "bar": 2, "baz": 3}
+    engine.detach(veh)
+    assert veh.extra == {"rpm": 2000, "bar": 2, "baz": 3}
+
+
+def test_vehicle_has_no_instance_dict():
+    veh = Vehicle({"path": [0, 1]}).clone()
+    assert not hasattr(veh, "__dict__")
+    # Object header plus one pointer per slot.
+    assert sys.getsizeof(veh) <= 32 + 8 * len(Vehicle.__slots__)
+
+
+def test_ids_stay_unique_across_clone_and_recycling():
+    sim = Simulation()
+    sim.recycle_vehicles = True
+    prototype = Vehicle({"path": [0]})
+    ids = {prototype.id}
+    objects = set()
+    reused = 0
+    live = []
+    for k in range(200):
+        veh = sim.make_vehicle(prototype)
+        assert isinstance(veh.id, int) and veh.id not in ids
+        ids.add(veh.id)
+        reused += id(veh) in objects
+        objects.add(id(veh))
+        live.append(veh)
+        if k % 3 == 0:
+            sim.release_vehicle(live.pop(0))
+    assert reused > 0
+    assert len({veh.id for veh in live}) == len(live)
+
+
+@pytest.mark.parametrize("config", [
+    {},
+    {"path": [0, 2], "v": 12, "vehicle_class": "bus", "l": 8},
+    {"path": [1], "vehicle_class": "ev", "v_max": 20, "a_max": 2.0, "rpm": 1500},
+    {"start_segment": "a", "end_segment": "b", "color": (1, 2, 3), "shape": "circle"},
+])
+def test_prototype_clone_matches_constructor(config):
+    prototype = Vehicle(config)
+    for veh in (prototype.clone(), Vehicle({"l": 3, "plate": "X"}).copy_from(prototype)):
+        built = Vehicle(config)
+        assert veh.id != prototype.id and veh.id != built.id
+        for name in Vehicle.__slots__:
+            if name not in ("id", "_engine", "_slot"):
+                assert getattr(veh, name) == getattr(built, name), name
+        assert veh.path is not prototype.path
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from trafficSimulator.core.vehicle_generator import VehicleGenerator, alias_table
+
+
+WEIGHTS = [5, 1, 0, 3, 1]
+
+
+def test_alias_table_is_exact():
+    prob, alias = alias_table(WEIGHTS)
+    n = len(WEIGHTS)
+    implied = prob / n
+    for i in range(n):
+        implied[alias[i]] += (1.0 - prob[i]) / n
+    np.testing.assert_allclose(implied, np.asarray(WEIGHTS) / sum(WEIGHTS), atol=1e-12)
+
+
+def test_alias_table_rejects_empty_weights():
+    with pytest.raises(ValueError):
+        alias_table([0, 0])
+
+
+def _generator(seed, **config):
+    vehicles = [(w, {"l": 3 + k}) for k, w in enumerate(WEIGHTS)]
+    return VehicleGenerator({"vehicles": vehicles, "seed": seed, **config})
+
+
+def test_sampled_frequencies_follow_weights():
+    gen = _generator(11)
+    draws = 200000
+    counts = np.bincount([gen._next_choice() for _ in range(draws)], minlength=len(WEIGHTS))
+    expected = np.asarray(WEIGHTS) / sum(WEIGHTS)
+    assert counts[2] == 0
+    # Within 5 standard deviations of the binomial count.
+    assert np.all(np.abs(counts / draws - expected) <= 5*np.sqrt(expected*(1 - expected)/draws))
+
+
+def test_same_seed_same_stream():
+    def stream(seed):
+        gen = _generator(seed, headway="poisson", block_size=16)
+        return [(gen.generate_vehicle().l, gen.draw_headway()) for _ in range(100)]
+
+    assert stream(7) == stream(7)
+    assert stream(7) != stream(8)
+
+
+def test_changing_vehicle_rate_reschedules():
+    from trafficSimulator import Simulation
+
+    sim = Simulation()
+    sim.create_segment([(0, 0), (1000, 0)])
+    sim.create_vehicle_generator(vehicle_rate=1, vehicles=[(1, {"path": [0], "v": 15})])
+    gen = sim.vehicle_generator[0]
+    sim.run(300)  # 5 s: the first vehicle is due at 60 s
+    assert len(sim.vehicles) == 0
+
+    gen.vehicle_rate = 30  # one every 2 s: the first one is overdue
+    sim.run(1)
+    assert len(sim.vehicles) == 1
+    sim.run(121)
+    assert len(sim.vehicles) == 2
+
+
+def test_blocked_spawn_retries_every_tick_with_same_vehicle():
+    from trafficSimulator import Simulation
+
+    sim = Simulation()
+    sim.create_segment([(0, 0), (1000, 0)])
+    sim.create_vehicle(path=[0], v=1)  # slow vehicle blocking the entrance
+    sim.create_vehicle_generator(vehicle_rate=60, seed=4,
+                                 vehicles=[(1, {"path": [0], "l": 4}), (1, {"path": [0], "l": 6})])
+    gen = sim.vehicle_generator[0]
+    assert gen.retry_backoff == 0
+
+    attempts = []
+    has_space_for = sim.has_space_for
+
+    def record(veh):
+        fits = has_space_for(veh)
+        attempts.append((sim.t, veh, fits))
+        return fits
+
+    sim.has_space_for = record
+    while len(sim.vehicles) < 2:
+        sim.run(1)
+
+    assert len(attempts) > 10
+    times = [t for t, _, _ in attempts]
+    assert times[0] == pytest.approx(1.0)
+    np.testing.assert_allclose(np.diff(times), sim.dt)
+    assert [fits for _, _, fits in attempts] == [False] * (len(attempts) - 1) + [True]
+    assert len({id(veh) for _, veh, _ in attempts}) == 1
+    assert attempts[-1][1].id in sim.vehicles
+    assert gen.upcoming_vehicle is not attempts[-1][1]